@@ -1,7 +1,8 @@
 import os
+import json
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -10,9 +11,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = config('DEBUG', default=True, cast=bool)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='', cast=Csv())
 
 # Application definition
 INSTALLED_APPS = [
@@ -29,7 +30,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'request_app.middleware.RequestIdMiddleware',
+    'request_app.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'request_app.middleware.MetricsMiddleware',
+    'request_app.middleware.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +76,47 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: список host[:port] в DB_REPLICA_HOSTS, остальные параметры — как у default.
+# Для локальной проверки достаточно указать тот же сервер (DB_REPLICA_HOSTS=localhost):
+# соединения реплик открываются только на чтение, поэтому ошибочно направленная запись упадет.
+# REPLICA_PIN_SECONDS — сколько клиент после изменения читает из default,
+# REPLICA_MAX_LAG_SECONDS — допустимое отставание, REPLICA_HEALTH_CHECK_SECONDS — период проверки
+# REPLICA_CONNECT_TIMEOUT_SECONDS — предел подключения к реплике, чтобы недоступная
+# реплика быстро исключалась, а не ждала системного таймаута TCP
+REPLICA_CONNECT_TIMEOUT_SECONDS = config('REPLICA_CONNECT_TIMEOUT_SECONDS', default=2, cast=int)
+DEFAULT_DB_OPTIONS = DATABASES['default'].get('OPTIONS', {})
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), 1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        # Параметры default (sslmode и т.п.) сохраняются, к ним добавляется режим только чтения
+        'OPTIONS': {
+            **DEFAULT_DB_OPTIONS,
+            'connect_timeout': REPLICA_CONNECT_TIMEOUT_SECONDS,
+            'options': f"{DEFAULT_DB_OPTIONS.get('options', '')} -c default_transaction_read_only=on".strip(),
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['request_app.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+REPLICA_HEALTH_CHECK_SECONDS = config('REPLICA_HEALTH_CHECK_SECONDS', default=5, cast=int)
+
+# Общий кэш процессов (лимиты запросов, кэш метрик). Без REDIS_URL — локальный кэш процесса,
+# тогда лимиты считаются в каждом воркере отдельно
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -94,7 +140,20 @@ USE_I18N = True
 USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
-STATIC_URL = 'static/'
+STATIC_URL = '/static/'
+STATIC_ROOT = config('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+
+# Единый режим развертывания: Django (WhiteNoise) отдает собранное SPA из FRONTEND_BUILD_DIR
+# (npm run build) и статику админки из STATIC_ROOT (collectstatic). Имена с хешем содержимого
+# отдаются с Cache-Control immutable, сжатые варианты .br/.gz готовятся заранее
+# (collectstatic и compress_frontend). API и SPA на одном адресе — без CORS и preflight
+SERVE_FRONTEND = config('SERVE_FRONTEND', default=False, cast=bool)
+FRONTEND_BUILD_DIR = config('FRONTEND_BUILD_DIR', default=str(BASE_DIR.parent.parent / 'frontend' / 'build'))
+if SERVE_FRONTEND:
+    WHITENOISE_ROOT = FRONTEND_BUILD_DIR
+    # main.1a2b3c4d.js, 453.1a2b3c4d.chunk.js, media/logo.<md5>.svg (CRA); base.1a2b3c4d5e6f.css (collectstatic)
+    WHITENOISE_IMMUTABLE_FILE_TEST = r'\.[0-9a-f]{8,32}\.[\w.]+$'
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1, 'whitenoise.middleware.WhiteNoiseMiddleware')
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -112,6 +171,23 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'request_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'EXCEPTION_HANDLER': 'request_app.throttling.exception_handler',
+    # Число доверенных прокси перед приложением: без них X-Forwarded-For игнорируется,
+    # иначе клиент подменял бы адрес, по которому считаются лимиты
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Лимиты request_app.throttling; переопределяются переменной окружения THROTTLE_RATES (JSON)
+    'DEFAULT_THROTTLE_RATES': {
+        'register': '10/h',
+        'login': '20/m',
+        'login_account': '10/15m',
+        'upload': '60/h',
+        'moderator_list': '300/m',
+        **config('THROTTLE_RATES', default='{}', cast=json.loads),
+    },
 }
 
 # Simple JWT settings
@@ -140,3 +216,142 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Хранилище файлов документов: local — MEDIA_ROOT, s3 — S3-совместимое хранилище (AWS, MinIO и т.п.).
+# С s3 браузер загружает и скачивает файлы напрямую по временным подписанным ссылкам.
+DOCUMENT_STORAGE = config('DOCUMENT_STORAGE', default='local')
+DOCUMENT_UPLOAD_URL_EXPIRE = config('DOCUMENT_UPLOAD_URL_EXPIRE', default=300, cast=int)
+DOCUMENT_DOWNLOAD_URL_EXPIRE = config('DOCUMENT_DOWNLOAD_URL_EXPIRE', default=300, cast=int)
+if DOCUMENT_STORAGE == 's3':
+    DOCUMENT_STORAGE_BACKEND = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': config('AWS_STORAGE_BUCKET_NAME'),
+            'endpoint_url': config('AWS_S3_ENDPOINT_URL', default=None),
+            'region_name': config('AWS_S3_REGION_NAME', default=None),
+            'access_key': config('AWS_ACCESS_KEY_ID', default=None),
+            'secret_key': config('AWS_SECRET_ACCESS_KEY', default=None),
+            'addressing_style': config('AWS_S3_ADDRESSING_STYLE', default=None),
+            'default_acl': None,
+            'file_overwrite': False,
+            'querystring_expire': DOCUMENT_DOWNLOAD_URL_EXPIRE,
+        },
+    }
+else:
+    # MEDIA_ROOT не раздается целиком: документы — по подписанным ссылкам (request_app.media)
+    DOCUMENT_STORAGE_BACKEND = {'BACKEND': 'request_app.media.ProtectedFileSystemStorage'}
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage' if SERVE_FRONTEND
+        else 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'documents': DOCUMENT_STORAGE_BACKEND,
+}
+
+
+# Профилирование запросов (количество SQL, время БД и сериализации, Server-Timing)
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+REQUEST_PROFILING_BUFFER_SIZE = config('REQUEST_PROFILING_BUFFER_SIZE', default=200, cast=int)
+
+# Экспорт метрик Prometheus (/metrics). Для нескольких воркеров задайте переменную
+# окружения PROMETHEUS_MULTIPROC_DIR — значения всех процессов суммируются при скрейпе.
+# Скрейпер передает Authorization: Bearer <METRICS_TOKEN>; без токена /metrics открыт только сотрудникам.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_PIPELINE_CACHE_SECONDS = config('METRICS_PIPELINE_CACHE_SECONDS', default=60, cast=int)
+
+# Срок хранения уведомлений и истории документов в основных таблицах (команда archive_history)
+HISTORY_RETENTION_DAYS = config('HISTORY_RETENTION_DAYS', default=180, cast=int)
+ARCHIVE_RETENTION_DAYS = config('ARCHIVE_RETENTION_DAYS', default=0, cast=int)
+
+# Дельта-синхронизация (/api/sync/)
+SYNC_OVERLAP_SECONDS = config('SYNC_OVERLAP_SECONDS', default=30, cast=int)
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+# Очередь модерации: срок аренды записи и максимальный размер одной выдачи
+MODERATION_LEASE_SECONDS = config('MODERATION_LEASE_SECONDS', default=900, cast=int)
+MODERATION_CLAIM_MAX = config('MODERATION_CLAIM_MAX', default=50, cast=int)
+
+# Автоназначение собеседований: длительность слота и горизонт планирования по умолчанию
+INTERVIEW_SLOT_MINUTES = config('INTERVIEW_SLOT_MINUTES', default=60, cast=int)
+AUTO_SCHEDULE_DAYS = config('AUTO_SCHEDULE_DAYS', default=14, cast=int)
+
+# Напоминания о собеседованиях (команда send_interview_reminders): за сколько минут до начала
+INTERVIEW_REMINDER_OFFSETS = config('INTERVIEW_REMINDER_OFFSETS', default='1440,60', cast=Csv(int))
+INTERVIEW_REMINDER_INTERVAL_SECONDS = config('INTERVIEW_REMINDER_INTERVAL_SECONDS', default=60, cast=int)
+
+# Поиск дублей резюме: минимальная оценка сходства текста (0..1) и предел выдачи
+DEDUP_SIMILARITY_THRESHOLD = config('DEDUP_SIMILARITY_THRESHOLD', default=0.8, cast=float)
+DEDUP_MAX_RESULTS = config('DEDUP_MAX_RESULTS', default=50, cast=int)
+
+# Ранжирование резюме на рассмотрении (/api/resumes/ranked/): ключевые слова профиля каждой вакансии.
+# Переопределяется переменной окружения RESUME_SCORING_PROFILES в виде JSON {"PROGRAMMER": ["python", ...]}
+RESUME_SCORING_PROFILES = {
+    'PROGRAMMER': ['программист', 'разработка', 'python', 'java', 'c++', 'sql', 'git', 'алгоритмы', 'django', 'linux', 'api'],
+    'METHODOLOGIST': ['методолог', 'методика', 'нормативная документация', 'регламент', 'стандарт', 'процессы', 'обучение', 'анализ'],
+    'SPECIALIST': ['специалист', 'документооборот', 'отчетность', 'excel', 'делопроизводство', 'коммуникация', 'организация'],
+    'PRE_DIPLOMA': ['дипломная работа', 'выпускная', 'исследование', 'магистратура', 'бакалавриат', 'научный руководитель'],
+    'PRODUCTION': ['производственная практика', 'производство', 'оборудование', 'технология', 'инженер', 'эксплуатация'],
+    'EDUCATIONAL': ['учебная практика', 'студент', 'курс', 'обучение', 'ознакомление', 'колледж'],
+}
+RESUME_SCORING_PROFILES.update(config('RESUME_SCORING_PROFILES', default='{}', cast=json.loads))
+# Построение индекса ранжирования при старте процесса (wsgi/asgi) в фоновом потоке
+RESUME_SCORING_WARM_UP = config('RESUME_SCORING_WARM_UP', default=True, cast=bool)
+
+# Пакетные запросы SPA (/api/batch/): максимум вложенных GET-запросов в одном пакете
+BATCH_MAX_REQUESTS = config('BATCH_MAX_REQUESTS', default=20, cast=int)
+
+# Админка: выше этого числа строк списки показывают оценку PostgreSQL вместо точного COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+
+# Удаление файлов документов: интервал команды sweep_deleted_files --loop, число попыток на файл
+# и минимальный возраст файла без строки в БД, после которого reconcile_media считает его потерянным
+FILE_SWEEP_INTERVAL_SECONDS = config('FILE_SWEEP_INTERVAL_SECONDS', default=60, cast=int)
+FILE_SWEEP_MAX_ATTEMPTS = config('FILE_SWEEP_MAX_ATTEMPTS', default=5, cast=int)
+MEDIA_ORPHAN_MIN_AGE_HOURS = config('MEDIA_ORPHAN_MIN_AGE_HOURS', default=24, cast=int)
+
+# ZIP-выгрузка принятых документов (/api/documents/export_zip/): максимум собеседований в одном архиве
+DOCUMENT_EXPORT_MAX_INTERVIEWS = config('DOCUMENT_EXPORT_MAX_INTERVIEWS', default=200, cast=int)
+
+# Оптимизация загруженных PDF (команда optimize_documents): предельная длинная сторона
+# изображений в пикселях (~200 dpi для A4) и качество JPEG при пережатии
+PDF_IMAGE_MAX_SIDE = config('PDF_IMAGE_MAX_SIDE', default=2339, cast=int)
+PDF_IMAGE_QUALITY = config('PDF_IMAGE_QUALITY', default=75, cast=int)
+PDF_OPTIMIZATION_INTERVAL_SECONDS = config('PDF_OPTIMIZATION_INTERVAL_SECONDS', default=60, cast=int)
+
+# Воронка найма: интервал команды rollup_funnel --loop и задержка, после которой событие
+# попадает в свертку (транзакции с меньшим id успевают зафиксироваться)
+FUNNEL_ROLLUP_INTERVAL_SECONDS = config('FUNNEL_ROLLUP_INTERVAL_SECONDS', default=60, cast=int)
+FUNNEL_ROLLUP_LAG_SECONDS = config('FUNNEL_ROLLUP_LAG_SECONDS', default=30, cast=int)
+
+# Логирование (request_app.log): запись в stderr из фонового потока через ограниченную очередь.
+# LOG_JSON — структурированные записи с request_id; LOG_SAMPLING — доля сохраняемых INFO/DEBUG
+# по логгерам в виде JSON {"request_app.views": 0.1}
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_JSON = config('LOG_JSON', default=not DEBUG, cast=bool)
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+LOG_SAMPLING = config('LOG_SAMPLING', default='{}', cast=json.loads)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {'()': 'request_app.log.RequestContextFilter'},
+        'sampling': {'()': 'request_app.log.SamplingFilter', 'rates': LOG_SAMPLING},
+    },
+    'handlers': {
+        'queue': {
+            '()': 'request_app.log.QueueHandler',
+            'json': LOG_JSON,
+            'queue_size': LOG_QUEUE_SIZE,
+            'filters': ['request_context', 'sampling'],
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': LOG_LEVEL},
+    'loggers': {
+        # Без собственных обработчиков Django записи попадали бы в вывод дважды
+        'django': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+        # Ответы 4xx (в том числе 429 от лимитов) видны в метриках; в лог — только ошибки сервера
+        'django.request': {'level': 'ERROR'},
+    },
+}
@@ -1,18 +1,16 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
 from request_app.views import (
-    RegisterView, MeView, CandidateViewSet, ResumeViewSet,
+    RegisterView, LoginView, MeView, CandidateViewSet, ResumeViewSet,
     ResumeCreateView, ResumeStatusUpdateView, ResumeDeleteView,
     ResumeEditView, NotificationView, InterviewViewSet,
-    DocumentViewSet, NotificationViewSet
+    DocumentViewSet, NotificationViewSet, ProfilingView, metrics_view,
+    ReportView, ReportExportView, FunnelView, SyncView, BatchView
 )
+from request_app import media, spa
 from django.conf import settings
-from django.conf.urls.static import static
 
 router = DefaultRouter()
 router.register(r'candidates', CandidateViewSet)
@@ -23,8 +21,9 @@ router.register(r'notifications', NotificationViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/register/', RegisterView.as_view(), name='register'),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', LoginView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/me/', MeView.as_view(), name='me'),
     path('api/resume/create/', ResumeCreateView.as_view(), name='resume-create'),
@@ -32,5 +31,17 @@ urlpatterns = [
     path('api/resume/<int:pk>/edit/', ResumeEditView.as_view(), name='resume-edit'),
     path('api/resume/<int:pk>/delete/', ResumeDeleteView.as_view(), name='resume-delete'),
     path('api/notifications/<int:pk>/', NotificationView.as_view(), name='notification'),
+    path('api/reports/', ReportView.as_view(), name='report'),
+    path('api/reports/export/', ReportExportView.as_view(), name='report-export'),
+    path('api/reports/funnel/', FunnelView.as_view(), name='report-funnel'),
+    path('api/profiling/', ProfilingView.as_view(), name='profiling'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
     path('api/', include(router.urls)),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path('media/documents/<str:token>/', media.document_file, name='document-file'),
+    path('media/templates/<path:path>', media.template_file, name='document-template'),
+]
+
+if settings.SERVE_FRONTEND:
+    # Остальные пути — маршруты SPA; файлы сборки и статика отдаются WhiteNoise раньше URL-маршрутизации
+    urlpatterns.append(re_path(r'^(?!api/|admin/|media/|static/|metrics$).*$', spa.index, name='spa'))
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 application = get_wsgi_application()
+
+# Индекс ранжирования резюме строится в фоне, до первого запроса
+from request_app.scoring import warm_up  # noqa: E402
+
+warm_up()
@@ -1,6 +1,41 @@
+import json
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Candidate, Employee, Resume, Interview, Document, Notification, DocumentHistory
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from .models import User, Candidate, Employee, EmployeeAvailability, Resume, Interview, Document, Notification, DocumentHistory, StatusEvent
+
+
+def estimated_count(queryset):
+    # Оценка планировщика PostgreSQL: EXPLAIN не читает таблицу, в отличие от COUNT(*)
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    # Точный подсчет только для небольших выборок; выше ADMIN_ESTIMATED_COUNT_THRESHOLD —
+    # оценка из плана запроса (число страниц приблизительное, как в списках больших сервисов).
+    # Оценка только для списка без фильтров и поиска: селективность условий планировщик
+    # угадывает плохо, и лишние страницы вели бы на пустые выборки
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where and connections[queryset.db].vendor == 'postgresql':
+            estimate = estimated_count(queryset)
+            if estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    # Для таблиц на миллионы строк: без второго COUNT(*) по всей таблице («показать все N»)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(User)
 class UserAdmin(UserAdmin):
@@ -19,6 +54,7 @@ class UserAdmin(UserAdmin):
 @admin.register(Candidate)
 class CandidateAdmin(admin.ModelAdmin):
     list_display = ('user', 'user_email', 'date_of_birth', 'has_successful_interview')
+    list_select_related = ('user',)
     list_filter = ('has_successful_interview',)
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'user__patronymic', 'user__email')
 
@@ -26,46 +62,79 @@ class CandidateAdmin(admin.ModelAdmin):
         return obj.user.email
     user_email.short_description = 'Электронная почта'
 
+class EmployeeAvailabilityInline(admin.TabularInline):
+    model = EmployeeAvailability
+    extra = 0
+
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = ('user', 'user_email', 'department', 'position', 'hire_date')
+    list_select_related = ('user',)
     list_filter = ('department', 'hire_date')
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'user__patronymic', 'department', 'position')
+    inlines = [EmployeeAvailabilityInline]
 
     def user_email(self, obj):
         return obj.user.email
     user_email.short_description = 'Электронная почта'
 
 @admin.register(Resume)
-class ResumeAdmin(admin.ModelAdmin):
+class ResumeAdmin(ScalableAdmin):
     list_display = ('id', 'candidate', 'resume_type', 'practice_type', 'job_type', 'education', 'phone_number', 'status', 'created_at')
+    list_select_related = ('candidate__user',)
+    autocomplete_fields = ('candidate', 'claimed_by')
     list_filter = ('status', 'education', 'created_at', 'resume_type', 'practice_type', 'job_type')
     search_fields = ('candidate__user__username', 'candidate__user__first_name', 'candidate__user__last_name', 'candidate__user__patronymic', 'content', 'phone_number')
     readonly_fields = ('created_at',)
 
 @admin.register(Interview)
-class InterviewAdmin(admin.ModelAdmin):
+class InterviewAdmin(ScalableAdmin):
     list_display = ('id', 'candidate', 'employee', 'resume_type', 'practice_type', 'job_type', 'scheduled_at', 'status', 'result')
+    list_select_related = ('candidate__user', 'employee__user')
+    autocomplete_fields = ('candidate', 'employee')
     list_filter = ('status', 'result', 'scheduled_at', 'resume_type', 'practice_type', 'job_type')
     search_fields = ('candidate__user__username', 'candidate__user__first_name', 'candidate__user__last_name', 'employee__user__username')
 
 @admin.register(Document)
-class DocumentAdmin(admin.ModelAdmin):
-    list_display = ('id', 'interview', 'document_type', 'file_path', 'status', 'uploaded_at')
-    list_filter = ('status', 'document_type', 'uploaded_at')
+class DocumentAdmin(ScalableAdmin):
+    list_display = ('id', 'interview', 'document_type', 'file_path', 'status', 'optimization_status', 'uploaded_at')
+    list_select_related = ('interview__candidate__user',)
+    autocomplete_fields = ('interview', 'claimed_by')
+    list_filter = ('status', 'document_type', 'optimization_status', 'uploaded_at')
     search_fields = ('file_path', 'document_type', 'interview__candidate__user__username')
-    readonly_fields = ('uploaded_at',)
+    readonly_fields = ('uploaded_at', 'original_size', 'optimized_size')
 
 @admin.register(DocumentHistory)
-class DocumentHistoryAdmin(admin.ModelAdmin):
+class DocumentHistoryAdmin(ScalableAdmin):
     list_display = ('id', 'document', 'status', 'comment', 'created_at')
+    list_select_related = ('document',)
+    autocomplete_fields = ('document',)
     list_filter = ('status', 'created_at')
     search_fields = ('comment', 'document__document_type', 'document__interview__candidate__user__username')
     readonly_fields = ('created_at',)
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(ScalableAdmin):
     list_display = ('id', 'user', 'message', 'created_at', 'is_read')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
     list_filter = ('is_read', 'created_at')
     search_fields = ('message', 'user__email')
-    readonly_fields = ('created_at',)
\ No newline at end of file
+    readonly_fields = ('created_at',)
+
+@admin.register(StatusEvent)
+class StatusEventAdmin(ScalableAdmin):
+    # Журнал только для чтения: строки добавляются из кода и не редактируются
+    list_display = ('id', 'entity', 'object_id', 'field', 'from_value', 'to_value', 'stage', 'actor', 'created_at')
+    list_select_related = ('actor',)
+    list_filter = ('entity', 'stage', 'resume_type', 'created_at')
+    search_fields = ('=object_id', '=candidate_id')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
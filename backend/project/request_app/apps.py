@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class RequestAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'request_app'
+
+    def ready(self):
+        from django.conf import settings
+        from . import signals  # noqa: F401
+        if settings.REQUEST_PROFILING:
+            from .profiling import install_serializer_timing
+            install_serializer_timing()
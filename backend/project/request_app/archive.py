@@ -0,0 +1,64 @@
+from django.db import connection, transaction
+from .models import Notification, NotificationArchive, DocumentHistory, DocumentHistoryArchive
+
+# Пары «горячая таблица -> архив»; поля архива совпадают с исходными плюс archived_at
+ARCHIVED_MODELS = {
+    'notifications': (Notification, NotificationArchive),
+    'document_history': (DocumentHistory, DocumentHistoryArchive),
+}
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _move_batch_postgresql(model, archive_model, cutoff, batch_size):
+    # Один оператор: DELETE ... RETURNING передает строки прямо в INSERT архива
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(column) for column in _columns(model))
+    table = quote(model._meta.db_table)
+    sql = f'''
+        WITH moved AS (
+            DELETE FROM {table}
+            WHERE id IN (
+                SELECT id FROM {table} WHERE created_at < %s ORDER BY created_at LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {columns}
+        )
+        INSERT INTO {quote(archive_model._meta.db_table)} ({columns}, archived_at)
+        SELECT {columns}, now() FROM moved
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [cutoff, batch_size])
+        return cursor.rowcount
+
+
+def _move_batch(model, archive_model, cutoff, batch_size):
+    rows = list(
+        model.objects.filter(created_at__lt=cutoff).order_by('created_at')
+        .values(*[field.attname for field in model._meta.concrete_fields])[:batch_size]
+    )
+    if not rows:
+        return 0
+    archive_model.objects.bulk_create([archive_model(**row) for row in rows], ignore_conflicts=True)
+    model.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+def archive_batch(model, archive_model, cutoff, batch_size):
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            return _move_batch_postgresql(model, archive_model, cutoff, batch_size)
+        return _move_batch(model, archive_model, cutoff, batch_size)
+
+
+def purge_batch(archive_model, cutoff, batch_size):
+    ids = list(
+        archive_model.objects.filter(created_at__lt=cutoff).order_by('created_at')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    deleted, _ = archive_model.objects.filter(id__in=ids).delete()
+    return deleted
@@ -0,0 +1,74 @@
+import logging
+from urllib.parse import urlsplit
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+# Пакетное выполнение GET-запросов SPA (/api/batch/). Пользователь уже аутентифицирован
+# внешним запросом: вложенным запросам он передается через _force_auth_user, который DRF
+# учитывает вместо повторной проверки JWT. Вложенные представления вызываются напрямую,
+# минуя middleware, на том же потоке — значит, с тем же соединением с БД.
+# Заголовки условного запроса внешнего запроса во вложенные не передаются: у каждого свой ETag.
+
+
+class BatchError(ValueError):
+    pass
+
+
+def parse(payload, limit):
+    items = payload.get('requests') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise BatchError('Передайте непустой список requests')
+    if len(items) > limit:
+        raise BatchError(f'Не более {limit} запросов в пакете')
+    parsed = []
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            item = {'path': item}
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str) or not item['path'].startswith('/api/'):
+            raise BatchError(f'Запрос {position}: укажите path, начинающийся с /api/')
+        parsed.append((item.get('id', position), item['path']))
+    return parsed
+
+
+def _subrequest(request, url):
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = url.path
+    sub.META = {key: value for key, value in request.META.items() if not key.startswith(('HTTP_IF_', 'CONTENT_'))}
+    sub.META.update({'REQUEST_METHOD': 'GET', 'PATH_INFO': url.path, 'QUERY_STRING': url.query})
+    sub.GET = QueryDict(url.query)
+    sub.COOKIES = request.COOKIES
+    sub.user = request.user
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def execute(request, items):
+    results = []
+    for item_id, path in items:
+        url = urlsplit(path)
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            results.append({'id': item_id, 'status': 404, 'body': {'error': 'Маршрут не найден'}})
+            continue
+        if match.url_name == 'batch':
+            results.append({'id': item_id, 'status': 400, 'body': {'error': 'Вложенные пакеты не поддерживаются'}})
+            continue
+        sub = _subrequest(request, url)
+        sub.resolver_match = match
+        try:
+            response = match.func(sub, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception("Batch: ошибка при выполнении %s", path)
+            results.append({'id': item_id, 'status': 500, 'body': {'error': 'Внутренняя ошибка сервера'}})
+            continue
+        if not hasattr(response, 'data'):
+            # Выгрузки файлов и /metrics отдают не JSON — в пакет их не включить
+            results.append({'id': item_id, 'status': 400, 'body': {'error': 'Маршрут не поддерживает пакетный режим'}})
+            continue
+        results.append({'id': item_id, 'status': response.status_code, 'body': response.data})
+    return results
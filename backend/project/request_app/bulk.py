@@ -0,0 +1,129 @@
+import io
+from contextlib import contextmanager
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils import timezone
+
+
+def is_postgresql(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def concrete_fields(model):
+    return [field for field in model._meta.concrete_fields]
+
+
+def allocate_ids(model, count, using='default'):
+    # Резервирует диапазон первичных ключей в последовательности таблицы (только PostgreSQL)
+    table = model._meta.db_table
+    pk_column = model._meta.pk.column
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [table, pk_column, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _is_auto_timestamp(field):
+    return getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+
+
+def fill_timestamps(model, objs):
+    now = timezone.now()
+    fields = [field for field in concrete_fields(model) if _is_auto_timestamp(field)]
+    for obj in objs:
+        for field in fields:
+            if getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, now)
+
+
+@contextmanager
+def preserved_timestamps(model):
+    # bulk_create вызывает pre_save(add=True) и перезаписывает auto_now/auto_now_add,
+    # а при импорте исторических данных даты нужно сохранить
+    fields = [field for field in concrete_fields(model) if _is_auto_timestamp(field)]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_insert(model, objs, using='default'):
+    # Вставка пачки объектов через COPY ... FROM STDIN: без ORM, сигналов и save()
+    if not objs:
+        return 0
+    connection = connections[using]
+    fields = concrete_fields(model)
+    fill_timestamps(model, objs)
+    missing_pk = [obj for obj in objs if obj.pk is None]
+    if missing_pk:
+        for obj, pk in zip(missing_pk, allocate_ids(model, len(missing_pk), using)):
+            obj.pk = pk
+    buffer = io.StringIO()
+    for obj in objs:
+        values = [
+            field.get_db_prep_save(field.value_from_object(obj), connection)
+            for field in fields
+        ]
+        buffer.write(','.join(_copy_value(value) for value in values))
+        buffer.write('\n')
+    buffer.seek(0)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    sql = "COPY %s (%s) FROM STDIN WITH (FORMAT csv, NULL '\\N')" % (
+        connection.ops.quote_name(model._meta.db_table), columns
+    )
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(sql, buffer)
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+    return len(objs)
+
+
+def bulk_insert(model, objs, use_copy=False, batch_size=5000, using='default'):
+    # После вставки у объектов заполнены первичные ключи (RETURNING / nextval)
+    if use_copy and is_postgresql(using):
+        with transaction.atomic(using=using):
+            return copy_insert(model, objs, using=using)
+    fill_timestamps(model, objs)
+    with preserved_timestamps(model):
+        model.objects.using(using).bulk_create(objs, batch_size=batch_size)
+    return len(objs)
+
+
+def reset_sequences(models, using='default'):
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def build_instance(model, row):
+    # Преобразует строку CSV/JSONL (ключи — имена полей или attname) в экземпляр модели
+    values = {}
+    for field in concrete_fields(model):
+        if field.attname in row:
+            raw = row[field.attname]
+        elif field.name in row:
+            raw = row[field.name]
+        else:
+            continue
+        if raw == '' and field.null:
+            raw = None
+        values[field.attname] = field.to_python(raw) if raw is not None else None
+    return model(**values)
@@ -0,0 +1,45 @@
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+# Условный GET для списков: валидатор — max(updated_at) и count по тому же queryset.
+# Один агрегирующий запрос по индексу вместо выборки и сериализации; при совпадении
+# If-None-Match / If-Modified-Since отдается 304. count ловит удаления, max — изменения.
+# Встроенные в ответ связи (кандидат, сотрудник, пользователь) тоже входят в max: их поля
+# меняются без изменения самой строки (например, has_successful_interview при найме).
+
+RESUME_RELATED = ('candidate__user',)
+INTERVIEW_RELATED = ('candidate', 'candidate__user', 'employee', 'employee__user')
+DOCUMENT_RELATED = ('interview', *(f'interview__{path}' for path in INTERVIEW_RELATED))
+
+
+def list_validator(request, queryset, related=()):
+    # related — связанные модели, попадающие в ответ (например interview у документа)
+    aggregates = {'count': Count('pk'), 'updated_at': Max('updated_at')}
+    for path in related:
+        aggregates[path.replace('__', '_') + '_updated_at'] = Max(f'{path}__updated_at')
+    state = queryset.order_by().aggregate(**aggregates)
+    last_modified = max((value for key, value in state.items() if key != 'count' and value), default=None)
+    # Форма ответа (?fields=, ?expand=) и пользователь — часть представления
+    key = '|'.join([
+        str(request.user.pk), request.get_full_path(), str(state['count']),
+        *(value.isoformat() if value else '' for key, value in state.items() if key != 'count'),
+    ])
+    etag = quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+    return etag, last_modified
+
+
+def not_modified(request, etag, last_modified):
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Ответ персональный: кэшируется только в браузере и всегда перепроверяется
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
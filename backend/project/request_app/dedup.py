@@ -0,0 +1,164 @@
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from .models import Resume, ResumeSignature, ResumeBucket
+
+# Поиск почти одинаковых резюме без попарного сравнения.
+# Текст режется на шинглы (тройки слов), MinHash из NUM_PERM хеш-функций вида
+# (a * x + b) >> 32 дает сигнатуру, доля совпавших позиций которой оценивает сходство
+# Жаккара. Сигнатура делится на BANDS полос по ROWS значений; резюме с совпадением
+# хотя бы одной полосы попадают в одну LSH-корзину — это кандидаты, которые затем
+# проверяются по сигнатуре. Порог срабатывания примерно (1 / BANDS) ** (1 / ROWS).
+# Дополнительно ищутся совпадения нормализованного телефона и ФИО.
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+KEY_MATCH_LIMIT = 200
+
+_rng = np.random.default_rng(20240501)
+_A = _rng.integers(1, 1 << 32, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_EMPTY = np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+
+_WORD = re.compile(r'\w+')
+
+
+def _normalize(text):
+    return (text or '').lower().replace('ё', 'е')
+
+
+def shingles(text):
+    words = _WORD.findall(_normalize(text))
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    items = shingles(text)
+    if not items:
+        return _EMPTY.copy()
+    values = np.fromiter((zlib.crc32(item.encode()) for item in items), dtype=np.uint64, count=len(items))
+    # Переполнение uint64 здесь намеренное: multiply-shift хеширование
+    with np.errstate(over='ignore'):
+        hashed = (np.outer(values, _A) + _B) >> np.uint64(32)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def similarity(left, right):
+    return float(np.count_nonzero(left == right)) / NUM_PERM
+
+
+def phone_key(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    # +7XXXXXXXXXX и 8XXXXXXXXXX — один номер
+    return digits[-10:] if len(digits) >= 10 else digits
+
+
+def name_key(last_name, first_name, patronymic):
+    return ' '.join(part for part in (_normalize(last_name).strip(), _normalize(first_name).strip(), _normalize(patronymic).strip()) if part)
+
+
+def compute_rows(rows):
+    # Чистая функция для пула процессов: строки резюме -> (id, сигнатура, корзины, телефон, ФИО)
+    result = []
+    for row in rows:
+        signature = minhash(row['content'])
+        result.append((
+            row['id'], signature.tobytes(), band_keys(signature) if row['content'] else [],
+            phone_key(row['phone_number']),
+            name_key(row['candidate__user__last_name'], row['candidate__user__first_name'], row['candidate__user__patronymic']),
+        ))
+    return result
+
+
+SOURCE_VALUES = (
+    'id', 'content', 'phone_number',
+    'candidate__user__last_name', 'candidate__user__first_name', 'candidate__user__patronymic',
+)
+
+
+def store(computed):
+    ids = [item[0] for item in computed]
+    with transaction.atomic():
+        ResumeSignature.objects.filter(resume_id__in=ids).delete()
+        ResumeBucket.objects.filter(resume_id__in=ids).delete()
+        ResumeSignature.objects.bulk_create([
+            ResumeSignature(resume_id=resume_id, minhash=signature, phone_key=phone, name_key=name)
+            for resume_id, signature, _, phone, name in computed
+        ], batch_size=1000)
+        ResumeBucket.objects.bulk_create([
+            ResumeBucket(resume_id=resume_id, band=band, key=key)
+            for resume_id, _, keys, _, _ in computed for band, key in enumerate(keys)
+        ], batch_size=5000)
+
+
+def index_resumes(resumes):
+    rows = list(resumes.values(*SOURCE_VALUES))
+    if rows:
+        store(compute_rows(rows))
+
+
+def index_resume(resume_id):
+    index_resumes(Resume.objects.filter(pk=resume_id))
+
+
+def find_duplicates(resume):
+    try:
+        own = resume.signature
+    except ResumeSignature.DoesNotExist:
+        index_resume(resume.pk)
+        own = ResumeSignature.objects.get(pk=resume.pk)
+    signature = np.frombuffer(bytes(own.minhash), dtype=np.uint32)
+    keys = band_keys(signature) if resume.content else []
+
+    similarities = {}
+    reasons = defaultdict(list)
+    # Одна выборка по индексу (band, key) сразу по всем полосам
+    if keys:
+        buckets = Q()
+        for band, key in enumerate(keys):
+            buckets |= Q(band=band, key=key)
+        content_ids = ResumeBucket.objects.filter(buckets).values_list('resume_id', flat=True)
+        for row in ResumeSignature.objects.filter(resume_id__in=content_ids).values('resume_id', 'minhash'):
+            score = similarity(signature, np.frombuffer(bytes(row['minhash']), dtype=np.uint32))
+            if score >= settings.DEDUP_SIMILARITY_THRESHOLD:
+                similarities[row['resume_id']] = round(score, 3)
+                reasons[row['resume_id']].append('content')
+    for reason, field, value in (('phone', 'phone_key', own.phone_key), ('name', 'name_key', own.name_key)):
+        if value:
+            # Распространенные ФИО могут совпадать у сотен людей — берется ограниченное число
+            for resume_id in ResumeSignature.objects.filter(**{field: value}).values_list('resume_id', flat=True)[:KEY_MATCH_LIMIT]:
+                reasons[resume_id].append(reason)
+
+    # Дубли ищутся среди других учетных записей: повторные резюме того же кандидата не в счет
+    others = Resume.objects.filter(pk__in=list(reasons)).exclude(candidate_id=resume.candidate_id)
+    result = []
+    for row in others.values('id', 'candidate_id', 'candidate__user__email', 'status', 'resume_type', 'created_at'):
+        result.append({
+            'resume': row['id'],
+            'candidate': row['candidate_id'],
+            'email': row['candidate__user__email'],
+            'status': row['status'],
+            'resume_type': row['resume_type'],
+            'created_at': row['created_at'],
+            'similarity': similarities.get(row['id'], 0.0),
+            'reasons': reasons[row['id']],
+        })
+    result.sort(key=lambda item: (-len(item['reasons']), -item['similarity'], item['resume']))
+    return result[:settings.DEDUP_MAX_RESULTS]
@@ -0,0 +1,137 @@
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+
+class _StreamBuffer(io.RawIOBase):
+    # Приёмник без seek(): zipfile пишет в него, генератор забирает накопленные байты
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries, compression=zipfile.ZIP_STORED):
+    # entries: итерируемое из (имя, итерируемое чанков bytes, размер или None).
+    # Размер и CRC записываются в data descriptor после данных, поэтому архив
+    # собирается на лету без временных файлов и без буферизации содержимого.
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=compression, allowZip64=True) as archive:
+        for name, chunks, size in entries:
+            info = zipfile.ZipInfo(name)
+            info.compress_type = compression
+            if size is not None:
+                info.file_size = size
+            with archive.open(info, mode='w', force_zip64=size is None) as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            data = buffer.pop()
+            if data:
+                yield data
+    yield buffer.pop()
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    # BOM нужен, чтобы Excel распознал UTF-8
+    yield ('\ufeff' + writer.writerow(header)).encode('utf-8')
+    for row in rows:
+        yield writer.writerow(row).encode('utf-8')
+
+
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_row(values):
+    cells = ''.join(
+        '<c t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>'
+        % escape(_ILLEGAL_XML_CHARS.sub('', '' if value is None else str(value)))
+        for value in values
+    )
+    return f'<row>{cells}</row>'
+
+
+def _xlsx_sheet(header, rows, batch=500):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        + _xlsx_row(header)
+    ).encode('utf-8')
+    pending = []
+    for row in rows:
+        pending.append(_xlsx_row(row))
+        if len(pending) >= batch:
+            yield ''.join(pending).encode('utf-8')
+            pending = []
+    yield (''.join(pending) + '</sheetData></worksheet>').encode('utf-8')
+
+
+def stream_xlsx(header, rows, sheet_name='Отчет'):
+    # Минимальная книга SpreadsheetML со строками inlineStr: лист пишется построчно
+    # прямо в поток ZIP, без openpyxl и без удержания строк в памяти
+    def part(text):
+        data = text.encode('utf-8')
+        return [data], len(data)
+
+    entries = [
+        ('[Content_Types].xml', *part(_XLSX_CONTENT_TYPES)),
+        ('_rels/.rels', *part(_XLSX_ROOT_RELS)),
+        ('xl/workbook.xml', *part(_XLSX_WORKBOOK.format(name=escape(sheet_name)))),
+        ('xl/_rels/workbook.xml.rels', *part(_XLSX_WORKBOOK_RELS)),
+        ('xl/worksheets/sheet1.xml', _xlsx_sheet(header, rows), None),
+    ]
+    return stream_zip(entries, compression=zipfile.ZIP_DEFLATED)
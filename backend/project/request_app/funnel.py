@@ -0,0 +1,192 @@
+import math
+from bisect import bisect_left
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import StatusEvent, FunnelDaily, RollupCursor, ResumeTypeChoices
+
+# Журнал статусов и воронка найма.
+# Точки записи (представления и планировщик) вызывают record/status_event, журнал только дополняется.
+# rollup переносит новые события в дневные свертки FunnelDaily по курсору RollupCursor:
+# каждое событие учитывается ровно один раз, отчет читает сотни строк сверток, а не журнал.
+# Длительности этапов хранятся гистограммой с логарифмическими корзинами (шаг 2^(1/4) по часам) —
+# такие гистограммы складываются, и медиана за любой период считается с точностью около 10%.
+
+FUNNEL_CURSOR = 'funnel'
+STAGES = ('submitted', 'accepted', 'interviewed', 'succeeded', 'hired')
+PREVIOUS_STAGE = {'accepted': 'submitted', 'interviewed': 'accepted', 'succeeded': 'interviewed', 'hired': 'succeeded'}
+BUCKETS_PER_DOUBLING = 4
+MAX_BUCKET = 80
+
+
+def vacancy_of(obj):
+    return (obj.job_type if obj.resume_type == ResumeTypeChoices.JOB else obj.practice_type) or ''
+
+
+def stage_of(entity, field, from_value, to_value):
+    if entity == 'resume' and field == 'status':
+        if to_value == 'PENDING' and not from_value:
+            return 'submitted'
+        if to_value == 'ACCEPTED':
+            return 'accepted'
+    if entity == 'interview':
+        if field == 'status' and to_value == 'COMPLETED':
+            return 'interviewed'
+        if field == 'result' and to_value == 'SUCCESS':
+            return 'succeeded'
+        if field == 'hire':
+            return 'hired'
+    return ''
+
+
+def status_event(entity, obj, field, from_value, to_value, actor=None):
+    from_value = from_value or ''
+    return StatusEvent(
+        entity=entity, object_id=obj.pk, candidate_id=obj.candidate_id, field=field,
+        from_value=from_value, to_value=to_value, stage=stage_of(entity, field, from_value, to_value),
+        resume_type=obj.resume_type, vacancy=vacancy_of(obj),
+        actor=actor if actor is not None and actor.is_authenticated else None,
+    )
+
+
+def record(entity, obj, changes, actor=None):
+    # changes: {поле: (было, стало)}; неизмененные поля пропускаются
+    events = [
+        status_event(entity, obj, field, old, new, actor)
+        for field, (old, new) in changes.items() if old != new
+    ]
+    if events:
+        StatusEvent.objects.bulk_create(events)
+    return events
+
+
+def bucket_of(seconds):
+    hours = max(seconds, 0) / 3600
+    return min(int(BUCKETS_PER_DOUBLING * math.log2(1 + hours)), MAX_BUCKET)
+
+
+def _bucket_bounds(bucket):
+    return 2 ** (bucket / BUCKETS_PER_DOUBLING) - 1, 2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING) - 1
+
+
+def merge_histograms(target, histogram):
+    for bucket, count in histogram.items():
+        target[bucket] = target.get(bucket, 0) + count
+    return target
+
+
+def median_hours(histogram):
+    total = sum(histogram.values())
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    for bucket in sorted(histogram, key=int):
+        count = histogram[bucket]
+        if seen + count >= half:
+            low, high = _bucket_bounds(int(bucket))
+            return round(low + (high - low) * (half - seen) / count, 1)
+        seen += count
+    return None
+
+
+def _previous_times(events):
+    # Время предыдущего этапа для каждого события пачки — одним запросом на пачку
+    candidates = {event.candidate_id for event in events if event.stage in PREVIOUS_STAGE}
+    if not candidates:
+        return {}
+    stages = {PREVIOUS_STAGE[event.stage] for event in events if event.stage in PREVIOUS_STAGE}
+    journeys = {}
+    rows = (
+        StatusEvent.objects.filter(candidate_id__in=candidates, stage__in=stages, id__lt=events[-1].id)
+        .order_by('id').values_list('id', 'candidate_id', 'resume_type', 'vacancy', 'stage', 'created_at')
+    )
+    for event_id, candidate_id, resume_type, vacancy, stage, created_at in rows:
+        journey = journeys.setdefault((candidate_id, resume_type, vacancy, stage), ([], []))
+        journey[0].append(event_id)
+        journey[1].append(created_at)
+    previous = {}
+    for event in events:
+        stage = PREVIOUS_STAGE.get(event.stage)
+        journey = journeys.get((event.candidate_id, event.resume_type, event.vacancy, stage))
+        if journey:
+            position = bisect_left(journey[0], event.id)
+            if position:
+                previous[event.id] = journey[1][position - 1]
+    return previous
+
+
+def rollup_batch(batch_size=5000):
+    # Свежие события (моложе FUNNEL_ROLLUP_LAG_SECONDS) откладываются: транзакция, получившая
+    # меньший id, могла еще не зафиксироваться, и курсор перескочил бы через ее событие
+    horizon = timezone.now() - timedelta(seconds=settings.FUNNEL_ROLLUP_LAG_SECONDS)
+    RollupCursor.objects.get_or_create(name=FUNNEL_CURSOR)
+    with transaction.atomic():
+        cursor = RollupCursor.objects.select_for_update(skip_locked=True).filter(name=FUNNEL_CURSOR).first()
+        if cursor is None:
+            # Свертку уже ведет другой процесс
+            return 0
+        events = list(
+            StatusEvent.objects.filter(id__gt=cursor.last_event_id, created_at__lt=horizon)
+            .exclude(stage='').order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+        previous = _previous_times(events)
+        deltas = {}
+        for event in events:
+            key = (timezone.localdate(event.created_at), event.resume_type, event.vacancy)
+            delta = deltas.setdefault(key, {'counts': dict.fromkeys(STAGES, 0), 'durations': {}})
+            delta['counts'][event.stage] += 1
+            if event.id in previous:
+                bucket = str(bucket_of((event.created_at - previous[event.id]).total_seconds()))
+                histogram = delta['durations'].setdefault(event.stage, {})
+                histogram[bucket] = histogram.get(bucket, 0) + 1
+        existing = {
+            (row.day, row.resume_type, row.vacancy): row
+            for row in FunnelDaily.objects.filter(day__in={key[0] for key in deltas})
+        }
+        changed, created = [], []
+        for key, delta in deltas.items():
+            row = existing.get(key)
+            if row is None:
+                row = FunnelDaily(day=key[0], resume_type=key[1], vacancy=key[2], durations={})
+                created.append(row)
+            else:
+                changed.append(row)
+            for stage, count in delta['counts'].items():
+                setattr(row, stage, getattr(row, stage) + count)
+            for stage, histogram in delta['durations'].items():
+                merge_histograms(row.durations.setdefault(stage, {}), histogram)
+        FunnelDaily.objects.bulk_create(created)
+        FunnelDaily.objects.bulk_update(changed, [*STAGES, 'durations'])
+        cursor.last_event_id = events[-1].id
+        cursor.save(update_fields=['last_event_id', 'updated_at'])
+    return len(events)
+
+
+def funnel_report(date_from, date_to, resume_type=None, by_day=False):
+    queryset = FunnelDaily.objects.filter(day__gte=date_from, day__lte=date_to)
+    if resume_type:
+        queryset = queryset.filter(resume_type=resume_type)
+    groups = {}
+    for row in queryset.order_by('day', 'resume_type', 'vacancy'):
+        key = (row.day, row.resume_type, row.vacancy) if by_day else (row.resume_type, row.vacancy)
+        group = groups.setdefault(key, {'counts': dict.fromkeys(STAGES, 0), 'durations': {}})
+        for stage in STAGES:
+            group['counts'][stage] += getattr(row, stage)
+        for stage, histogram in row.durations.items():
+            merge_histograms(group['durations'].setdefault(stage, {}), histogram)
+    results = []
+    for key, group in groups.items():
+        item = {'day': key[0]} if by_day else {}
+        item.update({
+            'resume_type': key[-2],
+            'vacancy': key[-1],
+            **group['counts'],
+            'median_hours': {stage: median_hours(group['durations'].get(stage, {})) for stage in PREVIOUS_STAGE},
+        })
+        results.append(item)
+    cursor = RollupCursor.objects.filter(name=FUNNEL_CURSOR).values_list('updated_at', flat=True).first()
+    return {'date_from': date_from, 'date_to': date_to, 'updated_at': cursor, 'results': results}
@@ -0,0 +1,26 @@
+from .models import (
+    ResumeStatusChoices, ResumeTypeChoices, EducationChoices, PracticeTypeChoices, JobTypeChoices,
+    InterviewStatusChoices, InterviewResultChoices, DocumentStatusChoices, NotificationTypeChoices
+)
+
+
+def choice_labels(choices, extra=None):
+    # Таблица «значение -> подпись», построенная один раз из TextChoices
+    labels = {value: str(label) for value, label in choices.choices}
+    labels.update(extra or {})
+    return labels
+
+
+RESUME_STATUS_LABELS = choice_labels(ResumeStatusChoices)
+RESUME_TYPE_LABELS = choice_labels(ResumeTypeChoices)
+EDUCATION_LABELS = choice_labels(EducationChoices)
+PRACTICE_TYPE_LABELS = choice_labels(PracticeTypeChoices)
+JOB_TYPE_LABELS = choice_labels(JobTypeChoices)
+INTERVIEW_STATUS_LABELS = choice_labels(InterviewStatusChoices)
+INTERVIEW_RESULT_LABELS = choice_labels(InterviewResultChoices)
+DOCUMENT_STATUS_LABELS = choice_labels(DocumentStatusChoices)
+NOTIFICATION_TYPE_LABELS = choice_labels(NotificationTypeChoices)
+
+# Подписи с заглушками для пустых значений, как их отдает API
+EDUCATION_DISPLAY = choice_labels(EducationChoices, {'': 'Не указано'})
+PRACTICE_TYPE_DISPLAY = choice_labels(PracticeTypeChoices, {None: '-'})
@@ -0,0 +1,202 @@
+from django.utils import timezone
+from .labels import (
+    RESUME_STATUS_LABELS, EDUCATION_DISPLAY, PRACTICE_TYPE_DISPLAY, JOB_TYPE_LABELS, DOCUMENT_STATUS_LABELS
+)
+from .serializers import document_link
+
+# Быстрый путь для списков: строки из .values() превращаются в словари той же формы,
+# что отдают ResumeSerializer / InterviewSerializer / DocumentSerializer, но без
+# интроспекции полей DRF и без создания экземпляров моделей.
+#
+# Форма ответа описана один раз (Shape) и компилируется под запрос: ?fields= оставляет
+# поля верхнего уровня, ?expand= раскрывает связи (вложенные через точку:
+# expand=interview,interview.candidate), нераскрытая связь отдается как id.
+# Без обоих параметров раскрыто все, как в сериализаторах. В SELECT попадают только
+# столбцы и JOIN-ы выбранной формы.
+
+
+def _datetime(value):
+    # То же, что DateTimeField.to_representation (ISO 8601 в текущей зоне), без накладных расходов поля
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def _date(value):
+    return value.isoformat() if value is not None else None
+
+
+def _or_empty(value):
+    return value or ''
+
+
+def _file_url(request, name, document_id):
+    return document_link(request, document_id) if name else None
+
+
+class ShapeError(ValueError):
+    pass
+
+
+class Field:
+    # lookups — столбцы из .values() (по умолчанию имя поля), build — преобразование значений
+    def __init__(self, *lookups, build=None, with_request=False):
+        self.lookups = lookups
+        self.build = build
+        self.with_request = with_request
+
+
+class Relation:
+    # embedded — связь всегда раскрыта и не принимается в expand (например, user внутри кандидата)
+    def __init__(self, path, shape, embedded=False):
+        self.path = path
+        self.shape = shape
+        self.embedded = embedded
+
+
+class Shape:
+    def __init__(self, **members):
+        self.members = members
+
+    def relations(self):
+        return {name for name, member in self.members.items() if isinstance(member, Relation) and not member.embedded}
+
+    def validate(self, fields, expand, path=''):
+        if fields is not None:
+            unknown = set(fields) - set(self.members)
+            if unknown:
+                raise ShapeError(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+        for item in expand or ():
+            name, _, rest = item.partition('.')
+            if name not in self.relations():
+                raise ShapeError(f'Связь {path}{name} не может быть раскрыта')
+            if rest:
+                self.members[name].shape.validate(None, [rest], f'{path}{name}.')
+
+    def compile(self, fields=None, expand=None, request=None, prefix=''):
+        # expand=None — все связи раскрыты (форма по умолчанию)
+        lookups = []
+        parts = []
+        for name, member in self.members.items():
+            if fields is not None and name not in fields:
+                continue
+            if isinstance(member, Relation):
+                # expand=interview.candidate раскрывает и саму interview
+                nested = None if expand is None else [
+                    item.split('.', 1)[1] for item in expand if item.startswith(name + '.')
+                ]
+                if member.embedded or expand is None or name in expand or nested:
+                    nested_lookups, build = member.shape.compile(None, nested, request, f'{prefix}{member.path}__')
+                    lookups += nested_lookups
+                    parts.append((name, build))
+                else:
+                    key = f'{prefix}{member.path}_id'
+                    lookups.append(key)
+                    parts.append((name, lambda row, key=key: row[key]))
+                continue
+            keys = [prefix + lookup for lookup in member.lookups or (name,)]
+            lookups += keys
+            build = member.build
+            if build is None:
+                parts.append((name, lambda row, key=keys[0]: row[key]))
+            elif member.with_request:
+                parts.append((name, lambda row, keys=keys, build=build: build(request, *[row[key] for key in keys])))
+            elif len(keys) == 1:
+                parts.append((name, lambda row, key=keys[0], build=build: build(row[key])))
+            else:
+                parts.append((name, lambda row, keys=keys, build=build: build(*[row[key] for key in keys])))
+
+        def build_row(row):
+            return {name: part(row) for name, part in parts}
+
+        return lookups, build_row
+
+    def rows(self, queryset, fields=None, expand=None, request=None):
+        self.validate(fields, expand)
+        lookups, build_row = self.compile(fields, expand, request)
+        return [build_row(row) for row in queryset.values(*dict.fromkeys(lookups))]
+
+
+USER_SHAPE = Shape(
+    id=Field(), email=Field(), first_name=Field(), last_name=Field(), patronymic=Field(), gender=Field(),
+)
+
+CANDIDATE_SHAPE = Shape(
+    id=Field(),
+    user=Relation('user', USER_SHAPE, embedded=True),
+    date_of_birth=Field(build=_date),
+    has_successful_interview=Field(),
+)
+
+EMPLOYEE_SHAPE = Shape(
+    id=Field(),
+    user=Relation('user', USER_SHAPE, embedded=True),
+    department=Field(),
+    position=Field(),
+    hire_date=Field(build=_date),
+)
+
+# ResumeSerializer.get_candidate отдает сокращенного кандидата
+RESUME_CANDIDATE_SHAPE = Shape(
+    id=Field(),
+    user=Relation('user', Shape(
+        id=Field(), email=Field(),
+        last_name=Field(build=_or_empty), first_name=Field(build=_or_empty), patronymic=Field(build=_or_empty),
+    ), embedded=True),
+)
+
+RESUME_SHAPE = Shape(
+    id=Field(),
+    content=Field(),
+    education=Field(),
+    education_display=Field('education', build=lambda value: EDUCATION_DISPLAY.get(value, value)),
+    phone_number=Field(),
+    status=Field(),
+    status_display=Field('status', build=lambda value: RESUME_STATUS_LABELS.get(value, value)),
+    created_at=Field(build=_datetime),
+    candidate=Relation('candidate', RESUME_CANDIDATE_SHAPE),
+    comment=Field(),
+    resume_type=Field(),
+    practice_type=Field(),
+    practice_type_display=Field('practice_type', build=lambda value: PRACTICE_TYPE_DISPLAY.get(value, value)),
+    job_type=Field(),
+    job_type_display=Field('job_type', build=lambda value: JOB_TYPE_LABELS.get(value, '')),
+)
+
+INTERVIEW_SHAPE = Shape(
+    id=Field(),
+    candidate=Relation('candidate', CANDIDATE_SHAPE),
+    employee=Relation('employee', EMPLOYEE_SHAPE),
+    scheduled_at=Field(build=_datetime),
+    status=Field(),
+    result=Field(),
+    comment=Field(),
+    resume_type=Field(),
+    practice_type=Field(),
+    practice_type_display=Field('practice_type', build=lambda value: PRACTICE_TYPE_DISPLAY.get(value, '')),
+    job_type=Field(),
+    job_type_display=Field('job_type', build=lambda value: JOB_TYPE_LABELS.get(value, '')),
+)
+
+DOCUMENT_SHAPE = Shape(
+    id=Field(),
+    interview=Relation('interview', INTERVIEW_SHAPE),
+    file_path=Field('file_path', 'id', build=_file_url, with_request=True),
+    document_type=Field(),
+    uploaded_at=Field(build=_datetime),
+    status=Field(),
+    status_display=Field('status', build=lambda value: DOCUMENT_STATUS_LABELS.get(value, value)),
+    comment=Field(),
+)
+
+NOTIFICATION_SHAPE = Shape(
+    id=Field(),
+    user=Field('user_id'),
+    message=Field(),
+    is_read=Field(),
+    created_at=Field(build=_datetime),
+    sent_to_email=Field(),
+    type=Field(),
+)
+
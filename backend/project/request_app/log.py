@@ -0,0 +1,167 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import orjson
+from . import metrics
+
+# Логирование без блокировки запросов.
+# QueueHandler только кладет запись в ограниченную очередь; форматирование, маскирование
+# и запись в поток делает фоновый QueueListener. При переполнении записи отбрасываются
+# (счетчик dropped и метрика log_records_dropped_total), а не блокируют воркер. Фильтры обработчика работают в потоке запроса:
+# RequestContextFilter добавляет id запроса, SamplingFilter прореживает INFO/DEBUG
+# шумных логгеров — решение принимается по id запроса, поэтому строки одного запроса
+# сохраняются или отбрасываются вместе.
+
+request_id = ContextVar('request_id', default='')
+
+# Стандартные атрибуты LogRecord; остальное — поля, переданные через extra
+RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+REDACTED_FIELDS = {'password', 'password2', 'token', 'access', 'refresh', 'authorization', 'data', 'file', 'file_path', 'content', 'phone_number'}
+REDACTED = '[скрыто]'
+
+PATTERNS = [
+    # Адреса почты: первая буква и домен сохраняются
+    (re.compile(r'([A-Za-z0-9])[A-Za-z0-9._%+-]*@([A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+)'), r'\1***@\2'),
+    (re.compile(r'(?<![\w+])(?:\+7|8)[\s(-]*\d{3}[\s)-]*\d{3}[\s-]*\d{2}[\s-]*\d{2}(?!\w)'), '[телефон]'),
+    (re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]+'), '[токен]'),
+    (re.compile(r'(Bearer\s+)\S+', re.IGNORECASE), r'\1[токен]'),
+    # Поля в repr словарей и QueryDict: {'password': '...'}
+    (re.compile(r"""(['"](?:password2?|token|access|refresh)['"]\s*:\s*\[?)(['"])(?:(?!\2).)*\2"""), rf"\1'{REDACTED}'"),
+]
+
+
+def redact(text):
+    for pattern, replacement in PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _extra(record):
+    extra = {}
+    for key, value in vars(record).items():
+        if key in RECORD_ATTRS or key.startswith('_'):
+            continue
+        if key.lower() in REDACTED_FIELDS:
+            value = REDACTED
+        elif isinstance(value, str):
+            value = redact(value)
+        extra[key] = value
+    return extra
+
+
+class RequestContextFilter(logging.Filter):
+    def filter(self, record):
+        # django.request пишет ответы 4xx/5xx уже после выхода из middleware — id берется из запроса
+        record.request_id = request_id.get() or getattr(getattr(record, 'request', None), 'id', '')
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # rates: {имя логгера: доля сохраняемых записей}; действует на дочерние логгеры и уровни до INFO
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = sorted((rates or {}).items(), key=lambda item: -len(item[0]))
+
+    def rate_for(self, name):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return rate
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1:
+            return True
+        key = getattr(record, 'request_id', '') or request_id.get()
+        if not key:
+            return random.random() < rate
+        return zlib.crc32(key.encode()) % 10000 < rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        message = record.getMessage()
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': redact(message),
+        }
+        if getattr(record, 'request_id', ''):
+            entry['request_id'] = record.request_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = redact(record.exc_text)
+        extra = _extra(record)
+        if extra:
+            entry['extra'] = extra
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = ''
+        return redact(super().format(record))
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    # Собственный слушатель с обработчиком вывода; dictConfig в Python 3.11 не умеет
+    # передавать QueueHandler другие обработчики по имени
+    def __init__(self, json=True, queue_size=10000, stream=None):
+        # SimpleQueue реализована на C и заметно дешевле queue.Queue; граница проверяется по qsize
+        super().__init__(queue.SimpleQueue())
+        self.queue_size = queue_size
+        self.dropped = 0
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if json else TextFormatter())
+        self.listener = logging.handlers.QueueListener(self.queue, output, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.stop)
+        # После fork (gunicorn --preload) поток слушателя в дочернем процессе не существует
+        os.register_at_fork(after_in_child=self._restart)
+
+    def _restart(self):
+        self.queue = queue.SimpleQueue()
+        self.listener.queue = self.queue
+        self.listener._thread = None
+        self.listener.start()
+
+    def stop(self):
+        # Дописать очередь при завершении процесса
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def prepare(self, record):
+        # Сообщение и трассировка фиксируются в момент вызова: аргументы могут измениться позже,
+        # а исключение нельзя передать между потоками после выхода из except
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue_size and self.queue.qsize() >= self.queue_size:
+            self.dropped += 1
+            metrics.LOG_RECORDS_DROPPED.inc()
+            return
+        self.queue.put_nowait(record)
@@ -0,0 +1,51 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from request_app.archive import ARCHIVED_MODELS, archive_batch, purge_batch
+from request_app.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые уведомления и историю документов в архивные таблицы и очищает архив'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.HISTORY_RETENTION_DAYS,
+                            help='Записи старше указанного числа дней переносятся в архив')
+        parser.add_argument('--purge-days', type=int, default=settings.ARCHIVE_RETENTION_DAYS,
+                            help='Архивные записи старше указанного числа дней удаляются (0 — не удалять)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--only', choices=sorted(ARCHIVED_MODELS) + ['tombstones'], help='Обработать только одну таблицу')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        cutoff = now - timedelta(days=options['days'])
+        purge_cutoff = now - timedelta(days=options['purge_days']) if options['purge_days'] else None
+        for name, (model, archive_model) in ARCHIVED_MODELS.items():
+            if options['only'] and options['only'] != name:
+                continue
+            # Небольшие пачки в отдельных транзакциях не держат долгих блокировок
+            moved = 0
+            while True:
+                count = archive_batch(model, archive_model, cutoff, options['batch_size'])
+                moved += count
+                if count < options['batch_size']:
+                    break
+            purged = 0
+            if purge_cutoff:
+                while True:
+                    count = purge_batch(archive_model, purge_cutoff, options['batch_size'])
+                    purged += count
+                    if count < options['batch_size']:
+                        break
+            self.stdout.write(self.style.SUCCESS(f'{name}: перенесено в архив {moved}, удалено из архива {purged}'))
+        if not options['only'] or options['only'] == 'tombstones':
+            # Надгробия нужны только клиентам с токеном синхронизации моложе срока хранения
+            tombstone_cutoff = now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+            purged = 0
+            while True:
+                count = purge_tombstones(tombstone_cutoff, options['batch_size'])
+                purged += count
+                if count < options['batch_size']:
+                    break
+            self.stdout.write(self.style.SUCCESS(f'tombstones: удалено {purged}'))
@@ -0,0 +1,137 @@
+import logging
+import tempfile
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from request_app.log import JsonFormatter, QueueHandler, RequestContextFilter, SamplingFilter, request_id
+from request_app.listing import RESUME_SHAPE, INTERVIEW_SHAPE, DOCUMENT_SHAPE
+from request_app.models import User, Candidate, Employee, Resume, Interview, Document
+from request_app.renderers import ORJSONRenderer
+from request_app.serializers import ResumeSerializer, InterviewSerializer, DocumentSerializer
+
+
+def _model_values(obj, names):
+    # Строка в формате .values(): обход связей по «__» на несохраненных объектах
+    row = {}
+    for name in names:
+        value = obj
+        for part in name.split('__'):
+            value = getattr(value, part)
+        row[name] = value.name if hasattr(value, 'storage') else value
+    return row
+
+
+def build_fixtures(count):
+    now = timezone.now()
+    employee = Employee(
+        id=1, department='Отдел кадров', position='Методолог', hire_date=date(2020, 1, 1),
+        user=User(id=1, email='employee@example.com', first_name='Анна', last_name='Петрова', patronymic='Сергеевна', gender='FEMALE'),
+    )
+    resumes, interviews, documents = [], [], []
+    for i in range(count):
+        user = User(id=i + 2, email=f'user{i}@example.com', first_name='Иван', last_name='Иванов', patronymic='Иванович', gender='MALE')
+        candidate = Candidate(id=i + 1, user=user, date_of_birth=date(2000, 1, 1), has_successful_interview=True)
+        resumes.append(Resume(
+            id=i + 1, candidate=candidate, content='Python, Django, PostgreSQL', education='HIGHER',
+            phone_number='+79990000000', status='ACCEPTED', created_at=now, resume_type='JOB', job_type='PROGRAMMER',
+        ))
+        interview = Interview(
+            id=i + 1, candidate=candidate, employee=employee, scheduled_at=now + timedelta(days=1),
+            status='COMPLETED', result='SUCCESS', resume_type='JOB', job_type='PROGRAMMER',
+        )
+        interviews.append(interview)
+        documents.append(Document(
+            id=i + 1, interview=interview, document_type='Паспорт', file_path=f'candidate_{candidate.id}/passport.pdf',
+            uploaded_at=now, status='ACCEPTED',
+        ))
+    return resumes, interviews, documents
+
+
+SUITES = ['serializers', 'logging']
+
+
+def best_of(repeat, func):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = 'Микробенчмарки горячих путей (сериализация списков, рендеринг JSON, логирование)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('suites', nargs='*', help=f'Наборы: {", ".join(SUITES)} (по умолчанию все)')
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        unknown = set(options['suites']) - set(SUITES)
+        if unknown:
+            raise CommandError(f'Неизвестные наборы: {", ".join(sorted(unknown))}')
+        for suite in options['suites'] or SUITES:
+            getattr(self, f'bench_{suite}')(options['rows'], options['repeat'])
+
+    def report(self, name, seconds, rows):
+        self.stdout.write(f'{name:<45} {seconds * 1000:9.1f} мс  {rows / seconds:12.0f} строк/с')
+
+    def bench_serializers(self, rows, repeat):
+        resumes, interviews, documents = build_fixtures(rows)
+        cases = [
+            ('resumes', ResumeSerializer, resumes, RESUME_SHAPE),
+            ('interviews', InterviewSerializer, interviews, INTERVIEW_SHAPE),
+            ('documents', DocumentSerializer, documents, DOCUMENT_SHAPE),
+        ]
+        for name, serializer_class, objects, shape in cases:
+            values, mapper = shape.compile()
+            value_rows = [_model_values(obj, dict.fromkeys(values)) for obj in objects]
+            seconds, data = best_of(repeat, lambda: serializer_class(objects, many=True).data)
+            self.report(f'{name}: ModelSerializer', seconds, rows)
+            seconds, fast = best_of(repeat, lambda: [mapper(row) for row in value_rows])
+            self.report(f'{name}: values() + таблицы подписей', seconds, rows)
+            _, sparse = shape.compile(['id', 'status'], [])
+            seconds, _ = best_of(repeat, lambda: [sparse(row) for row in value_rows])
+            self.report(f'{name}: values(), ?fields=id,status', seconds, rows)
+            seconds, _ = best_of(repeat, lambda: JSONRenderer().render(fast))
+            self.report(f'{name}: JSONRenderer', seconds, rows)
+            seconds, _ = best_of(repeat, lambda: ORJSONRenderer().render(fast))
+            self.report(f'{name}: ORJSONRenderer', seconds, rows)
+
+    def bench_logging(self, rows, repeat):
+        # Стоимость вызова логгера для потока запроса; rows — число записей
+        logger = logging.getLogger('benchmark.logging')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        token = request_id.set('0f8fad5bd9cb469fa16570867728950e')
+
+        def emit():
+            for index in range(rows):
+                logger.info('Document %s uploaded by %s', index, 'user@example.com')
+
+        with tempfile.TemporaryFile('w') as stream:
+            handler = logging.StreamHandler(stream)
+            handler.setFormatter(JsonFormatter())
+            handler.addFilter(RequestContextFilter())
+            cases = [('синхронный StreamHandler + JSON', handler, None)]
+            for name, rates in (('QueueHandler + JSON', {}), ('QueueHandler, отброшено выборкой', {'benchmark': 0.0})):
+                queued = QueueHandler(json=True, queue_size=0, stream=stream)
+                queued.addFilter(RequestContextFilter())
+                queued.addFilter(SamplingFilter(rates))
+                cases.append((name, queued, queued))
+            for name, case_handler, queued in cases:
+                logger.handlers = [case_handler]
+                seconds, _ = best_of(repeat, emit)
+                self.report(f'logging: {name}', seconds, rows)
+                if queued is not None:
+                    # Дописывание очереди фоновым потоком в замер не входит
+                    queued.stop()
+            logger.handlers = [handler]
+            seconds, _ = best_of(repeat, lambda: [logger.debug('Document %s', index) for index in range(rows)])
+            self.report('logging: уровень DEBUG отключен', seconds, rows)
+        logger.handlers = []
+        request_id.reset(token)
@@ -0,0 +1,217 @@
+import csv
+import json
+import random
+import time
+import uuid
+from datetime import timedelta
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from request_app.bulk import bulk_insert, build_instance, is_postgresql, reset_sequences
+from request_app.models import (
+    User, Candidate, Employee, Resume, Interview, Document, Notification,
+    ResumeStatusChoices, ResumeTypeChoices, JobTypeChoices, PracticeTypeChoices,
+    EducationChoices, InterviewStatusChoices, InterviewResultChoices,
+    DocumentStatusChoices, DocumentTypeChoices, NotificationTypeChoices, GenderChoices
+)
+
+MODELS = {
+    'user': User,
+    'candidate': Candidate,
+    'employee': Employee,
+    'resume': Resume,
+    'interview': Interview,
+    'document': Document,
+    'notification': Notification,
+}
+
+LAST_NAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов', 'Новиков', 'Федоров']
+FIRST_NAMES = ['Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей', 'Артём', 'Илья', 'Кирилл', 'Михаил']
+PATRONYMICS = ['Александрович', 'Дмитриевич', 'Сергеевич', 'Андреевич', 'Алексеевич', 'Игоревич', 'Олегович']
+SKILLS = ['Python', 'Django', 'PostgreSQL', 'React', 'Excel', 'SQL', '1С', 'Linux', 'Git', 'Docker', 'аналитика', 'документооборот']
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        elif path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            raise CommandError('Поддерживаются только файлы .csv и .jsonl')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Массовая генерация тестовых данных или импорт из CSV/JSONL (COPY / bulk_create, без сигналов и save())'
+
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group(required=True)
+        mode.add_argument('--generate', type=int, metavar='N', help='Сгенерировать N кандидатов со связанными данными')
+        mode.add_argument('--file', help='Путь к файлу .csv или .jsonl для импорта')
+        parser.add_argument('--model', choices=sorted(MODELS), help='Модель, в которую импортируется файл')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--copy', action='store_true', help='Использовать COPY FROM STDIN (только PostgreSQL)')
+        parser.add_argument('--password', default='password123', help='Пароль для пользователей без готового хэша')
+        parser.add_argument('--password-hash', help='Готовый хэш пароля (make_password) для пользователей без хэша')
+        parser.add_argument('--employees', type=int, default=50, help='Количество сотрудников при генерации')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['copy'] and not is_postgresql():
+            self.stdout.write(self.style.WARNING('COPY доступен только в PostgreSQL, используется bulk_create'))
+        # Хэш вычисляется один раз на весь импорт, а не на каждого пользователя
+        self.password_hash = options['password_hash'] or make_password(options['password'])
+        self.batch_size = options['batch_size']
+        self.use_copy = options['copy']
+        started = time.monotonic()
+        if options['generate'] is not None:
+            total = self.generate(options['generate'], options['employees'], random.Random(options['seed']))
+        else:
+            if not options['model']:
+                raise CommandError('Для импорта необходимо указать --model')
+            total = self.import_file(options['file'], MODELS[options['model']])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Загружено строк: {total} за {elapsed:.1f} с'))
+
+    def insert(self, model, objs):
+        return bulk_insert(model, objs, use_copy=self.use_copy, batch_size=self.batch_size)
+
+    def import_file(self, path, model):
+        total = 0
+        has_explicit_pk = False
+        for chunk in chunked(read_rows(path), self.batch_size):
+            objs = []
+            for row in chunk:
+                obj = build_instance(model, row)
+                if model is User:
+                    if not obj.password:
+                        obj.password = self.password_hash
+                    if not obj.username:
+                        obj.username = obj.email.split('@')[0] + str(uuid.uuid4())[:8]
+                has_explicit_pk = has_explicit_pk or obj.pk is not None
+                objs.append(obj)
+            with transaction.atomic():
+                total += self.insert(model, objs)
+            self.stdout.write(f'{model._meta.model_name}: {total}')
+        if has_explicit_pk:
+            reset_sequences([model])
+        return total
+
+    def generate(self, count, employee_count, rng):
+        total = 0
+        now = timezone.now()
+        employees = self.generate_employees(employee_count, rng)
+        total += len(employees) * 2
+        for offset in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - offset)
+            with transaction.atomic():
+                total += self.generate_batch(size, employees, rng, now)
+            self.stdout.write(f'Кандидатов: {offset + size}/{count}')
+        return total
+
+    def make_user(self, rng, prefix):
+        gender = rng.choice(GenderChoices.values)
+        return User(
+            email=f'{prefix}.{uuid.uuid4().hex[:12]}@example.com',
+            username=f'{prefix}{uuid.uuid4().hex[:16]}',
+            password=self.password_hash,
+            last_name=rng.choice(LAST_NAMES),
+            first_name=rng.choice(FIRST_NAMES),
+            patronymic=rng.choice(PATRONYMICS),
+            gender=gender,
+            date_joined=timezone.now(),
+        )
+
+    def generate_employees(self, count, rng):
+        users = [self.make_user(rng, 'employee') for _ in range(count)]
+        with transaction.atomic():
+            self.insert(User, users)
+            employees = [
+                Employee(user_id=user.pk, department='Отдел кадров', position=rng.choice(JobTypeChoices.labels))
+                for user in users
+            ]
+            self.insert(Employee, employees)
+        return employees
+
+    def generate_batch(self, size, employees, rng, now):
+        users = [self.make_user(rng, 'candidate') for _ in range(size)]
+        self.insert(User, users)
+        candidates = [Candidate(user_id=user.pk) for user in users]
+        self.insert(Candidate, candidates)
+
+        resumes = []
+        for candidate in candidates:
+            resume_type = rng.choice(ResumeTypeChoices.values)
+            resumes.append(Resume(
+                candidate_id=candidate.pk,
+                content=', '.join(rng.sample(SKILLS, 4)),
+                education=rng.choice(EducationChoices.values),
+                phone_number='+7' + ''.join(rng.choice('0123456789') for _ in range(10)),
+                status=rng.choice(ResumeStatusChoices.values),
+                resume_type=resume_type,
+                job_type=rng.choice(JobTypeChoices.values) if resume_type == ResumeTypeChoices.JOB else None,
+                practice_type=rng.choice(PracticeTypeChoices.values) if resume_type == ResumeTypeChoices.PRACTICE else None,
+                created_at=now - timedelta(days=rng.randint(0, 365)),
+            ))
+        self.insert(Resume, resumes)
+
+        interviews = []
+        for resume in resumes:
+            if resume.status != ResumeStatusChoices.ACCEPTED:
+                continue
+            status = rng.choice(InterviewStatusChoices.values)
+            result = rng.choice(InterviewResultChoices.values) if status == InterviewStatusChoices.COMPLETED else InterviewResultChoices.PENDING
+            interviews.append(Interview(
+                candidate_id=resume.candidate_id,
+                employee_id=rng.choice(employees).pk,
+                scheduled_at=resume.created_at + timedelta(days=rng.randint(1, 30), hours=rng.randint(9, 17)),
+                status=status,
+                result=result,
+                resume_type=resume.resume_type,
+                job_type=resume.job_type,
+                practice_type=resume.practice_type,
+            ))
+        self.insert(Interview, interviews)
+        # Побочный эффект Interview.save() выполняется одним UPDATE на всю пачку
+        successful = {interview.candidate_id for interview in interviews if interview.result == InterviewResultChoices.SUCCESS}
+        if successful:
+            Candidate.objects.filter(pk__in=successful).update(has_successful_interview=True)
+
+        documents = []
+        for interview in interviews:
+            if interview.result != InterviewResultChoices.SUCCESS:
+                continue
+            for document_type in rng.sample(DocumentTypeChoices.values, 3):
+                documents.append(Document(
+                    interview_id=interview.pk,
+                    document_type=document_type,
+                    file_path=f'candidate_{interview.candidate_id}/{uuid.uuid4().hex}.pdf',
+                    status=rng.choice(DocumentStatusChoices.values),
+                ))
+        self.insert(Document, documents)
+
+        notifications = [
+            Notification(
+                user_id=user.pk,
+                message=f'Добро пожаловать, {user.first_name}! Ваша регистрация прошла успешно.',
+                type=NotificationTypeChoices.REGISTRATION,
+                sent_to_email=True,
+            )
+            for user in users
+        ]
+        self.insert(Notification, notifications)
+        return len(users) + len(candidates) + len(resumes) + len(interviews) + len(documents) + len(notifications)
@@ -0,0 +1,28 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from whitenoise.compress import Compressor
+
+
+class Command(BaseCommand):
+    help = 'Создает сжатые варианты .br и .gz файлов сборки фронтенда (после npm run build)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', default=settings.FRONTEND_BUILD_DIR)
+
+    def handle(self, *args, **options):
+        root = options['root']
+        if not os.path.isdir(root):
+            raise CommandError(f'Каталог сборки не найден: {root}')
+        compressor = Compressor(quiet=True)
+        paths = [
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(root)
+            for name in names if compressor.should_compress(name)
+        ]
+        with ThreadPoolExecutor() as pool:
+            written = sum(len(files) for files in pool.map(compressor.compress, paths))
+        if not compressor.use_brotli:
+            self.stderr.write('Пакет Brotli не установлен — созданы только .gz')
+        self.stdout.write(self.style.SUCCESS(f'Файлов: {len(paths)}, сжатых вариантов: {written}'))
@@ -0,0 +1,36 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from django.core.management.base import BaseCommand
+from request_app.dedup import SOURCE_VALUES, compute_rows, store
+from request_app.models import Resume
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сигнатуры и LSH-корзины поиска дублей для всех резюме'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        rows = Resume.objects.order_by('id').values(*SOURCE_VALUES).iterator(chunk_size=chunk_size)
+        processed = 0
+        # Воркеры только считают MinHash и к БД не обращаются; запись — в основном процессе.
+        # В очереди не больше двух пачек на воркер, чтобы память не росла с размером таблицы.
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            pending = set()
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if chunk:
+                    pending.add(pool.submit(compute_rows, chunk))
+                if pending and (not chunk or len(pending) >= options['workers'] * 2):
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        computed = future.result()
+                        store(computed)
+                        processed += len(computed)
+                if not chunk and not pending:
+                    break
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано резюме: {processed}'))
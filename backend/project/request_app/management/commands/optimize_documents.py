@@ -0,0 +1,102 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from request_app.models import OptimizationStatusChoices
+from request_app.pdf_optimizer import pending_documents, read_file, optimize_job, apply_result, mark
+
+
+class Command(BaseCommand):
+    help = 'Пережимает изображения и линеаризует загруженные PDF в пуле процессов (один проход или с --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, обрабатывая новые документы')
+        parser.add_argument('--interval', type=int, default=settings.PDF_OPTIMIZATION_INTERVAL_SECONDS)
+
+    def handle(self, *args, **options):
+        self.workers = options['workers']
+        counts = {}
+        # Воркеры только обрабатывают байты PDF; чтение, запись файлов и БД — в основном процессе.
+        # В работе не больше двух файлов на воркер, поэтому память ограничена независимо от очереди.
+        self.pool = self._new_pool()
+        try:
+            while True:
+                started = time.monotonic()
+                batch = pending_documents(options['batch_size'])
+                pending = {}
+                for document_id, name in batch:
+                    try:
+                        data = read_file(name)
+                    except OSError as e:
+                        self._fail(document_id, f'файл {name} недоступен ({e})', counts)
+                        continue
+                    pending[self._submit(document_id, name, data)] = document_id
+                    if len(pending) >= self.workers * 2:
+                        self._apply(wait(pending, return_when=FIRST_COMPLETED).done, pending, counts)
+                if pending:
+                    self._apply(wait(pending).done, pending, counts)
+                if len(batch) == options['batch_size']:
+                    continue
+                if counts:
+                    summary = ', '.join(f'{OptimizationStatusChoices(status).label}: {count}' for status, count in counts.items())
+                    self.stdout.write(self.style.SUCCESS(f'Обработано документов — {summary}'))
+                    counts = {}
+                if not options['loop']:
+                    return
+                try:
+                    time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
+                except KeyboardInterrupt:
+                    return
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=django.setup)
+
+    def _submit(self, document_id, name, data):
+        try:
+            return self.pool.submit(optimize_job, document_id, name, data)
+        except BrokenProcessPool:
+            self._restart_pool()
+            return self.pool.submit(optimize_job, document_id, name, data)
+
+    def _restart_pool(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._new_pool()
+
+    def _fail(self, document_id, reason, counts):
+        self.stderr.write(f'Документ {document_id}: {reason}')
+        mark(document_id, OptimizationStatusChoices.FAILED)
+        counts[OptimizationStatusChoices.FAILED] = counts.get(OptimizationStatusChoices.FAILED, 0) + 1
+
+    def _apply(self, futures, pending, counts):
+        broken = False
+        for future in futures:
+            document_id = pending.pop(future)
+            # Документ с любой ошибкой помечается FAILED: оставшись PENDING, он попадал бы
+            # в каждую следующую выборку и останавливал очередь
+            try:
+                status = apply_result(*future.result())
+            except BrokenProcessPool:
+                # Воркер завершился аварийно (нехватка памяти, падение библиотеки); виновника не
+                # определить, поэтому FAILED получают все документы, которые были в работе
+                broken = True
+                self._fail(document_id, 'процесс обработки аварийно завершился', counts)
+                continue
+            except Exception as e:
+                self._fail(document_id, f'{type(e).__name__}: {e}', counts)
+                continue
+            if status:
+                counts[status] = counts.get(status, 0) + 1
+        if broken:
+            # Остальные задачи старого пула завершены той же ошибкой — снимаются сразу,
+            # чтобы не перезапустить уже новый пул
+            for future in [future for future in pending if future.done()]:
+                if isinstance(future.exception(), BrokenProcessPool):
+                    self._fail(pending.pop(future), 'процесс обработки аварийно завершился', counts)
+            self._restart_pool()
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from request_app.media_cleanup import find_orphans
+from request_app.models import FileDeletion
+
+
+class Command(BaseCommand):
+    help = 'Ищет в MEDIA_ROOT файлы документов без строки в БД и при --enqueue ставит их в журнал на удаление'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enqueue', action='store_true', help='Поставить найденные файлы в журнал FileDeletion')
+        parser.add_argument('--min-age-hours', type=int, default=settings.MEDIA_ORPHAN_MIN_AGE_HOURS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--verbose-list', action='store_true', help='Вывести пути найденных файлов')
+
+    def handle(self, *args, **options):
+        if settings.DOCUMENT_STORAGE != 'local':
+            # Для объектного хранилища потерянные объекты удаляются правилами жизненного цикла бакета
+            raise CommandError('Сверка работает только с локальным хранилищем (DOCUMENT_STORAGE=local)')
+        found = 0
+        pending = []
+        for path in find_orphans(settings.MEDIA_ROOT, options['batch_size'], options['min_age_hours'] * 3600):
+            found += 1
+            if options['verbose_list']:
+                self.stdout.write(path)
+            if options['enqueue']:
+                pending.append(FileDeletion(path=path))
+                if len(pending) >= options['batch_size']:
+                    FileDeletion.objects.bulk_create(pending)
+                    pending = []
+        if pending:
+            FileDeletion.objects.bulk_create(pending)
+        action = 'поставлено в журнал' if options['enqueue'] else 'найдено (без изменений)'
+        self.stdout.write(self.style.SUCCESS(f'Потерянных файлов {action}: {found}'))
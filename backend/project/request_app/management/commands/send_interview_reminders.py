@@ -0,0 +1,37 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError
+from request_app.reminders import send_due_reminders
+
+
+class Command(BaseCommand):
+    help = 'Отправляет напоминания о предстоящих собеседованиях (один проход или периодически с --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, проверяя напоминания с интервалом')
+        parser.add_argument('--interval', type=int, default=settings.INTERVIEW_REMINDER_INTERVAL_SECONDS)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            total = 0
+            try:
+                # Пачки до полного исчерпания окна, каждая в своей транзакции
+                while True:
+                    sent = send_due_reminders(options['batch_size'])
+                    total += sent
+                    if sent < options['batch_size']:
+                        break
+            except IntegrityError:
+                # Другой воркер успел отправить те же напоминания — повторим на следующем проходе
+                self.stderr.write('Конфликт с параллельным воркером, пачка пропущена')
+            if total:
+                self.stdout.write(self.style.SUCCESS(f'Отправлено напоминаний: {total}'))
+            if not options['loop']:
+                return
+            try:
+                time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,31 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from request_app.media_cleanup import sweep_batch
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы документов из журнала FileDeletion (один проход или периодически с --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, разбирая журнал с интервалом')
+        parser.add_argument('--interval', type=int, default=settings.FILE_SWEEP_INTERVAL_SECONDS)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            total = 0
+            while True:
+                processed = sweep_batch(options['batch_size'])
+                total += processed
+                if processed < options['batch_size']:
+                    break
+            if total:
+                self.stdout.write(self.style.SUCCESS(f'Обработано записей журнала: {total}'))
+            if not options['loop']:
+                return
+            try:
+                time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
+            except KeyboardInterrupt:
+                return
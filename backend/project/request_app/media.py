@@ -0,0 +1,46 @@
+import os
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils._os import safe_join
+from .models import document_storage
+
+# Локальные файлы без общей раздачи MEDIA_ROOT.
+# Документы отдаются по подписанным ссылкам с ограниченным сроком, как объекты S3:
+# ссылку выдает только API, проверивший права на документ, а открыть ее можно в браузере
+# без заголовка Authorization. Публичны только шаблоны заявлений из MEDIA_ROOT/templates.
+
+FILE_SALT = 'request_app.media'
+
+
+class ProtectedFileSystemStorage(FileSystemStorage):
+    def url(self, name):
+        return reverse('document-file', args=[signing.dumps(name, salt=FILE_SALT, compress=True)])
+
+
+def document_file(request, token):
+    try:
+        name = signing.loads(token, salt=FILE_SALT, max_age=settings.DOCUMENT_DOWNLOAD_URL_EXPIRE)
+    except signing.BadSignature:
+        # В том числе истекшая ссылка (SignatureExpired)
+        raise Http404
+    try:
+        handle = document_storage().open(name, 'rb')
+    except FileNotFoundError:
+        raise Http404
+    response = FileResponse(handle, filename=os.path.basename(name))
+    response['Cache-Control'] = 'private, max-age=0'
+    return response
+
+
+def template_file(request, path):
+    try:
+        full_path = safe_join(os.path.join(settings.MEDIA_ROOT, 'templates'), path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return FileResponse(open(full_path, 'rb'), as_attachment=True, filename=os.path.basename(full_path))
@@ -0,0 +1,85 @@
+import logging
+import os
+import time
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from .models import Document, FileDeletion, document_storage
+
+logger = logging.getLogger(__name__)
+
+# Удаление файлов документов вне запроса.
+# sweep_batch разбирает журнал FileDeletion пачками (FOR UPDATE SKIP LOCKED — несколько
+# воркеров не мешают друг другу). Перед удалением путь сверяется с живыми документами:
+# имя могло достаться новой загрузке. find_orphans обходит MEDIA_ROOT через os.scandir
+# и сверяет пачки путей с индексом по file_path, не загружая все строки в память.
+
+
+def live_paths(paths):
+    return set(Document.objects.filter(file_path__in=paths).values_list('file_path', flat=True))
+
+
+def sweep_batch(batch_size=500):
+    storage = document_storage()
+    with transaction.atomic():
+        entries = list(FileDeletion.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size])
+        if not entries:
+            return 0
+        live = live_paths({entry.path for entry in entries})
+        done, failed = [], []
+        for entry in entries:
+            if entry.path in live:
+                done.append(entry.id)
+                continue
+            try:
+                # Отсутствующий файл — не ошибка: FileSystemStorage.delete его пропускает
+                storage.delete(entry.path)
+                done.append(entry.id)
+            except (OSError, BotoCoreError, ClientError) as e:
+                # Ошибки файловой системы и S3 (сеть, доступ) — повтор в следующем проходе
+                logger.warning("Не удалось удалить файл %s: %s", entry.path, e)
+                if entry.attempts + 1 >= settings.FILE_SWEEP_MAX_ATTEMPTS:
+                    logger.error("Файл %s исключен из журнала после %d попыток", entry.path, entry.attempts + 1)
+                    done.append(entry.id)
+                else:
+                    failed.append(entry.id)
+        FileDeletion.objects.filter(id__in=done).delete()
+        FileDeletion.objects.filter(id__in=failed).update(attempts=F('attempts') + 1)
+    return len(entries)
+
+
+def _walk(directory):
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+def media_files(root, min_age_seconds):
+    # Только каталоги документов candidate_<id>/; свежие файлы пропускаются —
+    # загрузка сохраняет файл до фиксации строки документа
+    newest = time.time() - min_age_seconds
+    with os.scandir(root) as entries:
+        directories = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False) and entry.name.startswith('candidate_')]
+    for directory in directories:
+        for entry in _walk(directory):
+            if entry.stat(follow_symlinks=False).st_mtime <= newest:
+                yield os.path.relpath(entry.path, root).replace(os.sep, '/')
+
+
+def find_orphans(root, batch_size=1000, min_age_seconds=0):
+    batch = []
+    for path in media_files(root, min_age_seconds):
+        batch.append(path)
+        if len(batch) >= batch_size:
+            live = live_paths(batch)
+            yield from (item for item in batch if item not in live)
+            batch = []
+    if batch:
+        live = live_paths(batch)
+        yield from (item for item in batch if item not in live)
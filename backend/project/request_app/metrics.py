@@ -0,0 +1,96 @@
+import os
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Метрики процесса; при заданной PROMETHEUS_MULTIPROC_DIR prometheus_client пишет их в
+# mmap-файлы, а MultiProcessCollector суммирует значения всех воркеров при скрейпе.
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Время обработки запроса',
+    ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Counter('db_queries_total', 'Количество SQL-запросов', ['view'])
+# Очереди писем нет: отправка синхронная, гейдж показывает письма, отправляемые прямо сейчас
+EMAILS_IN_FLIGHT = Gauge(
+    'emails_in_flight', 'Письма в процессе синхронной отправки', multiprocess_mode='livesum'
+)
+EMAIL_SEND_LATENCY = Histogram(
+    'email_send_duration_seconds', 'Время отправки письма',
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+EMAILS_SENT = Counter('emails_sent_total', 'Отправленные письма', ['result'])
+UPLOAD_SIZE = Histogram(
+    'document_upload_bytes', 'Размер загружаемых документов',
+    buckets=(64 * 1024, 256 * 1024, 512 * 1024, 1024 * 1024, 2 * 1024 * 1024, 3 * 1024 * 1024, 4 * 1024 * 1024, 5 * 1024 * 1024),
+)
+UPLOAD_DURATION = Histogram(
+    'document_upload_duration_seconds', 'Время обработки загрузки документа',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+# Записи журнала, отброшенные QueueHandler (request_app.log) при переполненной очереди
+LOG_RECORDS_DROPPED = Counter('log_records_dropped_total', 'Записи журнала, отброшенные при переполнении очереди')
+
+PIPELINE_CACHE_KEY = 'metrics:pipeline'
+
+
+def pipeline_counts():
+    from .models import Resume, Interview, Document
+
+    def grouped(model, field):
+        return {
+            row[field]: row['total']
+            for row in model.objects.order_by().values(field).annotate(total=Count('id'))
+        }
+
+    return {
+        'resumes': grouped(Resume, 'status'),
+        'interviews': grouped(Interview, 'result'),
+        'documents': grouped(Document, 'status'),
+    }
+
+
+class PipelineCollector:
+    # Гейджи воронки считаются одним GROUP BY на модель и кэшируются,
+    # поэтому частые скрейпы не нагружают БД
+    def collect(self):
+        counts = cache.get(PIPELINE_CACHE_KEY)
+        if counts is None:
+            counts = pipeline_counts()
+            cache.set(PIPELINE_CACHE_KEY, counts, settings.METRICS_PIPELINE_CACHE_SECONDS)
+        for name, label, documentation in (
+            ('resumes', 'status', 'Резюме по статусам'),
+            ('interviews', 'result', 'Собеседования по результатам'),
+            ('documents', 'status', 'Документы по статусам'),
+        ):
+            family = GaugeMetricFamily(f'pipeline_{name}', documentation, labels=[label])
+            for value, total in counts[name].items():
+                family.add_metric([value], total)
+            yield family
+
+
+_pipeline_registry = CollectorRegistry()
+_pipeline_registry.register(PipelineCollector())
+
+
+def exposition():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(_pipeline_registry)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
@@ -0,0 +1,128 @@
+import re
+import time
+import uuid
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import OperationalError, connections
+from . import log, metrics, profiling, replicas
+
+REQUEST_ID_RE = re.compile(r'^[\w.-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    # Id запроса для логов: из X-Request-ID балансировщика, если он корректен, иначе новый
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request.id = incoming if REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+        token = log.request_id.set(request.id)
+        try:
+            response = self.get_response(request)
+        finally:
+            log.request_id.reset(token)
+        response['X-Request-ID'] = request.id
+        return response
+
+
+class QueryProfilingMiddleware:
+    # Включается через REQUEST_PROFILING=True; при выключенном флаге исключается из цепочки
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = profiling.RequestProfile()
+        token = profiling.current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            profiling.current_profile.reset(token)
+        total = profile.total_time
+        response['Server-Timing'] = profile.server_timing(total)
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else request.path
+        profiling.record(route, request.method, request.path, response.status_code, profile, total)
+        return response
+
+
+class MetricsMiddleware:
+    # Гистограмма латентности и счётчик SQL-запросов по имени представления (не по пути,
+    # чтобы число временных рядов не зависело от id в URL)
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = metrics.QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        metrics.REQUEST_LATENCY.labels(view, request.method, response.status_code).observe(elapsed)
+        if counter.count:
+            metrics.DB_QUERIES.labels(view).inc(counter.count)
+        return response
+
+
+class ReplicaMiddleware:
+    # Выбор реплики для чтения (request_app.replicas); без настроенных реплик исключается из цепочки
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.read_alias = None
+        token = replicas.read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            replicas.read_alias.reset(token)
+        if request.read_alias and response.streaming:
+            # Потоковые выгрузки читают из базы уже после выхода из middleware
+            response.streaming_content = self._bind(response.streaming_content, request.read_alias)
+        if not self._reads_only(request) and response.status_code < 500:
+            replicas.pin(request, response)
+        return response
+
+    def _reads_only(self, request):
+        return request.method in self.SAFE_METHODS or getattr(request, 'replica_reads', False)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Решение после разрешения URL: POST-представления только для чтения (пакетные GET)
+        # помечаются атрибутом replica_reads
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        request.replica_reads = getattr(view_class, 'replica_reads', False)
+        if not self._reads_only(request) or replicas.is_pinned(request):
+            return None
+        request.read_alias = replicas.choose_replica()
+        replicas.read_alias.set(request.read_alias)
+        return None
+
+    def process_exception(self, request, exception):
+        if request.read_alias and isinstance(exception, OperationalError):
+            # Следующие запросы пойдут в default до повторной проверки реплики
+            replicas.mark_unhealthy(request.read_alias)
+        return None
+
+    @staticmethod
+    def _bind(content, alias):
+        token = replicas.read_alias.set(alias)
+        try:
+            yield from content
+        finally:
+            replicas.read_alias.reset(token)
@@ -0,0 +1,87 @@
+# Generated by Django 5.2 on 2026-10-19 18:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0007_interview_job_type_resume_job_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentHistoryArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('UPLOADED', 'Загружен'), ('UNDER_REVIEW', 'На проверке'), ('ACCEPTED', 'Принят'), ('REJECTED', 'Отклонен'), ('DELETED', 'Удалён')], max_length=20, verbose_name='Статус')),
+                ('comment', models.TextField(blank=True, default='', max_length=500, verbose_name='Комментарий')),
+                ('created_at', models.DateTimeField(verbose_name='Дата изменения')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+            ],
+            options={
+                'verbose_name': 'Архив истории документа',
+                'verbose_name_plural': 'Архив истории документов',
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField(verbose_name='Сообщение')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('is_read', models.BooleanField(default=False, verbose_name='Прочитано')),
+                ('sent_to_email', models.BooleanField(default=False, verbose_name='Отправлено на email')),
+                ('type', models.CharField(choices=[('REGISTRATION', 'Регистрация'), ('RESUME_STATUS', 'Статус резюме'), ('INTERVIEW', 'Собеседование'), ('DOCUMENT', 'Документ'), ('HIRE', 'Прием'), ('OTHER', 'Другое')], default='OTHER', max_length=20, verbose_name='Тип')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+            ],
+            options={
+                'verbose_name': 'Архивное уведомление',
+                'verbose_name_plural': 'Архивные уведомления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='documenthistory',
+            index=models.Index(fields=['document', '-created_at'], name='dochistory_document_created'),
+        ),
+        migrations.AddIndex(
+            model_name='documenthistory',
+            index=models.Index(fields=['created_at'], name='dochistory_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notification_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at'], name='notification_created'),
+        ),
+        migrations.AddField(
+            model_name='documenthistoryarchive',
+            name='document',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_history', to='request_app.document'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='documenthistoryarchive',
+            index=models.Index(fields=['document', '-created_at'], name='dochistarch_document_created'),
+        ),
+        migrations.AddIndex(
+            model_name='documenthistoryarchive',
+            index=models.Index(fields=['created_at'], name='dochistarch_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationarchive',
+            index=models.Index(fields=['user', '-created_at'], name='notifarch_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationarchive',
+            index=models.Index(fields=['created_at'], name='notifarch_created'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20, verbose_name='Модель')),
+                ('object_id', models.BigIntegerField(verbose_name='ID объекта')),
+                ('user_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID пользователя')),
+                ('candidate_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID кандидата')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удаленная запись',
+                'verbose_name_plural': 'Удаленные записи',
+                'indexes': [models.Index(fields=['deleted_at'], name='tombstone_deleted'), models.Index(fields=['candidate_id', 'deleted_at'], name='tombstone_candidate_deleted'), models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_deleted')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-19 18:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0010_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Аренда до'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_documents', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Аренда до'),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_resumes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['status', 'claim_expires_at'], name='document_status_claim'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['status', 'claim_expires_at'], name='resume_status_claim'),
+        ),
+    ]
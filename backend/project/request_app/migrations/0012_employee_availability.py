@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 18:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0011_moderation_claim'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Понедельник'), (1, 'Вторник'), (2, 'Среда'), (3, 'Четверг'), (4, 'Пятница'), (5, 'Суббота'), (6, 'Воскресенье')], verbose_name='День недели')),
+                ('start_time', models.TimeField(verbose_name='Начало')),
+                ('end_time', models.TimeField(verbose_name='Окончание')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='request_app.employee')),
+            ],
+            options={
+                'verbose_name': 'Рабочие часы сотрудника',
+                'verbose_name_plural': 'Рабочие часы сотрудников',
+                'ordering': ['employee', 'weekday', 'start_time'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='availability_start_before_end')],
+            },
+        ),
+    ]
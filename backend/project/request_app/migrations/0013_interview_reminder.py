@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-19 19:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0012_employee_availability'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset_minutes', models.PositiveIntegerField(verbose_name='За сколько минут')),
+                ('sent_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата отправки')),
+            ],
+            options={
+                'verbose_name': 'Напоминание о собеседовании',
+                'verbose_name_plural': 'Напоминания о собеседованиях',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['status', 'scheduled_at'], name='interview_status_scheduled'),
+        ),
+        migrations.AddField(
+            model_name='interviewreminder',
+            name='interview',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='request_app.interview'),
+        ),
+        migrations.AddConstraint(
+            model_name='interviewreminder',
+            constraint=models.UniqueConstraint(fields=('interview', 'offset_minutes'), name='reminder_interview_offset'),
+        ),
+    ]
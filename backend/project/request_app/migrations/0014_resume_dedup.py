@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-19 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0013_interview_reminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeSignature',
+            fields=[
+                ('resume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='request_app.resume')),
+                ('minhash', models.BinaryField(verbose_name='MinHash')),
+                ('phone_key', models.CharField(blank=True, db_index=True, max_length=20, verbose_name='Телефон (нормализованный)')),
+                ('name_key', models.CharField(blank=True, db_index=True, max_length=255, verbose_name='ФИО (нормализованное)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Сигнатура резюме',
+                'verbose_name_plural': 'Сигнатуры резюме',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField(verbose_name='Полоса')),
+                ('key', models.BigIntegerField(verbose_name='Ключ корзины')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='request_app.resume')),
+            ],
+            options={
+                'verbose_name': 'LSH-корзина резюме',
+                'verbose_name_plural': 'LSH-корзины резюме',
+                'indexes': [models.Index(fields=['band', 'key'], name='resumebucket_band_key')],
+                'constraints': [models.UniqueConstraint(fields=('resume', 'band'), name='resumebucket_resume_band')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Поиск в админке — icontains (ILIKE '%...%'), обычный B-tree для него бесполезен.
+# Триграммные GIN-индексы (pg_trgm) есть только в PostgreSQL; на других СУБД миграция пустая.
+# Индексы строятся CONCURRENTLY, чтобы не блокировать запись в большие таблицы.
+
+SEARCH_FIELDS = [
+    ('User', ['username', 'first_name', 'last_name', 'patronymic', 'email']),
+    ('Resume', ['content', 'phone_number']),
+    ('Document', ['file_path', 'document_type']),
+    ('DocumentHistory', ['comment']),
+    ('Notification', ['message']),
+]
+
+
+def _indexes(apps):
+    for model_name, fields in SEARCH_FIELDS:
+        table = apps.get_model('request_app', model_name)._meta.db_table
+        for field in fields:
+            yield f'{table}_{field}_trgm', table, field
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, field in _indexes(apps):
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" USING gin ("{field}" gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in _indexes(apps):
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('request_app', '0014_resume_dedup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 19:09
+
+import request_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0015_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=255, verbose_name='Путь к файлу')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата постановки')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток удаления')),
+            ],
+            options={
+                'verbose_name': 'Файл к удалению',
+                'verbose_name_plural': 'Файлы к удалению',
+            },
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='file_path',
+            field=models.FileField(db_index=True, upload_to=request_app.models.candidate_document_path),
+        ),
+    ]
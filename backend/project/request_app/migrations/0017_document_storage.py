@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 19:10
+
+import request_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0016_file_deletion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='file_path',
+            field=models.FileField(db_index=True, storage=request_app.models.document_storage, upload_to=request_app.models.candidate_document_path),
+        ),
+    ]
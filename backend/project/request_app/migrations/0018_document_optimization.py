@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0017_document_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='optimization_status',
+            field=models.CharField(choices=[('PENDING', 'Ожидает'), ('OPTIMIZED', 'Оптимизирован'), ('SKIPPED', 'Без изменений'), ('FAILED', 'Ошибка')], default='PENDING', max_length=20, verbose_name='Оптимизация'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='optimized_size',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Размер после оптимизации'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='original_size',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Исходный размер'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['optimization_status', 'id'], name='document_optimization'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-19 19:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0018_document_optimization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Свертка')),
+                ('last_event_id', models.BigIntegerField(default=0, verbose_name='Последнее событие')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Позиция свертки',
+                'verbose_name_plural': 'Позиции сверток',
+            },
+        ),
+        migrations.CreateModel(
+            name='FunnelDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('resume_type', models.CharField(choices=[('JOB', 'Работа'), ('PRACTICE', 'Практика')], max_length=20, verbose_name='Тип заявки')),
+                ('vacancy', models.CharField(blank=True, default='', max_length=20, verbose_name='Вакансия')),
+                ('submitted', models.PositiveIntegerField(default=0, verbose_name='Подано резюме')),
+                ('accepted', models.PositiveIntegerField(default=0, verbose_name='Принято резюме')),
+                ('interviewed', models.PositiveIntegerField(default=0, verbose_name='Проведено собеседований')),
+                ('succeeded', models.PositiveIntegerField(default=0, verbose_name='Успешных собеседований')),
+                ('hired', models.PositiveIntegerField(default=0, verbose_name='Принято на работу/практику')),
+                ('durations', models.JSONField(default=dict, verbose_name='Длительности этапов')),
+            ],
+            options={
+                'verbose_name': 'Воронка за день',
+                'verbose_name_plural': 'Воронка по дням',
+                'constraints': [models.UniqueConstraint(fields=('day', 'resume_type', 'vacancy'), name='funnel_daily_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=20, verbose_name='Сущность')),
+                ('object_id', models.BigIntegerField(verbose_name='ID объекта')),
+                ('candidate_id', models.BigIntegerField(verbose_name='ID кандидата')),
+                ('field', models.CharField(max_length=20, verbose_name='Поле')),
+                ('from_value', models.CharField(blank=True, default='', max_length=20, verbose_name='Было')),
+                ('to_value', models.CharField(max_length=20, verbose_name='Стало')),
+                ('stage', models.CharField(blank=True, default='', max_length=20, verbose_name='Этап воронки')),
+                ('resume_type', models.CharField(choices=[('JOB', 'Работа'), ('PRACTICE', 'Практика')], max_length=20, verbose_name='Тип заявки')),
+                ('vacancy', models.CharField(blank=True, default='', max_length=20, verbose_name='Вакансия')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата события')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Событие статуса',
+                'verbose_name_plural': 'События статусов',
+                'indexes': [models.Index(fields=['entity', 'object_id', 'id'], name='status_event_object'), models.Index(fields=['candidate_id', 'resume_type', 'vacancy', 'stage', 'id'], name='status_event_journey')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# icontains в PostgreSQL компилируется в UPPER("col"::text) LIKE UPPER(%s): индексы из 0015
+# по самому столбцу такой запрос не обслуживают. Триграммные индексы строятся по тому же
+# выражению, старые удаляются. Как и в 0015 — только PostgreSQL и CONCURRENTLY.
+
+SEARCH_FIELDS = [
+    ('User', ['username', 'first_name', 'last_name', 'patronymic', 'email']),
+    ('Resume', ['content', 'phone_number']),
+    ('Document', ['file_path', 'document_type']),
+    ('DocumentHistory', ['comment']),
+    ('Notification', ['message']),
+]
+
+
+def _indexes(apps):
+    for model_name, fields in SEARCH_FIELDS:
+        table = apps.get_model('request_app', model_name)._meta.db_table
+        for field in fields:
+            yield table, field
+
+
+def _create(schema_editor, name, table, expression):
+    schema_editor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" USING gin ({expression} gin_trgm_ops)')
+
+
+def create_upper_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, field in _indexes(apps):
+        _create(schema_editor, f'{table}_{field}_utrgm', table, f'(UPPER("{field}"::text))')
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{table}_{field}_trgm"')
+
+
+def restore_column_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, field in _indexes(apps):
+        _create(schema_editor, f'{table}_{field}_trgm', table, f'"{field}"')
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{table}_{field}_utrgm"')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('request_app', '0020_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_indexes, restore_column_indexes),
+    ]
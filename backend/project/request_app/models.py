@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.core.files.storage import storages
 from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
 
 import uuid
 
@@ -8,6 +10,10 @@ def candidate_document_path(instance, filename):
     candidate_id = instance.interview.candidate.id
     return f'candidate_{candidate_id}/{filename}'
 
+def document_storage():
+    # Хранилище выбирается настройкой DOCUMENT_STORAGE (STORAGES['documents']), в миграциях — только ссылка
+    return storages['documents']
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -86,6 +92,12 @@ class DocumentTypeChoices(models.TextChoices):
     PRACTICE_AGREEMENT = 'Договор о практике', _('Договор о практике')
     PRACTICE_REQUEST = 'Заявление на практику', _('Заявление на практику')
 
+class OptimizationStatusChoices(models.TextChoices):
+    PENDING = 'PENDING', _('Ожидает')
+    OPTIMIZED = 'OPTIMIZED', _('Оптимизирован')
+    SKIPPED = 'SKIPPED', _('Без изменений')
+    FAILED = 'FAILED', _('Ошибка')
+
 class GenderChoices(models.TextChoices):
     MALE = 'MALE', _('Мужской')
     FEMALE = 'FEMALE', _('Женский')
@@ -101,6 +113,9 @@ class User(AbstractUser):
     first_name = models.CharField(_('Имя'), max_length=150, blank=True)
     patronymic = models.CharField(_('Отчество'), max_length=150, blank=True)
     gender = models.CharField(_('Пол'), max_length=10, choices=GenderChoices.choices, blank=True)
+    # Поля пользователя, кандидата и сотрудника встроены в списки резюме, собеседований и документов:
+    # updated_at участвует в их ETag и дельта-синхронизации
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True, db_index=True)
 
     objects = CustomUserManager()
 
@@ -126,6 +141,7 @@ class Candidate(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='candidate_profile')
     date_of_birth = models.DateField(_('Дата рождения'), null=True, blank=True)
     has_successful_interview = models.BooleanField(_('Успешное собеседование'), default=False)
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = 'Кандидат'
@@ -139,6 +155,7 @@ class Employee(models.Model):
     department = models.CharField(_('Отдел'), max_length=100, blank=True)
     position = models.CharField(_('Должность'), max_length=100, blank=True)
     hire_date = models.DateField(_('Дата найма'), null=True, blank=True)
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = 'Сотрудник'
@@ -147,6 +164,33 @@ class Employee(models.Model):
     def __str__(self):
         return self.user.__str__()
 
+class WeekdayChoices(models.IntegerChoices):
+    MONDAY = 0, _('Понедельник')
+    TUESDAY = 1, _('Вторник')
+    WEDNESDAY = 2, _('Среда')
+    THURSDAY = 3, _('Четверг')
+    FRIDAY = 4, _('Пятница')
+    SATURDAY = 5, _('Суббота')
+    SUNDAY = 6, _('Воскресенье')
+
+class EmployeeAvailability(models.Model):
+    # Рабочие часы сотрудника для автоматического назначения собеседований
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='availability')
+    weekday = models.PositiveSmallIntegerField(_('День недели'), choices=WeekdayChoices.choices)
+    start_time = models.TimeField(_('Начало'))
+    end_time = models.TimeField(_('Окончание'))
+
+    class Meta:
+        verbose_name = 'Рабочие часы сотрудника'
+        verbose_name_plural = 'Рабочие часы сотрудников'
+        ordering = ['employee', 'weekday', 'start_time']
+        constraints = [
+            models.CheckConstraint(condition=models.Q(start_time__lt=models.F('end_time')), name='availability_start_before_end'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} — {self.get_weekday_display()} {self.start_time:%H:%M}–{self.end_time:%H:%M}"
+
 class Resume(models.Model):
     candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='resumes')
     content = models.TextField(_('Содержание'))
@@ -158,10 +202,18 @@ class Resume(models.Model):
     resume_type = models.CharField(_('Тип заявки'), max_length=20, choices=ResumeTypeChoices.choices, default=ResumeTypeChoices.JOB)
     practice_type = models.CharField(_('Тип практики'), max_length=20, choices=PracticeTypeChoices.choices, blank=True, null=True)
     job_type = models.CharField(_('Тип работы'), max_length=20, choices=JobTypeChoices.choices, blank=True, null=True)
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True, db_index=True)
+    # Аренда в очереди модерации: запись закреплена за модератором до claim_expires_at
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_resumes')
+    claim_expires_at = models.DateTimeField(_('Аренда до'), null=True, blank=True)
 
     class Meta:
         verbose_name = 'Резюме'
         verbose_name_plural = 'Резюме'
+        indexes = [
+            models.Index(fields=['candidate', 'updated_at'], name='resume_candidate_updated'),
+            models.Index(fields=['status', 'claim_expires_at'], name='resume_status_claim'),
+        ]
 
     def __str__(self):
         return f"Резюме {self.id} ({self.get_resume_type_display()}) от {self.candidate.user.email}"
@@ -176,11 +228,16 @@ class Interview(models.Model):
     resume_type = models.CharField(_('Тип заявки'), max_length=20, choices=ResumeTypeChoices.choices, default=ResumeTypeChoices.JOB)
     practice_type = models.CharField(_('Тип практики'), max_length=20, choices=PracticeTypeChoices.choices, blank=True, null=True)
     job_type = models.CharField(_('Тип работы'), max_length=20, choices=JobTypeChoices.choices, blank=True, null=True)
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = 'Собеседование'
         verbose_name_plural = 'Собеседования'
         ordering = ['scheduled_at']
+        indexes = [
+            models.Index(fields=['candidate', 'updated_at'], name='interview_candidate_updated'),
+            models.Index(fields=['status', 'scheduled_at'], name='interview_status_scheduled'),
+        ]
 
     def __str__(self):
         return f"Собеседование {self.id} ({self.get_resume_type_display()}) для {self.candidate.user.email}"
@@ -197,21 +254,83 @@ class Interview(models.Model):
             self.candidate.has_successful_interview = has_other_success
             self.candidate.save()
 
+class InterviewReminder(models.Model):
+    # Отправленные напоминания: уникальность (собеседование, смещение) делает рассылку идемпотентной
+    interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name='reminders')
+    offset_minutes = models.PositiveIntegerField(_('За сколько минут'))
+    sent_at = models.DateTimeField(_('Дата отправки'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Напоминание о собеседовании'
+        verbose_name_plural = 'Напоминания о собеседованиях'
+        constraints = [
+            models.UniqueConstraint(fields=['interview', 'offset_minutes'], name='reminder_interview_offset'),
+        ]
+
+    def __str__(self):
+        return f"Напоминание за {self.offset_minutes} мин. о собеседовании {self.interview_id}"
+
+class ResumeSignature(models.Model):
+    # Ключи поиска дублей: MinHash текста резюме, нормализованные телефон и ФИО (см. dedup.py)
+    resume = models.OneToOneField(Resume, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField(_('MinHash'))
+    phone_key = models.CharField(_('Телефон (нормализованный)'), max_length=20, blank=True, db_index=True)
+    name_key = models.CharField(_('ФИО (нормализованное)'), max_length=255, blank=True, db_index=True)
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True)
+
+    class Meta:
+        verbose_name = 'Сигнатура резюме'
+        verbose_name_plural = 'Сигнатуры резюме'
+
+    def __str__(self):
+        return f"Сигнатура резюме {self.resume_id}"
+
+class ResumeBucket(models.Model):
+    # LSH-корзины: резюме с совпадающим ключом хотя бы в одной полосе — кандидаты в дубли
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField(_('Полоса'))
+    key = models.BigIntegerField(_('Ключ корзины'))
+
+    class Meta:
+        verbose_name = 'LSH-корзина резюме'
+        verbose_name_plural = 'LSH-корзины резюме'
+        indexes = [
+            models.Index(fields=['band', 'key'], name='resumebucket_band_key'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['resume', 'band'], name='resumebucket_resume_band'),
+        ]
+
+    def __str__(self):
+        return f"Корзина {self.band}:{self.key} резюме {self.resume_id}"
+
 class Document(models.Model):
     interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name='documents')
     document_type = models.CharField(_('Тип документа'), max_length=100, choices=DocumentTypeChoices.choices)
-    file_path = models.FileField(upload_to=candidate_document_path)
+    file_path = models.FileField(upload_to=candidate_document_path, storage=document_storage, db_index=True)
     uploaded_at = models.DateTimeField(_('Дата загрузки'), auto_now_add=True)
     status = models.CharField(_('Статус'), max_length=20, choices=DocumentStatusChoices.choices, default=DocumentStatusChoices.UPLOADED)
     comment = models.TextField(_('Комментарий'), max_length=500, blank=True, default='')
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True, db_index=True)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_documents')
+    claim_expires_at = models.DateTimeField(_('Аренда до'), null=True, blank=True)
+    # Фоновая оптимизация PDF (команда optimize_documents): размеры до и после
+    optimization_status = models.CharField(_('Оптимизация'), max_length=20, choices=OptimizationStatusChoices.choices, default=OptimizationStatusChoices.PENDING)
+    original_size = models.PositiveIntegerField(_('Исходный размер'), null=True, blank=True)
+    optimized_size = models.PositiveIntegerField(_('Размер после оптимизации'), null=True, blank=True)
 
     class Meta:
         verbose_name = 'Документ'
         verbose_name_plural = 'Документы'
         unique_together = ['interview', 'document_type']
+        indexes = [
+            models.Index(fields=['interview', 'updated_at'], name='document_interview_updated'),
+            models.Index(fields=['status', 'claim_expires_at'], name='document_status_claim'),
+            models.Index(fields=['optimization_status', 'id'], name='document_optimization'),
+        ]
 
     def __str__(self):
-        return f"Документ {self.id} ({self.document_type}) для собеседования {self.interview.id}"
+        return f"Документ {self.id} ({self.document_type}) для собеседования {self.interview_id}"
 
 class DocumentHistory(models.Model):
     document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='history')
@@ -222,9 +341,33 @@ class DocumentHistory(models.Model):
     class Meta:
         verbose_name = 'История документа'
         verbose_name_plural = 'История документов'
+        indexes = [
+            models.Index(fields=['document', '-created_at'], name='dochistory_document_created'),
+            models.Index(fields=['created_at'], name='dochistory_created'),
+        ]
 
     def __str__(self):
-        return f"История документа {self.document.id} от {self.created_at}"
+        return f"История документа {self.document_id} от {self.created_at}"
+
+class DocumentHistoryArchive(models.Model):
+    # Записи истории старше срока хранения переносятся сюда командой archive_history
+    id = models.BigIntegerField(primary_key=True)
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='archived_history')
+    status = models.CharField(_('Статус'), max_length=20, choices=DocumentStatusChoices.choices)
+    comment = models.TextField(_('Комментарий'), max_length=500, blank=True, default='')
+    created_at = models.DateTimeField(_('Дата изменения'))
+    archived_at = models.DateTimeField(_('Дата архивации'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Архив истории документа'
+        verbose_name_plural = 'Архив истории документов'
+        indexes = [
+            models.Index(fields=['document', '-created_at'], name='dochistarch_document_created'),
+            models.Index(fields=['created_at'], name='dochistarch_created'),
+        ]
+
+    def __str__(self):
+        return f"Архив истории документа {self.document_id} от {self.created_at}"
 
 class Feedback(models.Model):
     document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='feedbacks')
@@ -237,7 +380,7 @@ class Feedback(models.Model):
         verbose_name_plural = 'Обратная связь'
 
     def __str__(self):
-        return f"Обратная связь {self.id} для документа {self.document.id}"
+        return f"Обратная связь {self.id} для документа {self.document_id}"
 
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -246,10 +389,136 @@ class Notification(models.Model):
     is_read = models.BooleanField(_('Прочитано'), default=False)
     sent_to_email = models.BooleanField(_('Отправлено на email'), default=False)
     type = models.CharField(_('Тип'), max_length=20, choices=NotificationTypeChoices.choices, default=NotificationTypeChoices.OTHER)
+    updated_at = models.DateTimeField(_('Дата изменения'), auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = 'Уведомление'
         verbose_name_plural = 'Уведомления'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_created'),
+            models.Index(fields=['created_at'], name='notification_created'),
+            models.Index(fields=['user', 'updated_at'], name='notification_user_updated'),
+        ]
+
+    def __str__(self):
+        return f"Уведомление {self.id} для {self.user.email}"
+
+class NotificationArchive(models.Model):
+    # Уведомления старше срока хранения переносятся сюда командой archive_history
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.TextField(_('Сообщение'))
+    created_at = models.DateTimeField(_('Дата создания'))
+    is_read = models.BooleanField(_('Прочитано'), default=False)
+    sent_to_email = models.BooleanField(_('Отправлено на email'), default=False)
+    type = models.CharField(_('Тип'), max_length=20, choices=NotificationTypeChoices.choices, default=NotificationTypeChoices.OTHER)
+    updated_at = models.DateTimeField(_('Дата изменения'))
+    archived_at = models.DateTimeField(_('Дата архивации'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Архивное уведомление'
+        verbose_name_plural = 'Архивные уведомления'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notifarch_user_created'),
+            models.Index(fields=['created_at'], name='notifarch_created'),
+        ]
+
+    def __str__(self):
+        return f"Архивное уведомление {self.id} для {self.user_id}"
+
+class FileDeletion(models.Model):
+    # Журнал файлов к удалению: пишется в той же транзакции, что и удаление строки документа,
+    # сами файлы удаляет команда sweep_deleted_files
+    path = models.CharField(_('Путь к файлу'), max_length=255)
+    created_at = models.DateTimeField(_('Дата постановки'), auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(_('Попыток удаления'), default=0)
+
+    class Meta:
+        verbose_name = 'Файл к удалению'
+        verbose_name_plural = 'Файлы к удалению'
+
+    def __str__(self):
+        return self.path
+
+class Tombstone(models.Model):
+    # Удаленные строки для дельта-синхронизации (/api/sync/); заполняется сигналами post_delete
+    model = models.CharField(_('Модель'), max_length=20)
+    object_id = models.BigIntegerField(_('ID объекта'))
+    user_id = models.BigIntegerField(_('ID пользователя'), null=True, blank=True)
+    candidate_id = models.BigIntegerField(_('ID кандидата'), null=True, blank=True)
+    deleted_at = models.DateTimeField(_('Дата удаления'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Удаленная запись'
+        verbose_name_plural = 'Удаленные записи'
+        indexes = [
+            models.Index(fields=['deleted_at'], name='tombstone_deleted'),
+            models.Index(fields=['candidate_id', 'deleted_at'], name='tombstone_candidate_deleted'),
+            models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_deleted'),
+        ]
+
+    def __str__(self):
+        return f"Удален {self.model} {self.object_id}"
+
+class StatusEvent(models.Model):
+    # Журнал изменений статусов резюме и собеседований (только добавление).
+    # stage — этап воронки, которому соответствует событие (пусто, если не соответствует);
+    # resume_type и vacancy копируются из записи, чтобы свертки не делали JOIN
+    entity = models.CharField(_('Сущность'), max_length=20)
+    object_id = models.BigIntegerField(_('ID объекта'))
+    candidate_id = models.BigIntegerField(_('ID кандидата'))
+    field = models.CharField(_('Поле'), max_length=20)
+    from_value = models.CharField(_('Было'), max_length=20, blank=True, default='')
+    to_value = models.CharField(_('Стало'), max_length=20)
+    stage = models.CharField(_('Этап воронки'), max_length=20, blank=True, default='')
+    resume_type = models.CharField(_('Тип заявки'), max_length=20, choices=ResumeTypeChoices.choices)
+    vacancy = models.CharField(_('Вакансия'), max_length=20, blank=True, default='')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='status_events')
+    created_at = models.DateTimeField(_('Дата события'), default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Событие статуса'
+        verbose_name_plural = 'События статусов'
+        indexes = [
+            models.Index(fields=['entity', 'object_id', 'id'], name='status_event_object'),
+            models.Index(fields=['candidate_id', 'resume_type', 'vacancy', 'stage', 'id'], name='status_event_journey'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id}: {self.field} {self.from_value or '—'} → {self.to_value}"
+
+class FunnelDaily(models.Model):
+    # Дневные свертки воронки, обновляются инкрементально из StatusEvent.
+    # durations: {этап: {номер корзины: количество}} — гистограмма длительности перехода с предыдущего этапа
+    day = models.DateField(_('День'))
+    resume_type = models.CharField(_('Тип заявки'), max_length=20, choices=ResumeTypeChoices.choices)
+    vacancy = models.CharField(_('Вакансия'), max_length=20, blank=True, default='')
+    submitted = models.PositiveIntegerField(_('Подано резюме'), default=0)
+    accepted = models.PositiveIntegerField(_('Принято резюме'), default=0)
+    interviewed = models.PositiveIntegerField(_('Проведено собеседований'), default=0)
+    succeeded = models.PositiveIntegerField(_('Успешных собеседований'), default=0)
+    hired = models.PositiveIntegerField(_('Принято на работу/практику'), default=0)
+    durations = models.JSONField(_('Длительности этапов'), default=dict)
+
+    class Meta:
+        verbose_name = 'Воронка за день'
+        verbose_name_plural = 'Воронка по дням'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'resume_type', 'vacancy'], name='funnel_daily_unique'),
+        ]
+
+    def __str__(self):
+        return f"Воронка {self.day} {self.resume_type} {self.vacancy}"
+
+class RollupCursor(models.Model):
+    # Последнее обработанное событие для каждой свертки
+    name = models.CharField(_('Свертка'), max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(_('Последнее событие'), default=0)
+    updated_at = models.DateTimeField(_('Дата обновления'), auto_now=True)
+
+    class Meta:
+        verbose_name = 'Позиция свертки'
+        verbose_name_plural = 'Позиции сверток'
 
     def __str__(self):
-        return f"Уведомление {self.id} для {self.user.email}"
\ No newline at end of file
+        return f"{self.name}: {self.last_event_id}"
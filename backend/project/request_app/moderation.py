@@ -0,0 +1,50 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Resume, Document, ResumeStatusChoices, DocumentStatusChoices
+
+# Очередь модерации: каждый модератор забирает следующие N свободных записей с арендой.
+# SELECT ... FOR UPDATE SKIP LOCKED пропускает строки, которые прямо сейчас забирает
+# другой модератор, поэтому параллельные запросы не ждут друг друга и не получают
+# одни и те же записи. Истекшая аренда считается свободной и забирается повторно.
+
+QUEUES = {
+    'resumes': (Resume, [ResumeStatusChoices.PENDING]),
+    'documents': (Document, [DocumentStatusChoices.UPLOADED, DocumentStatusChoices.UNDER_REVIEW]),
+}
+
+
+def lease_duration():
+    return timedelta(seconds=settings.MODERATION_LEASE_SECONDS)
+
+
+def claim(model, statuses, user, limit):
+    now = timezone.now()
+    expires_at = now + lease_duration()
+    with transaction.atomic():
+        # Свои записи тоже выдаются повторно — аренда продлевается
+        ids = list(
+            model.objects.select_for_update(skip_locked=True)
+            .filter(status__in=statuses)
+            .filter(Q(claimed_by__isnull=True) | Q(claim_expires_at__lt=now) | Q(claimed_by=user))
+            .order_by('id')
+            .values_list('id', flat=True)[:limit]
+        )
+        # update() не вызывает auto_now, updated_at выставляется явно для условного GET и синхронизации
+        model.objects.filter(id__in=ids).update(claimed_by=user, claim_expires_at=expires_at, updated_at=now)
+    return model.objects.filter(id__in=ids).order_by('id'), expires_at
+
+
+def release(model, ids, user):
+    return model.objects.filter(id__in=ids, claimed_by=user).update(
+        claimed_by=None, claim_expires_at=None, updated_at=timezone.now()
+    )
+
+
+def held_by_other(obj, user):
+    return (
+        obj.claimed_by_id is not None and obj.claimed_by_id != user.pk
+        and obj.claim_expires_at is not None and obj.claim_expires_at > timezone.now()
+    )
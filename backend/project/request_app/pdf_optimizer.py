@@ -0,0 +1,138 @@
+import io
+import logging
+import os
+import pikepdf
+from PIL import Image
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from .models import Document, FileDeletion, OptimizationStatusChoices, document_storage
+
+logger = logging.getLogger(__name__)
+
+# Фоновая оптимизация загруженных PDF (сканы с телефона почти всегда — крупные JPEG).
+# optimize_pdf — чистая функция для пула процессов: изображения крупнее MIN_IMAGE_BYTES
+# уменьшаются до IMAGE_MAX_SIDE по длинной стороне и пережимаются в JPEG, файл сохраняется
+# линеаризованным (первая страница показывается до загрузки всего файла).
+# Результат принимается, только если он открывается, число страниц совпало и размер
+# уменьшился; иначе остается исходный файл. Замена файла — в основном процессе:
+# новый файл под новым именем, старый уходит в журнал FileDeletion.
+
+MIN_IMAGE_BYTES = 64 * 1024
+MIN_GAIN_BYTES = 16 * 1024
+OPTIMIZED_SUFFIX = '.optimized.pdf'
+
+
+def _recompress_image(image):
+    raw = image.obj.read_raw_bytes()
+    if len(raw) < MIN_IMAGE_BYTES or image.obj.get('/SMask') is not None or image.image_mask:
+        return False
+    picture = image.as_pil_image()
+    if picture.mode not in ('RGB', 'L'):
+        if picture.mode in ('CMYK', 'P', 'LA', 'RGBA', '1', 'I;16'):
+            picture = picture.convert('RGB' if picture.mode != '1' else 'L')
+        else:
+            return False
+    max_side = settings.PDF_IMAGE_MAX_SIDE
+    if max(picture.size) > max_side:
+        picture.thumbnail((max_side, max_side), Image.LANCZOS)
+    buffer = io.BytesIO()
+    picture.save(buffer, format='JPEG', quality=settings.PDF_IMAGE_QUALITY, optimize=True)
+    data = buffer.getvalue()
+    if len(data) >= len(raw):
+        return False
+    image.obj.write(data, filter=pikepdf.Name.DCTDecode)
+    image.obj.Width, image.obj.Height = picture.size
+    image.obj.ColorSpace = pikepdf.Name.DeviceRGB if picture.mode == 'RGB' else pikepdf.Name.DeviceGray
+    image.obj.BitsPerComponent = 8
+    for key in ('/DecodeParms', '/Decode'):
+        if key in image.obj:
+            del image.obj[key]
+    return True
+
+
+def optimize_pdf(data):
+    # -> (оптимизированные байты или None, статус, причина)
+    try:
+        with pikepdf.open(io.BytesIO(data)) as pdf:
+            pages = len(pdf.pages)
+            seen = set()
+            for page in pdf.pages:
+                for _, obj in page.images.items():
+                    if obj.objgen in seen:
+                        continue
+                    seen.add(obj.objgen)
+                    try:
+                        _recompress_image(pikepdf.PdfImage(obj))
+                    except Exception as e:
+                        # Нестандартные фильтры и цветовые пространства (UnsupportedImageTypeError и др.),
+                        # слишком большие для PIL изображения (DecompressionBombError) оставляются как есть
+                        logger.debug("Изображение %s пропущено: %s", obj.objgen, e)
+            output = io.BytesIO()
+            pdf.save(output, linearize=True, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        result = output.getvalue()
+        with pikepdf.open(io.BytesIO(result)) as check:
+            if len(check.pages) != pages:
+                return None, OptimizationStatusChoices.FAILED, 'число страниц изменилось'
+    except Exception as e:
+        # Любая ошибка разбора — документ помечается FAILED, иначе он навсегда остается в очереди
+        return None, OptimizationStatusChoices.FAILED, f'{type(e).__name__}: {e}'
+    if len(data) - len(result) < MIN_GAIN_BYTES:
+        return None, OptimizationStatusChoices.SKIPPED, 'выигрыш слишком мал'
+    return result, OptimizationStatusChoices.OPTIMIZED, ''
+
+
+def optimize_job(document_id, name, data):
+    optimized, status, reason = optimize_pdf(data)
+    return document_id, name, len(data), optimized, status, reason
+
+
+def pending_documents(batch_size):
+    return list(
+        Document.objects.filter(optimization_status=OptimizationStatusChoices.PENDING)
+        .order_by('id').values_list('id', 'file_path')[:batch_size]
+    )
+
+
+def read_file(name):
+    with document_storage().open(name, 'rb') as handle:
+        return handle.read()
+
+
+def mark(document_id, status, original_size=None, optimized_size=None):
+    Document.objects.filter(pk=document_id).update(
+        optimization_status=status, original_size=original_size, optimized_size=optimized_size
+    )
+
+
+def apply_result(document_id, name, original_size, optimized, status, reason):
+    if optimized is None:
+        if status == OptimizationStatusChoices.FAILED:
+            logger.warning("Оптимизация документа %s не удалась, оставлен исходный файл: %s", document_id, reason)
+        mark(document_id, status, original_size, original_size)
+        return status
+    storage = document_storage()
+    stem, _ = os.path.splitext(name)
+    # Имя уже занимает почти всю длину file_path (upload_key): основа укорачивается,
+    # чтобы суффикс поместился, а max_length ограничивает и уникализацию имени хранилищем
+    max_length = Document._meta.get_field('file_path').max_length
+    stem = stem[:max_length - len(OPTIMIZED_SUFFIX)]
+    new_name = storage.save(stem + OPTIMIZED_SUFFIX, ContentFile(optimized), max_length=max_length)
+    try:
+        with transaction.atomic():
+            document = Document.objects.select_for_update().filter(pk=document_id).first()
+            if document is None or document.file_path.name != name:
+                # Документ удален или заменен, пока шла обработка — результат не нужен
+                FileDeletion.objects.create(path=new_name)
+                return None
+            Document.objects.filter(pk=document_id).update(
+                file_path=new_name, optimization_status=OptimizationStatusChoices.OPTIMIZED,
+                original_size=original_size, optimized_size=len(optimized), updated_at=timezone.now(),
+            )
+            FileDeletion.objects.create(path=name)
+    except Exception:
+        # Документ остался со старым файлом — новый удаляется по журналу
+        FileDeletion.objects.create(path=new_name)
+        raise
+    return OptimizationStatusChoices.OPTIMIZED
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from django.conf import settings
+
+current_profile = ContextVar('current_profile', default=None)
+
+_routes = {}
+_routes_lock = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = {}
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка для connection.execute_wrapper: время и «подпись» каждого запроса
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.query_count += 1
+            self.sql_time += duration
+            stats = self.queries.setdefault(sql, [0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def duplicates(self):
+        # Один и тот же SQL с разными параметрами внутри запроса — признак N+1
+        return {sql: stats[0] for sql, stats in self.queries.items() if stats[0] > 1}
+
+    def top_queries(self, limit=10):
+        ordered = sorted(self.queries.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {'sql': sql, 'count': count, 'time_ms': round(duration * 1000, 2)}
+            for sql, (count, duration) in ordered
+        ]
+
+    def server_timing(self, total):
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'serializer;dur={self.serializer_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def record(route, method, path, status_code, profile, total):
+    sample = {
+        'method': method,
+        'path': path,
+        'status': status_code,
+        'total_ms': round(total * 1000, 2),
+        'sql_ms': round(profile.sql_time * 1000, 2),
+        'serializer_ms': round(profile.serializer_time * 1000, 2),
+        'queries': profile.query_count,
+        'duplicates': profile.duplicates(),
+        'top_queries': profile.top_queries(),
+        'at': time.time(),
+    }
+    buffer = _routes.get(route)
+    if buffer is None:
+        with _routes_lock:
+            buffer = _routes.setdefault(route, deque(maxlen=settings.REQUEST_PROFILING_BUFFER_SIZE))
+    buffer.append(sample)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def route_summary(limit=20):
+    with _routes_lock:
+        routes = {route: list(buffer) for route, buffer in _routes.items()}
+    summary = []
+    for route, samples in routes.items():
+        if not samples:
+            continue
+        totals = [sample['total_ms'] for sample in samples]
+        slowest = max(samples, key=lambda sample: sample['total_ms'])
+        summary.append({
+            'route': route,
+            'requests': len(samples),
+            'avg_ms': round(sum(totals) / len(totals), 2),
+            'p95_ms': _percentile(totals, 0.95),
+            'max_ms': slowest['total_ms'],
+            'avg_queries': round(sum(sample['queries'] for sample in samples) / len(samples), 1),
+            'avg_sql_ms': round(sum(sample['sql_ms'] for sample in samples) / len(samples), 2),
+            'avg_serializer_ms': round(sum(sample['serializer_ms'] for sample in samples) / len(samples), 2),
+            'slowest': slowest,
+        })
+    summary.sort(key=lambda item: item['p95_ms'], reverse=True)
+    return summary[:limit]
+
+
+def reset():
+    with _routes_lock:
+        _routes.clear()
+
+
+def install_serializer_timing():
+    # Подменяет свойство .data у DRF-сериализаторов; вызывается только при включённом профилировании
+    from rest_framework import serializers
+
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        original = cls.data.fget
+
+        def timed_data(self, _original=original):
+            profile = current_profile.get()
+            if profile is None:
+                return _original(self)
+            profile._serializer_depth += 1
+            start = time.perf_counter()
+            try:
+                return _original(self)
+            finally:
+                profile._serializer_depth -= 1
+                if profile._serializer_depth == 0:
+                    profile.serializer_time += time.perf_counter() - start
+
+        cls.data = property(timed_data)
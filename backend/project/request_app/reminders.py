@@ -0,0 +1,86 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .labels import RESUME_TYPE_LABELS, JOB_TYPE_LABELS, PRACTICE_TYPE_LABELS
+from .models import Interview, InterviewReminder, Notification, InterviewStatusChoices, ResumeTypeChoices
+from .utils import send_notification_emails
+
+# Напоминания о собеседованиях. Каждый проход — диапазонный скан по индексу
+# (status, scheduled_at): SCHEDULED-собеседования в окне (сейчас, сейчас + смещение]
+# без записи InterviewReminder для этого смещения. Строки берутся через
+# FOR UPDATE SKIP LOCKED, поэтому несколько воркеров не отправят одно напоминание дважды,
+# а записи InterviewReminder (уникальные по собеседованию и смещению) переживают перезапуск.
+
+
+def _vacancy_name(interview):
+    if interview.resume_type == ResumeTypeChoices.JOB:
+        return JOB_TYPE_LABELS.get(interview.job_type, '')
+    return PRACTICE_TYPE_LABELS.get(interview.practice_type, '')
+
+
+def _full_name(user):
+    return f"{user.last_name} {user.first_name} {user.patronymic or ''}".strip()
+
+
+def send_due_reminders(batch_size=500, now=None):
+    now = now or timezone.now()
+    offsets = sorted(set(settings.INTERVIEW_REMINDER_OFFSETS))
+    notifications, candidate_emails, employee_emails = [], [], []
+    with transaction.atomic():
+        # От ближнего смещения к дальнему: если собеседование уже через час, суточное
+        # напоминание устарело — оно отмечается отправленным вместе с часовым
+        for index, offset in enumerate(offsets):
+            already_sent = InterviewReminder.objects.filter(interview=OuterRef('pk'), offset_minutes=offset)
+            interviews = list(
+                Interview.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(
+                    status=InterviewStatusChoices.SCHEDULED,
+                    scheduled_at__gt=now, scheduled_at__lte=now + timedelta(minutes=offset),
+                )
+                .filter(~Exists(already_sent))
+                .select_related('candidate__user', 'employee__user')
+                .order_by('scheduled_at')[:batch_size]
+            )
+            if not interviews:
+                continue
+            # Основная запись без ignore_conflicts: при гонке воркеров транзакция откатится целиком
+            InterviewReminder.objects.bulk_create([
+                InterviewReminder(interview=interview, offset_minutes=offset) for interview in interviews
+            ])
+            InterviewReminder.objects.bulk_create([
+                InterviewReminder(interview=interview, offset_minutes=later)
+                for interview in interviews for later in offsets[index + 1:]
+            ], ignore_conflicts=True)
+            for interview in interviews:
+                candidate, employee = interview.candidate.user, interview.employee.user
+                local = timezone.localtime(interview.scheduled_at).strftime('%d.%m.%Y %H:%M')
+                resume_type = RESUME_TYPE_LABELS.get(interview.resume_type, interview.resume_type)
+                vacancy_name = _vacancy_name(interview)
+                notifications.append(Notification(
+                    user=candidate,
+                    message=f'Напоминание: собеседование на {resume_type} ({vacancy_name}) {local} с сотрудником {employee.last_name} {employee.first_name}',
+                    type='INTERVIEW',
+                    sent_to_email=True,
+                ))
+                notifications.append(Notification(
+                    user=employee,
+                    message=f'Напоминание: собеседование с кандидатом {_full_name(candidate)} на {resume_type} ({vacancy_name}) {local}',
+                    type='INTERVIEW',
+                    sent_to_email=True,
+                ))
+                context = {'resume_type': resume_type, 'vacancy_name': vacancy_name, 'scheduled_at': local}
+                candidate_emails.append(({
+                    **context, 'user': candidate,
+                    'counterpart_label': 'Сотрудник', 'counterpart_name': f"{employee.last_name} {employee.first_name}",
+                }, [candidate.email]))
+                employee_emails.append(({
+                    **context, 'user': employee,
+                    'counterpart_label': 'Кандидат', 'counterpart_name': _full_name(candidate),
+                }, [employee.email]))
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        transaction.on_commit(lambda: send_notification_emails(
+            'Напоминание о собеседовании', 'emails/interview_reminder.html', candidate_emails + employee_emails
+        ))
+    return len(candidate_emails)
@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Чтение с реплик.
+# ReplicaMiddleware выбирает реплику для безопасных запросов (GET/HEAD и представления с
+# replica_reads = True) и кладет ее в read_alias; ReplicaRouter отправляет туда чтения запроса,
+# все записи — в default. После первой записи в рамках запроса чтения тоже идут в default.
+# Клиент, выполнивший изменяющий запрос, на REPLICA_PIN_SECONDS закрепляется за default
+# (отметка в общем кэше и cookie), чтобы сразу видеть свои изменения. Реплика с отставанием больше
+# REPLICA_MAX_LAG_SECONDS или недоступная исключается до следующей проверки.
+
+read_alias = ContextVar('read_alias', default=None)
+PIN_COOKIE = 'read_primary'
+
+LAG_SQL = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+_health = {}
+_probing = set()
+_health_lock = threading.Lock()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        if read_alias.get() is not None:
+            # Дальше в этом запросе читаем то, что только что записали
+            read_alias.set(None)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def replica_lag(alias):
+    connection = connections[alias]
+    connection.ensure_connection()
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def _check(alias):
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError as e:
+        logger.warning("Реплика %s недоступна: %s", alias, e)
+        connections[alias].close()
+        return False
+    if lag > settings.REPLICA_MAX_LAG_SECONDS:
+        logger.warning("Реплика %s отстает на %.1f с", alias, lag)
+        return False
+    return True
+
+
+def _probe(alias):
+    healthy = False
+    try:
+        healthy = _check(alias)
+    finally:
+        # Соединение потока проверки больше не понадобится
+        connections[alias].close()
+        with _health_lock:
+            _health[alias] = (time.monotonic(), healthy)
+            _probing.discard(alias)
+
+
+def is_healthy(alias):
+    # Запрос не ждет проверку: используется последний результат (до первого реплика считается
+    # недоступной), а устаревший обновляется в фоновом потоке — не больше одного на реплику.
+    # Результат кэшируется в процессе на REPLICA_HEALTH_CHECK_SECONDS
+    checked = _health.get(alias)
+    if checked and time.monotonic() - checked[0] < settings.REPLICA_HEALTH_CHECK_SECONDS:
+        return checked[1]
+    with _health_lock:
+        if alias not in _probing:
+            _probing.add(alias)
+            threading.Thread(target=_probe, args=(alias,), name=f'replica-probe-{alias}', daemon=True).start()
+    return bool(checked and checked[1])
+
+
+def mark_unhealthy(alias):
+    with _health_lock:
+        _health[alias] = (time.monotonic(), False)
+
+
+def choose_replica():
+    healthy = [alias for alias in settings.DATABASE_REPLICAS if is_healthy(alias)]
+    return random.choice(healthy) if healthy else None
+
+
+def _client_key(request):
+    # Middleware работает до аутентификации DRF, поэтому клиент определяется по токену,
+    # сессии или адресу; в кэш попадает только хеш
+    identity = (
+        request.headers.get('Authorization')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return 'replica_pin:' + hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+def pin(request, response):
+    # Кэш — для клиентов без cookie с тем же токеном; cookie — для смены токена
+    # (вход, регистрация), когда ключ по Authorization меняется
+    cache.set(_client_key(request), 1, settings.REPLICA_PIN_SECONDS)
+    response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES or cache.get(_client_key(request)) is not None
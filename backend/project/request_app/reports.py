@@ -0,0 +1,169 @@
+from datetime import datetime, time
+from itertools import islice
+from django.db.models import Count, Value
+from django.db.models.functions import Concat, Lower
+from django.utils import timezone
+from .labels import (
+    JOB_TYPE_LABELS, PRACTICE_TYPE_LABELS, INTERVIEW_STATUS_LABELS, INTERVIEW_RESULT_LABELS,
+    RESUME_STATUS_LABELS, DOCUMENT_STATUS_LABELS
+)
+from .models import Resume, Interview, Document, ResumeTypeChoices
+
+REPORT_HEADER = [
+    'candidate', 'resume_type', 'job_type', 'practice_type', 'resume_status', 'resume_date',
+    'interview_status', 'interview_result', 'interview_date', 'documents'
+]
+
+
+class ReportFilters:
+    # Те же фильтры, что и на странице отчетности модератора (ModeratorReportingPage)
+    def __init__(self, params):
+        self.resume_type = params.get('resume_type') or ResumeTypeChoices.JOB
+        self.search = (params.get('search') or '').strip().lower()
+        self.date_from = self._parse_date(params.get('date_from'), time.min)
+        self.date_to = self._parse_date(params.get('date_to'), time.max)
+        self.interview_status = params.get('interview_status') or ''
+        self.interview_result = params.get('interview_result') or ''
+        self.document_status = params.get('document_status') or ''
+        self.job_type = (params.get('job_type') or '') if self.resume_type == ResumeTypeChoices.JOB else ''
+        self.practice_type = (params.get('practice_type') or '') if self.resume_type == ResumeTypeChoices.PRACTICE else ''
+
+    @staticmethod
+    def _parse_date(value, at):
+        if not value:
+            return None
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Неверный формат даты. Используйте ГГГГ-ММ-ДД')
+        return timezone.make_aware(datetime.combine(day, at))
+
+    def _with_search(self, queryset, prefix):
+        if not self.search:
+            return queryset
+        full_name = Lower(Concat(
+            f'{prefix}last_name', Value(' '), f'{prefix}first_name', Value(' '), f'{prefix}patronymic'
+        ))
+        return queryset.annotate(report_full_name=full_name).filter(report_full_name__contains=self.search)
+
+    def _with_dates(self, queryset, field):
+        if self.date_from:
+            queryset = queryset.filter(**{f'{field}__gte': self.date_from})
+        if self.date_to:
+            queryset = queryset.filter(**{f'{field}__lte': self.date_to})
+        return queryset
+
+    def resumes(self):
+        queryset = Resume.objects.filter(resume_type=self.resume_type)
+        queryset = self._with_search(queryset, 'candidate__user__')
+        queryset = self._with_dates(queryset, 'created_at')
+        if self.job_type:
+            queryset = queryset.filter(job_type=self.job_type)
+        if self.practice_type:
+            queryset = queryset.filter(practice_type=self.practice_type)
+        return queryset
+
+    def interviews(self, candidate_ids=None):
+        queryset = Interview.objects.filter(resume_type=self.resume_type)
+        if candidate_ids is not None:
+            queryset = queryset.filter(candidate_id__in=candidate_ids)
+        queryset = self._with_search(queryset, 'candidate__user__')
+        queryset = self._with_dates(queryset, 'scheduled_at')
+        if self.interview_status:
+            queryset = queryset.filter(status=self.interview_status)
+        if self.interview_result:
+            queryset = queryset.filter(result=self.interview_result)
+        if self.job_type:
+            queryset = queryset.filter(job_type=self.job_type)
+        if self.practice_type:
+            queryset = queryset.filter(practice_type=self.practice_type)
+        return queryset
+
+    def documents(self, candidate_ids):
+        queryset = Document.objects.filter(
+            interview__resume_type=self.resume_type, interview__candidate_id__in=candidate_ids
+        )
+        queryset = self._with_search(queryset, 'interview__candidate__user__')
+        queryset = self._with_dates(queryset, 'uploaded_at')
+        if self.document_status:
+            queryset = queryset.filter(status=self.document_status)
+        if self.job_type:
+            queryset = queryset.filter(interview__job_type=self.job_type)
+        if self.practice_type:
+            queryset = queryset.filter(interview__practice_type=self.practice_type)
+        return queryset
+
+
+def _local(value):
+    return timezone.localtime(value) if value else None
+
+
+def report_rows(filters, chunk_size=2000, offset=0, limit=None):
+    # Резюме читаются серверным курсором пачками; собеседования и документы
+    # подгружаются одним запросом на пачку, поэтому память не растет с объемом выгрузки
+    resumes = filters.resumes().order_by('id')
+    if limit is not None:
+        resumes = resumes[offset:offset + limit]
+    resumes = resumes.values(
+        'candidate_id', 'candidate__user__last_name', 'candidate__user__first_name',
+        'candidate__user__patronymic', 'resume_type', 'job_type', 'practice_type', 'status', 'created_at'
+    ).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(resumes, chunk_size))
+        if not chunk:
+            return
+        candidate_ids = {row['candidate_id'] for row in chunk}
+        interviews = {}
+        for interview in filters.interviews(candidate_ids).order_by('scheduled_at').values(
+            'candidate_id', 'status', 'result', 'scheduled_at'
+        ):
+            interviews.setdefault(interview['candidate_id'], interview)
+        documents = {}
+        for document in filters.documents(candidate_ids).order_by('id').values(
+            'interview__candidate_id', 'document_type', 'status'
+        ):
+            documents.setdefault(document['interview__candidate_id'], []).append(document)
+        for row in chunk:
+            is_job = row['resume_type'] == ResumeTypeChoices.JOB
+            interview = interviews.get(row['candidate_id'])
+            related = documents.get(row['candidate_id'], [])
+            scheduled_at = _local(interview['scheduled_at']) if interview else None
+            yield [
+                f"{row['candidate__user__last_name'] or ''} {row['candidate__user__first_name'] or ''} {row['candidate__user__patronymic'] or ''}".strip(),
+                'Работа' if is_job else 'Практика',
+                JOB_TYPE_LABELS.get(row['job_type'], 'Не указан') if is_job else '',
+                PRACTICE_TYPE_LABELS.get(row['practice_type'], 'Не указан') if not is_job else '',
+                RESUME_STATUS_LABELS.get(row['status'], row['status']),
+                _local(row['created_at']).strftime('%d.%m.%Y'),
+                INTERVIEW_STATUS_LABELS.get(interview['status'], 'Нет') if interview else 'Нет',
+                INTERVIEW_RESULT_LABELS.get(interview['result'], 'Нет') if interview else 'Нет',
+                scheduled_at.strftime('%d.%m.%Y, %H:%M:%S') if scheduled_at else 'Нет',
+                '; '.join(
+                    f"{document['document_type']} ({DOCUMENT_STATUS_LABELS.get(document['status'], document['status'])})"
+                    for document in related
+                ) or 'Нет',
+            ]
+
+
+def report_page(filters, offset, limit):
+    # Страница отчета для ModeratorReportingPage: строки как в выгрузке и сводки для графиков —
+    # агрегаты GROUP BY, клиент не загружает полные списки резюме, собеседований и документов
+    resumes = filters.resumes()
+    vacancy = 'job_type' if filters.resume_type == ResumeTypeChoices.JOB else 'practice_type'
+    interviews = {}
+    for row in filters.interviews().order_by().values('status', 'result').annotate(total=Count('id')):
+        key = 'CANCELLED' if row['status'] == 'CANCELLED' else row['result']
+        interviews[key] = interviews.get(key, 0) + row['total']
+    return {
+        'count': resumes.count(),
+        'results': [dict(zip(REPORT_HEADER, row)) for row in report_rows(filters, offset=offset, limit=limit)],
+        'resumes_by_vacancy': {
+            row[vacancy] or '': row['total']
+            for row in resumes.order_by().values(vacancy).annotate(total=Count('id'))
+        },
+        'interviews_by_result': interviews,
+        'types': [
+            resume_type for resume_type in ResumeTypeChoices.values
+            if Resume.objects.filter(resume_type=resume_type).exists() or Interview.objects.filter(resume_type=resume_type).exists()
+        ],
+    }
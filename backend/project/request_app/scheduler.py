@@ -0,0 +1,189 @@
+import heapq
+from bisect import bisect_right
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .labels import RESUME_TYPE_LABELS, JOB_TYPE_LABELS, PRACTICE_TYPE_LABELS
+from .models import (
+    Employee, EmployeeAvailability, Resume, Interview, Notification, StatusEvent,
+    ResumeStatusChoices, ResumeTypeChoices, InterviewStatusChoices
+)
+from .funnel import status_event
+from .utils import send_notification_emails
+
+# Автоматическое назначение собеседований.
+# 1. Свободные слоты каждого сотрудника строятся из рабочих часов (EmployeeAvailability)
+#    с шагом INTERVIEW_SLOT_MINUTES; занятые интервалы отсекаются бинарным поиском
+#    по отсортированному списку уже назначенных собеседований.
+# 2. Кандидаты (FIFO по дате резюме) раздаются через min-heap по (загрузка, ближайший слот):
+#    следующий кандидат всегда уходит наименее загруженному сотруднику в его ближайший слот.
+#    Это O((C + S) log E) вместо перебора, а разница в загрузке не превышает одного собеседования,
+#    пока у сотрудников есть слоты.
+# 3. Занятость кандидата (уже назначенные собеседования другого типа) учитывается так же:
+#    сотруднику достается его ближайший слот, не пересекающийся с ними; если таких нет,
+#    берется следующий сотрудник из кучи.
+
+
+def slot_length():
+    return timedelta(minutes=settings.INTERVIEW_SLOT_MINUTES)
+
+
+def pending_resumes():
+    # Принятые резюме без активного или проведенного собеседования того же типа; по одному на кандидата
+    has_interview = Interview.objects.filter(
+        candidate_id=OuterRef('candidate_id'), resume_type=OuterRef('resume_type')
+    ).exclude(status=InterviewStatusChoices.CANCELLED)
+    rows = (
+        Resume.objects.filter(status=ResumeStatusChoices.ACCEPTED)
+        .filter(~Exists(has_interview))
+        .order_by('created_at', 'id')
+        .values(
+            'id', 'candidate_id', 'resume_type', 'job_type', 'practice_type',
+            'candidate__user_id', 'candidate__user__email', 'candidate__user__first_name', 'candidate__user__patronymic',
+        )
+    )
+    seen = set()
+    for row in rows:
+        if row['candidate_id'] not in seen:
+            seen.add(row['candidate_id'])
+            yield row
+
+
+def free_slots(windows, busy, date_from, days, not_before):
+    # windows: [(weekday, start, end)], busy: отсортированные начала занятых собеседований
+    step = slot_length()
+    tz = timezone.get_current_timezone()
+    slots = deque()
+    for offset in range(days):
+        day = date_from + timedelta(days=offset)
+        for weekday, start, end in windows:
+            if weekday != day.weekday():
+                continue
+            moment = timezone.make_aware(datetime.combine(day, start), tz)
+            finish = timezone.make_aware(datetime.combine(day, end), tz)
+            while moment + step <= finish:
+                # Первое занятое начало после moment - step; конфликт, если оно раньше moment + step
+                index = bisect_right(busy, moment - step)
+                if moment >= not_before and (index == len(busy) or busy[index] >= moment + step):
+                    slots.append(moment)
+                moment += step
+    return slots
+
+
+def _first_free(employee_slots, candidate_busy, step):
+    # Позиция ближайшего слота сотрудника, свободного у кандидата; у кандидата единицы
+    # собеседований, поэтому просмотр заканчивается на первых слотах
+    for position, moment in enumerate(employee_slots):
+        if all(abs(moment - other) >= step for other in candidate_busy):
+            return position
+    return None
+
+
+def build_plan(date_from, days):
+    now = timezone.now()
+    step = slot_length()
+    windows = defaultdict(list)
+    for row in EmployeeAvailability.objects.values_list('employee_id', 'weekday', 'start_time', 'end_time'):
+        windows[row[0]].append(row[1:])
+    busy = defaultdict(list)
+    candidate_busy = defaultdict(list)
+    horizon_start = timezone.make_aware(datetime.combine(date_from, datetime.min.time())) - step
+    for employee_id, candidate_id, scheduled_at in (
+        Interview.objects.filter(
+            status=InterviewStatusChoices.SCHEDULED,
+            scheduled_at__gte=horizon_start, scheduled_at__lt=horizon_start + timedelta(days=days + 1),
+        ).order_by('scheduled_at').values_list('employee_id', 'candidate_id', 'scheduled_at')
+    ):
+        busy[employee_id].append(scheduled_at)
+        candidate_busy[candidate_id].append(scheduled_at)
+
+    heap = []
+    slots = {}
+    for employee_id, employee_windows in windows.items():
+        employee_slots = free_slots(sorted(employee_windows), busy[employee_id], date_from, days, now)
+        if employee_slots:
+            slots[employee_id] = employee_slots
+            heap.append((0, employee_slots[0], employee_id))
+    heapq.heapify(heap)
+
+    assignments, unscheduled = [], []
+    for resume in pending_resumes():
+        occupied = candidate_busy[resume['candidate_id']]
+        skipped = []
+        chosen = None
+        while heap:
+            load, first_slot, employee_id = heapq.heappop(heap)
+            position = _first_free(slots[employee_id], occupied, step)
+            if position is not None:
+                chosen = load, employee_id, position
+                break
+            skipped.append((load, first_slot, employee_id))
+        for item in skipped:
+            heapq.heappush(heap, item)
+        if chosen is None:
+            unscheduled.append(resume['candidate_id'])
+            continue
+        load, employee_id, position = chosen
+        scheduled_at = slots[employee_id][position]
+        del slots[employee_id][position]
+        occupied.append(scheduled_at)
+        assignments.append((resume, employee_id, scheduled_at))
+        if slots[employee_id]:
+            heapq.heappush(heap, (load + 1, slots[employee_id][0], employee_id))
+    return assignments, unscheduled
+
+
+def _vacancy_name(row):
+    if row['resume_type'] == ResumeTypeChoices.JOB:
+        return JOB_TYPE_LABELS.get(row['job_type'], '')
+    return PRACTICE_TYPE_LABELS.get(row['practice_type'], '')
+
+
+def schedule(date_from, days, dry_run=False, actor=None):
+    if dry_run:
+        return build_plan(date_from, days)
+    with transaction.atomic():
+        # Блокировка сотрудников сериализует параллельные запуски: два плана не займут один слот
+        list(Employee.objects.select_for_update(of=('self',)).filter(availability__isnull=False).values_list('id', flat=True))
+        assignments, unscheduled = build_plan(date_from, days)
+        interviews = Interview.objects.bulk_create([
+            Interview(
+                candidate_id=resume['candidate_id'], employee_id=employee_id, scheduled_at=scheduled_at,
+                resume_type=resume['resume_type'], job_type=resume['job_type'], practice_type=resume['practice_type'],
+            )
+            for resume, employee_id, scheduled_at in assignments
+        ], batch_size=1000)
+        StatusEvent.objects.bulk_create(
+            [status_event('interview', interview, 'status', None, interview.status, actor) for interview in interviews], batch_size=1000
+        )
+        employees = {
+            employee.id: employee
+            for employee in Employee.objects.select_related('user').filter(id__in={item[1] for item in assignments})
+        }
+        notifications, emails = [], []
+        for resume, employee_id, scheduled_at in assignments:
+            employee_user = employees[employee_id].user
+            local = timezone.localtime(scheduled_at).strftime('%d.%m.%Y %H:%M')
+            resume_type = RESUME_TYPE_LABELS.get(resume['resume_type'], resume['resume_type'])
+            notifications.append(Notification(
+                user_id=resume['candidate__user_id'],
+                message=f'Назначено собеседование на {resume_type} ({_vacancy_name(resume)}) на {local} с сотрудником {employee_user.last_name} {employee_user.first_name}',
+                type='INTERVIEW',
+                sent_to_email=True,
+            ))
+            emails.append(({
+                'user': {'first_name': resume['candidate__user__first_name'], 'patronymic': resume['candidate__user__patronymic']},
+                'resume_type': resume_type,
+                'vacancy_name': _vacancy_name(resume),
+                'scheduled_at': local,
+                'employee_name': f"{employee_user.last_name} {employee_user.first_name}",
+            }, [resume['candidate__user__email']]))
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        # Письма уходят только после фиксации транзакции, одним SMTP-соединением
+        transaction.on_commit(lambda: send_notification_emails(
+            'Назначено собеседование', 'emails/interview_notification.html', emails
+        ))
+    return assignments, unscheduled
@@ -0,0 +1,202 @@
+import logging
+import os
+import re
+import threading
+import zlib
+from datetime import timedelta
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import connections
+from django.db.models import Max
+from .models import Resume, Tombstone, ResumeStatusChoices, JobTypeChoices, PracticeTypeChoices
+
+logger = logging.getLogger(__name__)
+
+# Ранжирование резюме на рассмотрении по близости к профилю вакансии.
+# Слова приводятся к нижнему регистру и обрезаются до STEM_LENGTH символов (грубая
+# замена стемминга для русских окончаний), затем хешируются в N_FEATURES столбцов —
+# словарь не хранится и не перестраивается. В памяти процесса лежит разреженная
+# матрица сублинейных частот (1 + ln tf) всех PENDING-резюме и число документов
+# с каждым признаком. Оценка — косинус между строкой TF-IDF и профилем:
+#   score = X @ (idf² · q) / (||X · idf|| · ||q · idf||)
+# Это два умножения разреженной матрицы на вектор, поэтому idf не нужно
+# пересчитывать в саму матрицу при каждом новом резюме.
+# Индекс обновляется инкрементально: перед ранжированием забираются резюме
+# с updated_at после последней синхронизации и надгробия удаленных резюме.
+# Полное построение выполняется при старте процесса (warm_up из wsgi/asgi) в фоновом
+# потоке, а не в первом запросе ranked; запросы делают только инкрементальное обновление.
+
+N_FEATURES = 1 << 18
+STEM_LENGTH = 6
+SYNC_OVERLAP = timedelta(seconds=5)
+
+_WORD = re.compile(r'\w+')
+
+VACANCIES = [value for value, _ in JobTypeChoices.choices] + [value for value, _ in PracticeTypeChoices.choices]
+_VACANCY_CODES = {value: code for code, value in enumerate(VACANCIES)}
+
+
+def terms(text):
+    words = _WORD.findall((text or '').lower().replace('ё', 'е'))
+    return [word[:STEM_LENGTH] for word in words if len(word) > 1]
+
+
+def feature(term):
+    return zlib.crc32(term.encode()) % N_FEATURES
+
+
+def term_matrix(texts):
+    # Словарь признаков живет один вызов: повторяющиеся слова хешируются один раз
+    known = {}
+    indptr, cols = [0], []
+    for text in texts:
+        for term in terms(text):
+            column = known.get(term)
+            if column is None:
+                column = known[term] = feature(term)
+            cols.append(column)
+        indptr.append(len(cols))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(cols), dtype=np.float32), np.array(cols, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(texts), N_FEATURES),
+    )
+    # Повторы одного признака суммируются при сборке CSR; дальше сублинейная частота
+    matrix.sum_duplicates()
+    np.log(matrix.data, out=matrix.data)
+    matrix.data += 1
+    return matrix
+
+
+def _vacancy(row):
+    return row['job_type'] if row['resume_type'] == 'JOB' else row['practice_type']
+
+
+class ScoringIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vacancies = np.empty(0, dtype=np.int16)
+        self.matrix = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.doc_freq = np.zeros(N_FEATURES, dtype=np.float64)
+        self.synced_at = None
+        self._profiles = {}
+
+    def _remove(self, ids):
+        if not len(self.ids) or not ids:
+            return
+        keep = ~np.isin(self.ids, np.fromiter(ids, dtype=np.int64, count=len(ids)))
+        if keep.all():
+            return
+        removed = self.matrix[~keep]
+        self.doc_freq = self.doc_freq - np.bincount(removed.indices, minlength=N_FEATURES)
+        self.ids, self.vacancies, self.matrix = self.ids[keep], self.vacancies[keep], self.matrix[keep]
+
+    def _add(self, rows):
+        if not rows:
+            return
+        added = term_matrix([row['content'] for row in rows])
+        self.doc_freq = self.doc_freq + np.bincount(added.indices, minlength=N_FEATURES)
+        self.ids = np.concatenate([self.ids, np.fromiter((row['id'] for row in rows), dtype=np.int64, count=len(rows))])
+        self.vacancies = np.concatenate([
+            self.vacancies,
+            np.fromiter((_VACANCY_CODES.get(_vacancy(row), -1) for row in rows), dtype=np.int16, count=len(rows)),
+        ])
+        self.matrix = sparse.vstack([self.matrix, added], format='csr')
+
+    def refresh(self):
+        # Один диапазонный запрос по индексу updated_at; небольшой нахлест окна
+        # подбирает строки из транзакций, зафиксированных позже своего updated_at
+        values = ('id', 'content', 'status', 'resume_type', 'job_type', 'practice_type', 'updated_at')
+        with self.lock:
+            changed = Resume.objects.all()
+            deleted = []
+            if self.synced_at is not None:
+                since = self.synced_at - SYNC_OVERLAP
+                changed = changed.filter(updated_at__gte=since)
+                deleted = list(Tombstone.objects.filter(model='resume', deleted_at__gte=since).values_list('object_id', flat=True))
+            else:
+                changed = changed.filter(status=ResumeStatusChoices.PENDING)
+            rows = list(changed.values(*values))
+            if not rows and not deleted:
+                return
+            self._remove({row['id'] for row in rows} | set(deleted))
+            self._add([row for row in rows if row['status'] == ResumeStatusChoices.PENDING])
+            latest = max((row['updated_at'] for row in rows), default=None)
+            if self.synced_at is None:
+                # Пустая очередь: отсчет от последнего изменения любого резюме
+                latest = latest or Resume.objects.aggregate(latest=Max('updated_at'))['latest']
+            if latest and (self.synced_at is None or latest > self.synced_at):
+                self.synced_at = latest
+
+    def profile(self, vacancy):
+        keywords = settings.RESUME_SCORING_PROFILES.get(vacancy)
+        if not keywords:
+            return None
+        if vacancy not in self._profiles:
+            self._profiles[vacancy] = term_matrix([' '.join(keywords)]).toarray().ravel()
+        return self._profiles[vacancy]
+
+    def rank(self, vacancy, limit, offset=0, only_vacancy=True):
+        query = self.profile(vacancy)
+        if query is None:
+            return 0, []
+        # Обновление заменяет массивы целиком, поэтому снимка под блокировкой достаточно
+        with self.lock:
+            ids, vacancies, matrix, doc_freq = self.ids, self.vacancies, self.matrix, self.doc_freq
+        total = len(ids)
+        if only_vacancy:
+            mask = vacancies == _VACANCY_CODES[vacancy]
+            ids, matrix = ids[mask], matrix[mask]
+        if not len(ids):
+            return 0, []
+        # Сглаженный idf, как в sklearn: ln((1 + n) / (1 + df)) + 1
+        idf = np.log((1.0 + total) / (1.0 + doc_freq)) + 1.0
+        weighted_query = query * idf
+        query_norm = np.linalg.norm(weighted_query)
+        row_norms = np.sqrt(matrix.multiply(matrix) @ (idf * idf))
+        scores = (matrix @ (weighted_query * idf)) / (np.maximum(row_norms, 1e-12) * query_norm)
+        # Частичная сортировка: полностью упорядочиваются только offset + limit лучших
+        top = min(offset + limit, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.lexsort((ids[best], -scores[best]))][offset:]
+        return len(ids), [(int(ids[i]), round(float(scores[i]), 4)) for i in best]
+
+
+index = ScoringIndex()
+_warm_up_enabled = False
+
+
+def _build():
+    try:
+        index.refresh()
+    except Exception:
+        logger.exception("Не удалось построить индекс ранжирования резюме")
+    finally:
+        # Соединение потока больше не понадобится
+        connections.close_all()
+
+
+def warm_up():
+    global _warm_up_enabled
+    if not settings.RESUME_SCORING_WARM_UP:
+        return
+    _warm_up_enabled = True
+    threading.Thread(target=_build, name='scoring-warm-up', daemon=True).start()
+
+
+def _after_fork():
+    # После fork (gunicorn --preload) потока построения нет, а индекс и блокировка могли
+    # остаться в промежуточном состоянии — процесс строит свой индекс заново
+    global index
+    index = ScoringIndex()
+    if _warm_up_enabled:
+        warm_up()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def rank_resumes(vacancy, limit, offset=0, only_vacancy=True):
+    index.refresh()
+    return index.rank(vacancy, limit, offset, only_vacancy)
@@ -1,6 +1,10 @@
 from rest_framework import serializers
+from django.urls import reverse
 from django.db import models
-from .models import User, Candidate, Resume, Notification, Interview, Document, Employee, DocumentHistory, DocumentTypeChoices, GenderChoices
+from .labels import (
+    RESUME_STATUS_LABELS, EDUCATION_DISPLAY, PRACTICE_TYPE_DISPLAY, JOB_TYPE_LABELS, DOCUMENT_STATUS_LABELS
+)
+from .models import User, Candidate, Resume, Notification, Interview, Document, Employee, DocumentHistory, DocumentTypeChoices, GenderChoices, NotificationArchive, DocumentHistoryArchive
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, min_length=8)
@@ -77,34 +81,16 @@ class ResumeSerializer(serializers.ModelSerializer):
         return None
 
     def get_status_display(self, obj):
-        return {
-            'PENDING': 'На рассмотрении',
-            'ACCEPTED': 'Принято',
-            'REJECTED': 'Отклонено'
-        }.get(obj.status, obj.status)
+        return RESUME_STATUS_LABELS.get(obj.status, obj.status)
 
     def get_education_display(self, obj):
-        return {
-            'SECONDARY': 'Среднее',
-            'HIGHER': 'Высшее',
-            'POSTGRADUATE': 'Аспирантура',
-            '': 'Не указано'
-        }.get(obj.education, obj.education)
+        return EDUCATION_DISPLAY.get(obj.education, obj.education)
 
     def get_practice_type_display(self, obj):
-        return {
-            'PRE_DIPLOMA': 'Преддипломная',
-            'PRODUCTION': 'Производственная',
-            'EDUCATIONAL': 'Учебная',
-            None: '-'
-        }.get(obj.practice_type, obj.practice_type)
+        return PRACTICE_TYPE_DISPLAY.get(obj.practice_type, obj.practice_type)
 
     def get_job_type_display(self, obj):
-        return {
-            'PROGRAMMER': 'Инженер-программист',
-            'METHODOLOGIST': 'Методолог',
-            'SPECIALIST': 'Специалист'
-        }.get(obj.job_type, '')
+        return JOB_TYPE_LABELS.get(obj.job_type, '')
 
     def validate_content(self, value):
         if not value.strip():
@@ -255,19 +241,10 @@ class InterviewSerializer(serializers.ModelSerializer):
         fields = ['id', 'candidate', 'employee', 'scheduled_at', 'status', 'result', 'comment', 'resume_type', 'practice_type', 'practice_type_display', 'job_type', 'job_type_display']
 
     def get_job_type_display(self, obj):
-        return {
-            'PROGRAMMER': 'Инженер-программист',
-            'METHODOLOGIST': 'Методолог',
-            'SPECIALIST': 'Специалист'
-        }.get(obj.job_type, '')
+        return JOB_TYPE_LABELS.get(obj.job_type, '')
 
     def get_practice_type_display(self, obj):
-        return {
-            'PRE_DIPLOMA': 'Преддипломная',
-            'PRODUCTION': 'Производственная',
-            'EDUCATIONAL': 'Учебная',
-            None: '-'
-        }.get(obj.practice_type, '')
+        return PRACTICE_TYPE_DISPLAY.get(obj.practice_type, '')
 
 class DocumentHistorySerializer(serializers.ModelSerializer):
     status_display = serializers.SerializerMethodField()
@@ -278,17 +255,50 @@ class DocumentHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'status_display', 'created_at']
 
     def get_status_display(self, obj):
-        return {
-            'UPLOADED': 'Загружен',
-            'UNDER_REVIEW': 'На проверке',
-            'ACCEPTED': 'Принят',
-            'REJECTED': 'Отклонен',
-            'DELETED': 'Удалён'
-        }.get(obj.status, obj.status)
+        return DOCUMENT_STATUS_LABELS.get(obj.status, obj.status)
+
+class DocumentHistoryArchiveSerializer(DocumentHistorySerializer):
+    class Meta(DocumentHistorySerializer.Meta):
+        model = DocumentHistoryArchive
+
+DOCUMENT_MAX_SIZE = 5 * 1024 * 1024  # 5MB
+
+def validate_pdf_name(name):
+    if not name.endswith('.pdf'):
+        raise serializers.ValidationError('Файл должен быть в формате PDF')
+
+def validate_document_size(size):
+    if size > DOCUMENT_MAX_SIZE:
+        raise serializers.ValidationError('Размер файла не должен превышать 5 МБ')
+
+def validate_document_slot(interview, document_type, instance=None):
+    if not interview:
+        raise serializers.ValidationError("Собеседование не указано")
+    if interview.result != 'SUCCESS':
+        raise serializers.ValidationError("Документы можно загружать только после успешного собеседования")
+    if instance:
+        return
+    existing_docs = Document.objects.filter(interview=interview).count()
+    if existing_docs >= 10:
+        raise serializers.ValidationError("Максимум 10 документов для одного собеседования")
+    if document_type and Document.objects.filter(interview=interview, document_type=document_type).exists():
+        raise serializers.ValidationError(f"Документ типа {document_type} уже загружен для этого собеседования")
+
+def document_link(request, document_id):
+    # Постоянный адрес действия download_url: ссылки на сам файл истекают через
+    # DOCUMENT_DOWNLOAD_URL_EXPIRE, а списки документов кэшируются клиентом по ETag
+    url = reverse('documents-download-url', args=[document_id])
+    return request.build_absolute_uri(url) if request is not None else url
+
+class DocumentFileField(serializers.FileField):
+    def to_representation(self, value):
+        if not value:
+            return None
+        return document_link(self.context.get('request'), value.instance.pk)
 
 class DocumentSerializer(serializers.ModelSerializer):
     interview = InterviewSerializer(read_only=True)
-    file_path = serializers.FileField(required=True)
+    file_path = DocumentFileField(required=True)
     document_type = serializers.ChoiceField(choices=DocumentTypeChoices.choices, required=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     comment = serializers.CharField(max_length=500, required=False, allow_blank=True)
@@ -299,29 +309,40 @@ class DocumentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'interview', 'uploaded_at', 'status', 'status_display']
 
     def validate(self, data):
-        interview = self.context.get('interview')
-        if not interview:
-            raise serializers.ValidationError("Собеседование не указано")
-        if interview.result != 'SUCCESS':
-            raise serializers.ValidationError("Документы можно загружать только после успешного собеседования")
-        existing_docs = Document.objects.filter(interview=interview).count()
-        if existing_docs >= 10 and not self.instance:
-            raise serializers.ValidationError("Максимум 10 документов для одного собеседования")
-        if 'document_type' in data and Document.objects.filter(
-            interview=interview,
-            document_type=data['document_type']
-        ).exists() and not self.instance:
-            raise serializers.ValidationError(f"Документ типа {data['document_type']} уже загружен для этого собеседования")
+        validate_document_slot(self.context.get('interview'), data.get('document_type'), self.instance)
         return data
 
     def validate_file_path(self, value):
-        if not value.name.endswith('.pdf'):
-            raise serializers.ValidationError('Файл должен быть в формате PDF')
-        if value.size > 5 * 1024 * 1024:  # 5MB
-            raise serializers.ValidationError('Размер файла не должен превышать 5 МБ')
+        validate_pdf_name(value.name)
+        validate_document_size(value.size)
         return value
 
+class DocumentUploadRequestSerializer(serializers.Serializer):
+    # Запрос подписанной ссылки для прямой загрузки: проверки те же, что при обычной загрузке,
+    # но по заявленным имени и размеру; фактический файл проверяется на шаге finalize
+    document_type = serializers.ChoiceField(choices=DocumentTypeChoices.choices)
+    file_name = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_file_name(self, value):
+        validate_pdf_name(value)
+        return value
+
+    def validate_size(self, value):
+        validate_document_size(value)
+        return value
+
+    def validate(self, data):
+        validate_document_slot(self.context.get('interview'), data.get('document_type'))
+        return data
+
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ['id', 'user', 'message', 'is_read', 'created_at', 'sent_to_email', 'type']
\ No newline at end of file
+        fields = ['id', 'user', 'message', 'is_read', 'created_at', 'sent_to_email', 'type']
+
+class NotificationArchiveSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationArchive
+        fields = ['id', 'user', 'message', 'is_read', 'created_at', 'sent_to_email', 'type']
+        read_only_fields = fields
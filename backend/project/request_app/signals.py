@@ -0,0 +1,78 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .dedup import index_resume, index_resumes
+from .models import User, Resume, Interview, Document, Notification, Tombstone, FileDeletion
+
+# Надгробия для дельта-синхронизации: владелец записывается вместе с id,
+# чтобы /api/sync/ отдавал каждому пользователю только его удаления
+
+
+@receiver(post_delete, sender=Resume)
+def resume_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(model='resume', object_id=instance.pk, candidate_id=instance.candidate_id)
+
+
+@receiver(post_delete, sender=Interview)
+def interview_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(model='interview', object_id=instance.pk, candidate_id=instance.candidate_id)
+
+
+@receiver(post_delete, sender=Document)
+def document_deleted(sender, instance, **kwargs):
+    # При каскадном удалении документы удаляются раньше собеседования, строка interview еще на месте
+    candidate_id = Interview.objects.filter(pk=instance.interview_id).values_list('candidate_id', flat=True).first()
+    Tombstone.objects.create(model='document', object_id=instance.pk, candidate_id=candidate_id)
+    # Файл удаляется позже команды sweep_deleted_files: запрос не ждет файловую систему,
+    # а при откате транзакции запись журнала откатится вместе со строкой
+    if instance.file_path.name:
+        FileDeletion.objects.create(path=instance.file_path.name)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(model='notification', object_id=instance.pk, user_id=instance.user_id)
+
+
+# Сигнатуры для поиска дублей строятся по тексту и телефону резюме и ФИО кандидата.
+# Значения этих полей запоминаются при создании объекта, и пересчет (MinHash, сигнатура
+# и корзины) выполняется, только если какое-то из них изменилось: смена статуса,
+# захват на модерацию или вход пользователя сигнатуры не трогают
+RESUME_DEDUP_FIELDS = ('content', 'phone_number')
+USER_DEDUP_FIELDS = ('last_name', 'first_name', 'patronymic')
+
+
+def _remember(instance, fields):
+    instance._dedup_source = {name: instance.__dict__[name] for name in fields if name in instance.__dict__}
+
+
+def _dedup_changed(instance, fields, update_fields):
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return False
+    source = getattr(instance, '_dedup_source', {})
+    # Поле, отложенное при загрузке (defer/only), считается измененным
+    return any(name not in source or source[name] != instance.__dict__.get(name) for name in fields)
+
+
+@receiver(post_init, sender=Resume)
+def resume_loaded(sender, instance, **kwargs):
+    _remember(instance, RESUME_DEDUP_FIELDS)
+
+
+@receiver(post_save, sender=Resume)
+def resume_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or _dedup_changed(instance, RESUME_DEDUP_FIELDS, update_fields):
+        index_resume(instance.pk)
+        _remember(instance, RESUME_DEDUP_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def user_loaded(sender, instance, **kwargs):
+    _remember(instance, USER_DEDUP_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # У нового пользователя резюме еще нет
+    if not created and _dedup_changed(instance, USER_DEDUP_FIELDS, update_fields):
+        index_resumes(Resume.objects.filter(candidate__user=instance))
+        _remember(instance, USER_DEDUP_FIELDS)
@@ -0,0 +1,17 @@
+import os
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotFound
+
+# Собранное SPA (create-react-app) в едином режиме развертывания (SERVE_FRONTEND).
+# Файлы сборки отдает WhiteNoise; сюда попадают только маршруты клиентского роутера
+# (/resume, /moderator/...), для которых нужен index.html.
+
+
+def index(request):
+    path = os.path.join(settings.FRONTEND_BUILD_DIR, 'index.html')
+    if not os.path.exists(path):
+        return HttpResponseNotFound('Сборка фронтенда не найдена: выполните npm run build')
+    response = FileResponse(open(path, 'rb'), content_type='text/html; charset=utf-8')
+    # index.html ссылается на текущие имена файлов с хешем — браузер проверяет его при каждом визите
+    response['Cache-Control'] = 'no-cache'
+    return response
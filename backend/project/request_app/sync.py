@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from .conditional import RESUME_RELATED, INTERVIEW_RELATED, DOCUMENT_RELATED
+from .listing import RESUME_SHAPE, INTERVIEW_SHAPE, DOCUMENT_SHAPE, NOTIFICATION_SHAPE
+from .models import Resume, Interview, Document, Notification, Tombstone, Candidate
+
+# Дельта-синхронизация: клиент хранит непрозрачный токен и получает только строки,
+# измененные (updated_at) или удаленные (Tombstone) после него. Токен — подписанная
+# метка времени начала предыдущей выборки. Транзакция, начатая раньше, может
+# зафиксироваться позже, поэтому выборка идет с перекрытием SYNC_OVERLAP_SECONDS:
+# часть строк придет повторно, клиент применяет их по id.
+
+TOKEN_SALT = 'request_app.sync'
+
+
+class SyncTokenError(ValueError):
+    pass
+
+
+class SyncTokenExpired(SyncTokenError):
+    pass
+
+
+def make_token(moment):
+    return signing.dumps({'t': moment.isoformat()}, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT)
+        since = datetime.fromisoformat(data['t'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise SyncTokenError('Некорректный токен синхронизации')
+    if since < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        # Надгробия старше срока хранения уже удалены — дельта была бы неполной
+        raise SyncTokenExpired('Токен синхронизации устарел, выполните полную загрузку')
+    return since
+
+
+def _collections(user):
+    # (ключ ответа, модель в Tombstone, queryset, форма, связи, влияющие на строку, фильтр надгробий)
+    if user.is_staff:
+        resumes, interviews, documents = Resume.objects.all(), Interview.objects.all(), Document.objects.all()
+        own = Q()
+    else:
+        candidate_id = Candidate.objects.filter(user=user).values_list('id', flat=True).first()
+        own = Q(candidate_id=candidate_id) if candidate_id else Q(pk__in=[])
+        resumes = Resume.objects.filter(candidate__user=user)
+        interviews = Interview.objects.filter(candidate__user=user)
+        documents = Document.objects.filter(interview__candidate__user=user)
+    return [
+        ('resumes', 'resume', resumes, RESUME_SHAPE, RESUME_RELATED, own),
+        ('interviews', 'interview', interviews, INTERVIEW_SHAPE, INTERVIEW_RELATED, own),
+        ('documents', 'document', documents, DOCUMENT_SHAPE, DOCUMENT_RELATED, own),
+        ('notifications', 'notification', Notification.objects.filter(user=user), NOTIFICATION_SHAPE, (), Q(user_id=user.pk)),
+    ]
+
+
+def changes(user, request, since=None):
+    started = timezone.now()
+    result = {}
+    for name, model, queryset, shape, related, tombstones in _collections(user):
+        if since is None:
+            result[name] = {'changed': shape.rows(queryset, request=request), 'deleted': []}
+            continue
+        threshold = since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        # По запросу на таблицу: условие только по updated_at одной таблицы обслуживается
+        # диапазоном по ее индексу, а OR по нескольким присоединенным таблицам — нет
+        changed = set(queryset.filter(updated_at__gte=threshold).values_list('pk', flat=True))
+        for path in related:
+            changed.update(queryset.filter(**{f'{path}__updated_at__gte': threshold}).values_list('pk', flat=True))
+        deleted = Tombstone.objects.filter(tombstones, model=model, deleted_at__gte=threshold)
+        result[name] = {
+            'changed': shape.rows(queryset.filter(pk__in=changed), request=request),
+            'deleted': sorted(set(deleted.values_list('object_id', flat=True))),
+        }
+    result['token'] = make_token(started)
+    result['full'] = since is None
+    return result
+
+
+def purge_tombstones(cutoff, batch_size):
+    ids = list(Tombstone.objects.filter(deleted_at__lt=cutoff).order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return 0
+    deleted, _ = Tombstone.objects.filter(id__in=ids).delete()
+    return deleted
@@ -1,5 +1,57 @@
-from django.test import TestCase
-from .models import User, Candidate
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, time as clock, timedelta
+from unittest import mock
+import numpy as np
+import pikepdf
+import boto3
+from botocore.exceptions import EndpointConnectionError
+import requests
+from moto import mock_aws
+from prometheus_client import REGISTRY
+from django.conf import settings
+from django.core.cache import cache
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import DataError, OperationalError, connection, connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from . import profiling, replicas
+from .log import QueueHandler
+from .bulk import _copy_value
+from .admin import EstimatedCountPaginator, estimated_count
+from .throttling import parse_rate
+from .uploads import upload_key
+from .media_cleanup import sweep_batch
+from .dedup import find_duplicates
+from .scoring import ScoringIndex
+from .scheduler import build_plan
+from .reminders import send_due_reminders
+from .utils import send_notification_email
+from .sync import make_token
+from .listing import CANDIDATE_SHAPE, DOCUMENT_SHAPE, INTERVIEW_SHAPE, NOTIFICATION_SHAPE, RESUME_SHAPE
+from .renderers import ORJSONRenderer
+from .serializers import (
+    CandidateSerializer, DocumentSerializer, InterviewSerializer, NotificationSerializer, ResumeSerializer
+)
+from .pdf_optimizer import OPTIMIZED_SUFFIX, apply_result, optimize_pdf
+from .models import (
+    User, Candidate, Employee, EmployeeAvailability, Interview, Resume, ResumeSignature, Document, DocumentHistory, Notification, FileDeletion,
+    NotificationArchive, DocumentHistoryArchive, InterviewReminder,
+    DocumentTypeChoices, DocumentStatusChoices, OptimizationStatusChoices
+)
 
 class CandidateModelTest(TestCase):
     def setUp(self):
@@ -7,4 +59,1364 @@ class CandidateModelTest(TestCase):
         self.candidate = Candidate.objects.create(user=self.user, phone_number='1234567890')
 
     def test_candidate_str(self):
-        self.assertEqual(str(self.candidate), 'testuser')
\ No newline at end of file
+        self.assertEqual(str(self.candidate), 'testuser')
+
+class AdminChangelistQueriesTest(TestCase):
+    # Число запросов страницы списка не должно зависеть от количества строк:
+    # сессия, пользователь, COUNT и сама выборка (+ EXPLAIN для оценки на PostgreSQL)
+    PAGE_QUERIES = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pass')
+        employee_user = User.objects.create(username='employee', email='employee@example.com')
+        cls.employee = Employee.objects.create(user=employee_user, position='Инженер')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create_rows(self, count):
+        for index in range(count):
+            user = User.objects.create(username=f'candidate{self.created}', email=f'candidate{self.created}@example.com')
+            self.created += 1
+            candidate = Candidate.objects.create(user=user)
+            interview = Interview.objects.create(candidate=candidate, employee=self.employee, scheduled_at=timezone.now())
+            document = Document.objects.create(
+                interview=interview, document_type=DocumentTypeChoices.PASSPORT, file_path=f'documents/{index}.pdf'
+            )
+            DocumentHistory.objects.create(document=document, status=DocumentStatusChoices.UPLOADED)
+            Notification.objects.create(user=user, message='Тест')
+
+    def expected_queries(self):
+        return self.PAGE_QUERIES + (1 if connection.vendor == 'postgresql' else 0)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.created = 0
+        urls = [
+            reverse(f'admin:request_app_{model}_changelist')
+            for model in ('interview', 'document', 'documenthistory', 'notification')
+        ]
+        for count in (1, 20):
+            self.create_rows(count)
+            for url in urls:
+                with self.subTest(url=url, rows=count), self.assertNumQueries(self.expected_queries()):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_estimated_count_above_threshold(self):
+        paginator = EstimatedCountPaginator(Notification.objects.order_by('id'), 100)
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0):
+            count = paginator.count
+        if connection.vendor == 'postgresql':
+            self.assertEqual(count, estimated_count(Notification.objects.all()))
+        else:
+            self.assertEqual(count, Notification.objects.count())
+
+    def test_filtered_changelist_uses_exact_count(self):
+        self.created = 0
+        self.create_rows(3)
+        queryset = Notification.objects.filter(message__icontains='Тест').order_by('id')
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0), mock.patch('request_app.admin.estimated_count') as estimate:
+            self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 3)
+        estimate.assert_not_called()
+
+
+def throttle_rates(**rates):
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **rates},
+    })
+
+class ThrottlingTest(TestCase):
+    client_class = APIClient
+    # Время фиксируется на начале окна, чтобы предыдущее окно не влияло на оценку
+    NOW = 1_700_006_400.0
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.candidate_user = User.objects.create_user(email='candidate@example.com', username='candidate', password='pass', gender='MALE')
+        Candidate.objects.create(user=cls.candidate_user)
+        cls.moderator = User.objects.create_user(email='moderator@example.com', username='moderator', password='pass', gender='FEMALE', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('request_app.throttling.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = self.NOW
+
+    def register(self, ip='10.0.0.1'):
+        return self.client.post(reverse('register'), {}, content_type='application/json', REMOTE_ADDR=ip)
+
+    def login(self, email, ip, password='wrong'):
+        return self.client.post(reverse('token_obtain_pair'), {'email': email, 'password': password}, content_type='application/json', REMOTE_ADDR=ip)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('5/15m'), (5, 900))
+        self.assertEqual(parse_rate('100/d'), (100, 86400))
+
+    @throttle_rates(register='3/m')
+    def test_register_burst_is_limited_per_ip(self):
+        statuses = [self.register().status_code for _ in range(5)]
+        self.assertEqual(statuses[:3], [400] * 3)
+        self.assertEqual(statuses[3:], [429] * 2)
+        response = self.register()
+        self.assertIn('error', response.json())
+        # Лимит освобождается через треть следующего окна: вклад 3 запросов падает до 2
+        self.assertEqual(int(response['Retry-After']), 80)
+        self.assertEqual(self.register(ip='10.0.0.2').status_code, 400)
+
+    @throttle_rates(register='3/m')
+    def test_spoofed_forwarded_for_is_ignored(self):
+        for index in range(3):
+            self.register()
+        response = self.client.post(reverse('register'), {}, content_type='application/json', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4')
+        self.assertEqual(response.status_code, 429)
+
+    @throttle_rates(register='4/m')
+    def test_window_slides_and_rejections_are_free(self):
+        for _ in range(4):
+            self.register()
+        for _ in range(10):
+            response = self.register()
+        self.assertEqual(response.status_code, 429)
+        # Через Retry-After секунд предыдущее окно весит меньше, и запрос проходит
+        self.now += int(response['Retry-After'])
+        self.assertEqual(self.register().status_code, 400)
+        self.now += 15
+        statuses = [self.register().status_code for _ in range(3)]
+        self.assertEqual(statuses, [400, 429, 429])
+        self.now += 60
+        self.assertEqual(self.register().status_code, 400)
+
+    @throttle_rates(login='100/m', login_account='3/15m')
+    def test_login_is_limited_per_account_across_ips(self):
+        statuses = [self.login('candidate@example.com', f'10.0.1.{index}').status_code for index in range(5)]
+        self.assertEqual(statuses, [401, 401, 401, 429, 429])
+        self.assertEqual(self.login('Moderator@example.com', '10.0.1.9').status_code, 401)
+
+    @throttle_rates(login='100/m', login_account='3/15m')
+    def test_successful_logins_do_not_lock_account(self):
+        statuses = [self.login('candidate@example.com', '10.0.1.1', password='pass').status_code for _ in range(5)]
+        self.assertEqual(statuses, [200] * 5)
+        statuses = [self.login('candidate@example.com', '10.0.1.2').status_code for _ in range(3)]
+        self.assertEqual(statuses, [401] * 3)
+        # Исчерпанный лимит закрывает и верный пароль до истечения окна
+        self.assertEqual(self.login('candidate@example.com', '10.0.1.1', password='pass').status_code, 429)
+
+    @throttle_rates(upload='2/h')
+    def test_upload_limited_per_user_other_actions_free(self):
+        self.client.force_authenticate(self.candidate_user)
+        statuses = [self.client.post('/api/documents/', {}).status_code for _ in range(3)]
+        self.assertNotIn(429, statuses[:2])
+        self.assertEqual(statuses[2], 429)
+        self.assertEqual(self.client.get('/api/documents/').status_code, 200)
+        self.client.force_authenticate(self.moderator)
+        self.assertNotEqual(self.client.post('/api/documents/', {}).status_code, 429)
+
+    @throttle_rates(moderator_list='2/m')
+    def test_moderator_lists_limited_for_staff_only(self):
+        self.client.force_authenticate(self.moderator)
+        statuses = [self.client.get('/api/resumes/').status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        self.client.force_authenticate(self.candidate_user)
+        statuses = [self.client.get('/api/resumes/').status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 200])
+
+class ConditionalListTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='etag@example.com', username='etag', password='pass', gender='MALE')
+        cls.candidate = Candidate.objects.create(user=cls.user)
+        employee_user = User.objects.create(username='etag-employee', email='etag-employee@example.com')
+        employee = Employee.objects.create(user=employee_user, position='Инженер')
+        interview = Interview.objects.create(candidate=cls.candidate, employee=employee, scheduled_at=timezone.now())
+        Document.objects.create(interview=interview, document_type=DocumentTypeChoices.PASSPORT, file_path='documents/etag.pdf')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_embedded_candidate_change_invalidates_etag(self):
+        url = '/api/interviews/my/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Найм меняет только кандидата, строка собеседования остается прежней
+        self.candidate.has_successful_interview = True
+        self.candidate.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()[0]['candidate']['has_successful_interview'])
+
+    def test_embedded_user_change_invalidates_document_etag(self):
+        url = '/api/documents/'
+        etag = self.client.get(url)['ETag']
+        self.user.last_name = 'Иванов'
+        self.user.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+class ListingShapeTest(TestCase):
+    # Быстрый путь через values() должен отдавать ровно то же, что сериализаторы
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.moderator = User.objects.create_user(email='shape-staff@example.com', username='shape-staff', password='pass', gender='MALE', is_staff=True)
+        user = User.objects.create_user(
+            email='shape@example.com', username='shape', password='pass', gender='FEMALE',
+            first_name='Анна', last_name='Петрова', patronymic='Сергеевна',
+        )
+        candidate = Candidate.objects.create(user=user, date_of_birth='2001-02-03')
+        employee = Employee.objects.create(
+            user=User.objects.create(username='shape-employee', email='shape-employee@example.com'),
+            department='ИТ', position='Инженер', hire_date='2020-01-01',
+        )
+        Resume.objects.create(candidate=candidate, content='Python', education='HIGHER', job_type='PROGRAMMER')
+        Resume.objects.create(candidate=candidate, content='Практика', resume_type='PRACTICE', practice_type='PRODUCTION')
+        interview = Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now(), job_type='PROGRAMMER')
+        Document.objects.create(interview=interview, document_type=DocumentTypeChoices.PASSPORT, file_path='documents/shape.pdf')
+        Document.objects.create(interview=interview, document_type=DocumentTypeChoices.DIPLOMA, file_path='')
+        Notification.objects.create(user=user, message='Тест')
+
+    def setUp(self):
+        self.request = APIRequestFactory().get('/api/')
+
+    def test_rows_match_serializers(self):
+        cases = [
+            (RESUME_SHAPE, ResumeSerializer, Resume),
+            (INTERVIEW_SHAPE, InterviewSerializer, Interview),
+            (DOCUMENT_SHAPE, DocumentSerializer, Document),
+            (CANDIDATE_SHAPE, CandidateSerializer, Candidate),
+            (NOTIFICATION_SHAPE, NotificationSerializer, Notification),
+        ]
+        for shape, serializer_class, model in cases:
+            with self.subTest(model=model.__name__):
+                queryset = model.objects.order_by('id')
+                expected = serializer_class(queryset, many=True, context={'request': self.request}).data
+                self.assertEqual(shape.rows(queryset, request=self.request), [dict(row) for row in expected])
+
+    def test_orjson_renderer_matches_drf(self):
+        data = RESUME_SHAPE.rows(Resume.objects.order_by('id'))
+        data[0]['content'] = 'строка\u2028перевод'
+        rendered = ORJSONRenderer().render(data)
+        self.assertNotIn(b'\xe2\x80\xa8', rendered)
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+
+    def test_fields_and_expand(self):
+        self.client.force_authenticate(self.moderator)
+        interview = Interview.objects.get()
+        rows = self.client.get('/api/documents/', {'fields': 'id,interview,status'}).json()
+        # Нераскрытая связь — id
+        self.assertEqual(rows[0], {'id': rows[0]['id'], 'interview': interview.pk, 'status': 'UPLOADED'})
+        row = self.client.get('/api/documents/', {'fields': 'id,interview', 'expand': 'interview.candidate'}).json()[0]
+        self.assertEqual(row['interview']['employee'], interview.employee_id)
+        self.assertEqual(row['interview']['candidate']['user']['email'], 'shape@example.com')
+        detail = self.client.get(f'/api/interviews/{interview.pk}/', {'fields': 'id,candidate'}).json()
+        self.assertEqual(detail, {'id': interview.pk, 'candidate': interview.candidate_id})
+
+    def test_unknown_fields_and_relations_rejected(self):
+        self.client.force_authenticate(self.moderator)
+        cases = [
+            ('/api/documents/', {'fields': 'id,secret'}, 'Неизвестные поля: secret'),
+            ('/api/documents/', {'expand': 'status'}, 'Связь status не может быть раскрыта'),
+            ('/api/documents/', {'expand': 'interview.unknown'}, 'Связь interview.unknown не может быть раскрыта'),
+            # user встроен в кандидата всегда и в expand не принимается
+            ('/api/interviews/', {'expand': 'candidate.user'}, 'Связь candidate.user не может быть раскрыта'),
+        ]
+        for url, params, error in cases:
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': error})
+
+class ArchiveHistoryTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.moderator = User.objects.create_user(email='archive@example.com', username='archive', password='pass', gender='MALE', is_staff=True)
+        employee = Employee.objects.create(user=User.objects.create(username='archive-employee', email='archive-employee@example.com'))
+        candidate = Candidate.objects.create(user=User.objects.create(username='archive-candidate', email='archive-candidate@example.com'))
+        interview = Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now())
+        cls.document = Document.objects.create(interview=interview, document_type=DocumentTypeChoices.PASSPORT, file_path='documents/archive.pdf')
+
+    def setUp(self):
+        self.client.force_authenticate(self.moderator)
+        old = timezone.now() - timedelta(days=400)
+        for index in range(5):
+            Notification.objects.create(user=self.moderator, message=f'Уведомление {index}', is_read=index % 2 == 0)
+            DocumentHistory.objects.create(document=self.document, status=DocumentStatusChoices.UPLOADED, comment=f'Запись {index}')
+        Notification.objects.filter(message__in=['Уведомление 0', 'Уведомление 1', 'Уведомление 2']).update(created_at=old)
+        DocumentHistory.objects.filter(comment__in=['Запись 0', 'Запись 1', 'Запись 2']).update(created_at=old)
+
+    def archive(self, **options):
+        out = io.StringIO()
+        call_command('archive_history', days=180, batch_size=2, stdout=out, **options)
+        return out.getvalue()
+
+    def test_old_rows_moved_in_batches(self):
+        output = self.archive(only='notifications')
+        # Пачки по 2: 2 + 1 строка, затем выход по неполной пачке
+        self.assertIn('notifications: перенесено в архив 3, удалено из архива 0', output)
+        self.assertEqual(Notification.objects.count(), 2)
+        archived = NotificationArchive.objects.get(message='Уведомление 2')
+        self.assertTrue(archived.is_read)
+        self.assertEqual(archived.user, self.moderator)
+        self.assertEqual(DocumentHistory.objects.count(), 5)
+        self.assertEqual(self.archive(only='notifications').count('перенесено в архив 0'), 1)
+
+    def test_archived_rows_available_on_request(self):
+        self.archive()
+        current = self.client.get('/api/notifications/').json()
+        archived = self.client.get('/api/notifications/?archived=1').json()
+        self.assertEqual(len(current), 2)
+        self.assertEqual(sorted(item['message'] for item in archived), ['Уведомление 0', 'Уведомление 1', 'Уведомление 2'])
+        url = f'/api/documents/{self.document.pk}/history/'
+        self.assertEqual(len(self.client.get(url).json()), 2)
+        self.assertEqual(len(self.client.get(url, {'include_archived': '1'}).json()), 5)
+
+    def test_purge_removes_expired_archive(self):
+        self.archive(only='document_history')
+        self.assertEqual(DocumentHistoryArchive.objects.count(), 3)
+        output = self.archive(only='document_history', purge_days=365)
+        self.assertIn('document_history: перенесено в архив 0, удалено из архива 3', output)
+        self.assertFalse(DocumentHistoryArchive.objects.exists())
+
+S3_STORAGES = {
+    **settings.STORAGES,
+    'documents': {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': 'documents', 'region_name': 'us-east-1', 'access_key': 'test', 'secret_key': 'test',
+            'default_acl': None, 'file_overwrite': False,
+        },
+    },
+}
+
+@mock_aws
+@override_settings(DOCUMENT_STORAGE='s3', STORAGES=S3_STORAGES)
+class DirectUploadTest(TestCase):
+    # Хранилище S3 подменяется moto: подписанная форма, загрузка из «браузера» и finalize
+    client_class = APIClient
+    PDF = b'%PDF-1.4 test document'
+
+    def setUp(self):
+        cache.clear()
+        self.s3 = boto3.client('s3', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test')
+        self.s3.create_bucket(Bucket='documents')
+        self.user = User.objects.create_user(email='upload@example.com', username='upload', password='pass', gender='MALE')
+        candidate = Candidate.objects.create(user=self.user)
+        employee_user = User.objects.create(username='upload-employee', email='upload-employee@example.com')
+        employee = Employee.objects.create(user=employee_user, position='Инженер')
+        self.interview = Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now(), result='SUCCESS')
+        self.client.force_authenticate(self.user)
+
+    def presign(self, file_name='passport.pdf', size=100):
+        response = self.client.post('/api/documents/presign_upload/', {
+            'resume_type': 'JOB', 'document_type': DocumentTypeChoices.PASSPORT, 'file_name': file_name, 'size': size,
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def upload(self, presigned, content):
+        response = requests.post(presigned['url'], data=presigned['fields'], files={'file': ('document.pdf', content)})
+        self.assertLess(response.status_code, 300, response.text)
+
+    def finalize(self, presigned):
+        return self.client.post('/api/documents/finalize_upload/', {'token': presigned['token']}, format='json')
+
+    def key(self, presigned):
+        return presigned['fields']['key']
+
+    def test_me_reports_direct_uploads(self):
+        self.assertTrue(self.client.get('/api/me/').json()['direct_uploads'])
+
+    def test_upload_actions_require_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post('/api/documents/presign_upload/', {}, format='json').status_code, 401)
+        self.assertEqual(self.client.post('/api/documents/finalize_upload/', {'token': 'x'}, format='json').status_code, 401)
+        self.assertEqual(self.client.get('/api/documents/1/download_url/').status_code, 401)
+
+    def test_presign_upload_finalize(self):
+        presigned = self.presign()
+        self.assertTrue(self.key(presigned).startswith(f'candidate_{self.interview.candidate_id}/'))
+        self.upload(presigned, self.PDF)
+        response = self.finalize(presigned)
+        self.assertEqual(response.status_code, 201, response.content)
+        document = Document.objects.get(interview=self.interview)
+        self.assertEqual(document.file_path.name, self.key(presigned))
+
+    def test_finalize_replay_keeps_object(self):
+        presigned = self.presign()
+        self.upload(presigned, self.PDF)
+        self.assertEqual(self.finalize(presigned).status_code, 201)
+        self.assertEqual(self.finalize(presigned).status_code, 400)
+        self.assertEqual(Document.objects.filter(interview=self.interview).count(), 1)
+        self.s3.head_object(Bucket='documents', Key=self.key(presigned))
+
+    def test_finalize_rejects_non_pdf_and_deletes_object(self):
+        presigned = self.presign()
+        self.upload(presigned, b'not a pdf at all')
+        response = self.finalize(presigned)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Document.objects.exists())
+        self.assertEqual(self.s3.list_objects_v2(Bucket='documents').get('KeyCount'), 0)
+
+    def test_finalize_without_upload_and_with_forged_token(self):
+        presigned = self.presign()
+        self.assertEqual(self.finalize(presigned).status_code, 400)
+        self.assertEqual(self.finalize({'token': presigned['token'] + 'x'}).status_code, 400)
+        self.assertFalse(Document.objects.exists())
+
+    def test_finalize_rejects_oversized_object(self):
+        # moto не проверяет content-length-range политики — finalize проверяет размер сам
+        presigned = self.presign()
+        self.upload(presigned, b'%PDF-' + b'0' * (5 * 1024 * 1024))
+        self.assertEqual(self.finalize(presigned).status_code, 400)
+        self.assertEqual(self.s3.list_objects_v2(Bucket='documents').get('KeyCount'), 0)
+
+    def test_long_file_name_fits_file_path(self):
+        key = upload_key(10 ** 12, 'а' * 96 + '.pdf')
+        self.assertLessEqual(len(key), Document._meta.get_field('file_path').max_length)
+        self.assertTrue(key.endswith('.pdf'))
+        presigned = self.presign(file_name='б' * 96 + '.pdf')
+        self.upload(presigned, self.PDF)
+        self.assertEqual(self.finalize(presigned).status_code, 201)
+
+    def test_sweep_retries_storage_errors(self):
+        self.s3.put_object(Bucket='documents', Key='candidate_1/old.pdf', Body=self.PDF)
+        entry = FileDeletion.objects.create(path='candidate_1/old.pdf')
+        with mock.patch('storages.backends.s3.S3Storage.delete', side_effect=EndpointConnectionError(endpoint_url='http://s3')):
+            sweep_batch()
+        entry.refresh_from_db()
+        self.assertEqual(entry.attempts, 1)
+        sweep_batch()
+        self.assertFalse(FileDeletion.objects.exists())
+        self.assertEqual(self.s3.list_objects_v2(Bucket='documents').get('KeyCount'), 0)
+
+class MetricsAccessTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(email='metrics@example.com', username='metrics', password='pass', gender='MALE', is_staff=True)
+        cls.user = User.objects.create_user(email='metrics-user@example.com', username='metrics-user', password='pass', gender='MALE')
+
+    @override_settings(METRICS_TOKEN='')
+    def test_without_token_only_staff(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required_when_set(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'emails_in_flight', response.content)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_dropped_log_records_exported(self):
+        handler = QueueHandler(queue_size=1, stream=io.StringIO())
+        # Без слушателя очередь не разбирается: вторая запись не помещается
+        handler.stop()
+        before = REGISTRY.get_sample_value('log_records_dropped_total') or 0
+        for _ in range(3):
+            handler.emit(logging.LogRecord('test', logging.INFO, __file__, 0, 'message', None, None))
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(REGISTRY.get_sample_value('log_records_dropped_total'), before + 2)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertIn(b'log_records_dropped_total', response.content)
+
+@override_settings(REQUEST_PROFILING=True)
+class QueryProfilingTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(email='profiling@example.com', username='profiling', password='pass', gender='MALE', is_staff=True)
+        Notification.objects.bulk_create(Notification(user=cls.staff, message=f'Тест {index}') for index in range(3))
+
+    def setUp(self):
+        profiling.reset()
+        self.addCleanup(profiling.reset)
+        for cls in (serializers.Serializer, serializers.ListSerializer):
+            self.addCleanup(setattr, cls, 'data', cls.data)
+        profiling.install_serializer_timing()
+        self.client.force_authenticate(self.staff)
+
+    def test_server_timing_and_route_summary(self):
+        response = self.client.get('/api/notifications/')
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('serializer;dur=', timing)
+        summary = self.client.get('/api/profiling/').json()
+        self.assertTrue(summary['enabled'])
+        route = next(item for item in summary['routes'] if item['route'] == 'notification-list')
+        self.assertEqual(route['requests'], 1)
+        self.assertGreater(route['avg_queries'], 0)
+        self.assertEqual(self.client.delete('/api/profiling/').status_code, 204)
+        # Сам DELETE записывается уже после очистки
+        self.assertEqual([item['route'] for item in profiling.route_summary()], ['profiling'])
+
+    def test_repeated_sql_reported_as_duplicate(self):
+        profile = profiling.RequestProfile()
+        with connection.execute_wrapper(profile):
+            for user_id in (self.staff.pk, 0):
+                list(User.objects.filter(pk=user_id))
+        self.assertEqual(profile.query_count, 2)
+        self.assertEqual(list(profile.duplicates().values()), [2])
+        self.assertEqual(profile.top_queries()[0]['count'], 2)
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_disabled_middleware_adds_nothing(self):
+        response = self.client.get('/api/notifications/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.client.get('/api/profiling/').json(), {'enabled': False, 'routes': []})
+
+class BatchRequestTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='batch@example.com', username='batch', password='pass', gender='MALE')
+        Notification.objects.create(user=cls.user, message='Тест')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def batch(self, requests, **extra):
+        return self.client.post('/api/batch/', {'requests': requests}, format='json', **extra)
+
+    def test_items_answered_independently(self):
+        notification = Notification.objects.get()
+        response = self.batch([
+            {'id': 'me', 'path': '/api/me/'},
+            '/api/notifications/?fields=id,message',
+            '/api/batch/',
+            '/api/unknown/',
+            '/api/profiling/',
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([(item['id'], item['status']) for item in results], [('me', 200), (1, 200), (2, 400), (3, 404), (4, 403)])
+        self.assertEqual(results[0]['body']['user']['email'], 'batch@example.com')
+        self.assertEqual(results[1]['body'], [{'id': notification.pk, 'message': 'Тест'}])
+        self.assertEqual(results[2]['body'], {'error': 'Вложенные пакеты не поддерживаются'})
+
+    def test_failing_item_does_not_break_batch(self):
+        with mock.patch('request_app.views.NotificationViewSet.list', side_effect=RuntimeError), self.assertLogs('request_app.batch', 'ERROR'):
+            results = self.batch(['/api/notifications/', '/api/me/']).json()['responses']
+        self.assertEqual([item['status'] for item in results], [500, 200])
+
+    def test_conditional_headers_not_forwarded(self):
+        etag = self.client.get('/api/notifications/')['ETag']
+        self.assertEqual(self.client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        results = self.batch(['/api/notifications/'], HTTP_IF_NONE_MATCH=etag).json()['responses']
+        self.assertEqual(results[0]['status'], 200)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_invalid_batches_rejected(self):
+        for requests in ([], ['/api/me/'] * 3, ['/admin/'], [{'id': 'x'}]):
+            with self.subTest(requests=requests):
+                self.assertEqual(self.batch(requests).status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.batch(['/api/me/']).status_code, 401)
+
+class ReportViewTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.moderator = User.objects.create_user(email='report@example.com', username='report', password='pass', gender='MALE', is_staff=True)
+        employee_user = User.objects.create(username='report-employee', email='report-employee@example.com')
+        employee = Employee.objects.create(user=employee_user, position='Инженер')
+        for index in range(5):
+            user = User.objects.create(username=f'report{index}', email=f'report{index}@example.com', last_name=f'Петров{index}')
+            candidate = Candidate.objects.create(user=user)
+            Resume.objects.create(candidate=candidate, content='Резюме', resume_type='JOB', job_type='PROGRAMMER' if index < 3 else 'SPECIALIST')
+            Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now(), resume_type='JOB', result='SUCCESS' if index < 2 else 'PENDING')
+
+    def test_page_and_aggregates(self):
+        self.client.force_authenticate(self.moderator)
+        data = self.client.get('/api/reports/', {'resume_type': 'JOB', 'limit': 2, 'offset': 1}).json()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual([row['candidate'] for row in data['results']], ['Петров1', 'Петров2'])
+        self.assertEqual(data['resumes_by_vacancy'], {'PROGRAMMER': 3, 'SPECIALIST': 2})
+        self.assertEqual(data['interviews_by_result'], {'SUCCESS': 2, 'PENDING': 3})
+        self.assertEqual(data['types'], ['JOB'])
+        filtered = self.client.get('/api/reports/', {'resume_type': 'JOB', 'job_type': 'SPECIALIST'}).json()
+        self.assertEqual(filtered['count'], 2)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.get(username='report0'))
+        self.assertEqual(self.client.get('/api/reports/').status_code, 403)
+
+class ProtectedMediaTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='media@example.com', username='media', password='pass', gender='MALE')
+        candidate = Candidate.objects.create(user=cls.user)
+        employee_user = User.objects.create(username='media-employee', email='media-employee@example.com')
+        employee = Employee.objects.create(user=employee_user, position='Инженер')
+        cls.interview = Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now(), result='SUCCESS')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.document = Document(interview=self.interview, document_type=DocumentTypeChoices.PASSPORT)
+        self.document.file_path.save('passport.pdf', ContentFile(b'%PDF-1.4 media'), save=True)
+        os.makedirs(os.path.join(media_root, 'templates'))
+        with open(os.path.join(media_root, 'templates', 'form.docx'), 'wb') as handle:
+            handle.write(b'template')
+
+    def download(self, link):
+        # Как SPA: постоянный адрес из списка -> свежая ссылка -> файл без заголовка Authorization
+        self.client.force_authenticate(self.user)
+        url = self.client.get(link).json()['url']
+        self.client.force_authenticate(None)
+        return url, self.client.get(url)
+
+    def test_document_served_by_signed_url_only(self):
+        self.client.force_authenticate(self.user)
+        link = self.client.get('/api/documents/').json()[0]['file_path']
+        self.assertTrue(link.endswith(f'/api/documents/{self.document.pk}/download_url/'))
+        url, response = self.download(link)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 media')
+        self.assertEqual(self.client.get(url.rstrip('/') + 'x/').status_code, 404)
+        self.assertEqual(self.client.get(f'/media/{self.document.file_path.name}').status_code, 404)
+
+    def test_cached_list_links_survive_url_expiry(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/documents/')
+        link = response.json()[0]['file_path']
+        etag = response['ETag']
+        old_url, _ = self.download(link)
+        later = time.time() + settings.DOCUMENT_DOWNLOAD_URL_EXPIRE + 1
+        with mock.patch('django.core.signing.time.time', return_value=later):
+            # Список не изменился: клиент получает 304 и использует сохраненное тело
+            self.client.force_authenticate(self.user)
+            self.assertEqual(self.client.get('/api/documents/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(old_url).status_code, 404)
+            _, response = self.download(link)
+            self.assertEqual(response.status_code, 200)
+
+    def test_signed_url_expires(self):
+        url = self.document.file_path.url
+        with override_settings(DOCUMENT_DOWNLOAD_URL_EXPIRE=-1):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_templates_are_public(self):
+        response = self.client.get('/media/templates/form.docx')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/media/templates/../passport.pdf').status_code, 404)
+
+@override_settings(DOCUMENT_STORAGE='local')
+class MediaCleanupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        candidate = Candidate.objects.create(user=User.objects.create(username='cleanup', email='cleanup@example.com'))
+        employee = Employee.objects.create(user=User.objects.create(username='cleanup-employee', email='cleanup-employee@example.com'))
+        cls.interview = Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now())
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self, name, document_type=DocumentTypeChoices.PASSPORT):
+        document = Document(interview=self.interview, document_type=document_type)
+        document.file_path.save(name, ContentFile(b'%PDF-1.4 cleanup'), save=True)
+        return document
+
+    def place(self, relative, age_hours):
+        path = os.path.join(self.media_root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            handle.write(b'orphan')
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_deleted_document_journaled_and_swept(self):
+        document = self.upload('passport.pdf')
+        path = document.file_path.path
+        kept = self.upload('diploma.pdf', DocumentTypeChoices.DIPLOMA)
+        document.delete()
+        # Запрос только пишет журнал, файл удаляет sweep
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(list(FileDeletion.objects.values_list('path', flat=True)), [document.file_path.name])
+        # Путь, который снова занят живым документом, не удаляется
+        FileDeletion.objects.create(path=kept.file_path.name)
+        out = io.StringIO()
+        call_command('sweep_deleted_files', stdout=out)
+        self.assertIn('Обработано записей журнала: 2', out.getvalue())
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(kept.file_path.path))
+        self.assertFalse(FileDeletion.objects.exists())
+
+    def test_reconcile_finds_old_orphans_only(self):
+        live = self.upload('passport.pdf')
+        os.utime(live.file_path.path, (0, 0))
+        self.place('candidate_9/old.pdf', 48)
+        self.place('candidate_9/nested/older.pdf', 72)
+        self.place('candidate_9/fresh.pdf', 1)
+        self.place('templates/form.docx', 48)
+        out = io.StringIO()
+        call_command('reconcile_media', min_age_hours=24, batch_size=2, verbose_list=True, stdout=out)
+        self.assertEqual(
+            sorted(out.getvalue().splitlines()[:-1]),
+            ['candidate_9/nested/older.pdf', 'candidate_9/old.pdf'],
+        )
+        self.assertFalse(FileDeletion.objects.exists())
+        call_command('reconcile_media', min_age_hours=24, enqueue=True, stdout=io.StringIO())
+        self.assertEqual(
+            sorted(FileDeletion.objects.values_list('path', flat=True)),
+            ['candidate_9/nested/older.pdf', 'candidate_9/old.pdf'],
+        )
+
+    @override_settings(DOCUMENT_STORAGE='s3')
+    def test_reconcile_requires_local_storage(self):
+        with self.assertRaises(CommandError):
+            call_command('reconcile_media', stdout=io.StringIO())
+
+@override_settings(DOCUMENT_STORAGE='local')
+class DocumentExportZipTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.moderator = User.objects.create_user(email='zip@example.com', username='zip', password='pass', gender='MALE', is_staff=True)
+        employee = Employee.objects.create(user=User.objects.create(username='zip-employee', email='zip-employee@example.com'))
+        cls.interviews = []
+        for last_name in ('Иванов', 'Петров/Сидоров'):
+            user = User.objects.create(username=f'zip-{len(cls.interviews)}', email=f'zip-{len(cls.interviews)}@example.com', last_name=last_name, first_name='Иван')
+            candidate = Candidate.objects.create(user=user)
+            cls.interviews.append(Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now(), result='SUCCESS'))
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.force_authenticate(self.moderator)
+
+    def upload(self, interview, document_type, content, status='ACCEPTED'):
+        document = Document(interview=interview, document_type=document_type, status=status)
+        document.file_path.save('document.pdf', ContentFile(content), save=True)
+        return document
+
+    def export(self, interviews):
+        return self.client.get('/api/documents/export_zip/', {'interviews': ','.join(str(item.pk) for item in interviews)})
+
+    def test_streams_accepted_documents(self):
+        first, second = self.interviews
+        passport = b'%PDF-1.4 ' + os.urandom(200 * 1024)
+        self.upload(first, DocumentTypeChoices.PASSPORT, passport)
+        self.upload(first, DocumentTypeChoices.DIPLOMA, b'%PDF-1.4 draft', status='UPLOADED')
+        missing = self.upload(first, DocumentTypeChoices.CRIMINAL, b'%PDF-1.4 missing')
+        os.remove(missing.file_path.path)
+        self.upload(second, DocumentTypeChoices.MILITARY, b'%PDF-1.4 military')
+        response = self.export([first, second])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        # Отсутствующий файл пропускается до начала записи, архив остается целым
+        with self.assertLogs('request_app.views', 'WARNING'):
+            content = b''.join(response.streaming_content)
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), [
+            f'Иванов Иван ({first.pk})/Паспорт.pdf',
+            f'Петров-Сидоров Иван ({second.pk})/Приписное-Военник.pdf',
+        ])
+        self.assertEqual(archive.read(archive.namelist()[0]), passport)
+        self.assertEqual(archive.getinfo(archive.namelist()[0]).compress_type, zipfile.ZIP_STORED)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get('/api/documents/export_zip/', {'interviews': '1,x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/documents/export_zip/').status_code, 400)
+        self.upload(self.interviews[0], DocumentTypeChoices.PASSPORT, b'%PDF-1.4 draft', status='UPLOADED')
+        self.assertEqual(self.export(self.interviews).status_code, 404)
+        with override_settings(DOCUMENT_EXPORT_MAX_INTERVIEWS=1):
+            self.assertEqual(self.export(self.interviews).status_code, 400)
+        self.client.force_authenticate(self.interviews[0].candidate.user)
+        self.assertEqual(self.export(self.interviews[:1]).status_code, 403)
+
+REPLICA = 'replica_test'
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_HEALTH_CHECK_SECONDS=60)
+class ReplicaRoutingTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='replica@example.com', username='replica', password='pass', gender='MALE')
+        cls.notification = Notification.objects.create(user=cls.user, message='Проверка')
+
+    def setUp(self):
+        # Реплика-зеркало default, как TEST MIRROR в настройках: тот же объект соединения
+        # и та же транзакция теста, поэтому проверяется выбор алиаса роутером, а не данные
+        connections[REPLICA] = connections['default']
+        self.addCleanup(connections.__delitem__, REPLICA)
+        replicas._health[REPLICA] = (time.monotonic(), True)
+        self.addCleanup(replicas._health.pop, REPLICA, None)
+        cache.clear()
+        self.client.force_authenticate(self.user)
+        self.reads = []
+        db_for_read = replicas.ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            self.reads.append(alias)
+            return alias
+
+        patcher = mock.patch.object(replicas.ReplicaRouter, 'db_for_read', record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_safe_request_reads_from_replica(self):
+        self.assertEqual(self.client.get('/api/me/').status_code, 200)
+        self.assertTrue(self.reads)
+        self.assertEqual(set(self.reads), {REPLICA})
+
+    def test_write_pins_client_to_primary(self):
+        response = self.client.patch(f'/api/notifications/{self.notification.pk}/', {'is_read': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(replicas.PIN_COOKIE, response.cookies)
+        self.assertEqual(set(self.reads), {None})
+        self.reads.clear()
+        self.client.get('/api/me/')
+        self.assertEqual(set(self.reads), {None})
+        # Отметка в кэше действует и без cookie
+        self.client.cookies.pop(replicas.PIN_COOKIE)
+        self.reads.clear()
+        self.client.get('/api/me/')
+        self.assertEqual(set(self.reads), {None})
+
+    def test_reads_after_write_go_to_primary(self):
+        router = replicas.ReplicaRouter()
+        token = replicas.read_alias.set(REPLICA)
+        self.addCleanup(replicas.read_alias.reset, token)
+        self.assertEqual(router.db_for_read(User), REPLICA)
+        self.assertEqual(router.db_for_write(User), 'default')
+        self.assertIsNone(router.db_for_read(User))
+
+    def test_unhealthy_replica_is_skipped(self):
+        replicas.mark_unhealthy(REPLICA)
+        self.client.get('/api/me/')
+        self.assertEqual(set(self.reads), {None})
+
+    def wait_probe(self):
+        for _ in range(100):
+            if REPLICA not in replicas._probing:
+                return
+            time.sleep(0.05)
+        self.fail('Проверка реплики не завершилась')
+
+    def test_health_probe_does_not_block_request(self):
+        replicas._health.pop(REPLICA)
+        release = threading.Event()
+        calls = []
+
+        def slow_lag(alias):
+            calls.append(alias)
+            release.wait(5)
+            return 0
+
+        with mock.patch.object(replicas, 'replica_lag', slow_lag), \
+                mock.patch.object(replicas, 'connections') as probe_connections:
+            # Первая проверка еще идет: запрос читает из default, вторая проверка не запускается
+            self.assertFalse(replicas.is_healthy(REPLICA))
+            self.assertFalse(replicas.is_healthy(REPLICA))
+            release.set()
+            self.wait_probe()
+        self.assertEqual(calls, [REPLICA])
+        probe_connections.__getitem__.return_value.close.assert_called_once()
+        self.assertTrue(replicas.is_healthy(REPLICA))
+
+    def test_unreachable_replica_marked_unhealthy(self):
+        replicas._health.pop(REPLICA)
+        with mock.patch.object(replicas, 'replica_lag', side_effect=OperationalError('timeout expired')), \
+                mock.patch.object(replicas, 'connections'):
+            self.assertFalse(replicas.is_healthy(REPLICA))
+            self.wait_probe()
+        self.assertFalse(replicas.is_healthy(REPLICA))
+
+RESUME_TEXT = 'Инженер-программист, пять лет разработки на Python и Django, PostgreSQL, Linux, Git, проектирование REST API и сопровождение внутренних сервисов'
+
+class DuplicateSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def candidate(email, last_name):
+            user = User.objects.create_user(email=email, username=email, password='pass', gender='MALE', last_name=last_name, first_name='Иван')
+            return Candidate.objects.create(user=user)
+        cls.first = candidate('first@example.com', 'Петров')
+        cls.copy = candidate('copy@example.com', 'Сидоров')
+        cls.same_phone = candidate('phone@example.com', 'Кузнецов')
+        cls.resume = Resume.objects.create(candidate=cls.first, content=RESUME_TEXT, phone_number='+7 (900) 123-45-67')
+        cls.copied = Resume.objects.create(candidate=cls.copy, content=RESUME_TEXT + '.', phone_number='')
+        cls.by_phone = Resume.objects.create(candidate=cls.same_phone, content='Специалист по документообороту', phone_number='89001234567')
+        # Повторное резюме того же кандидата дублем не считается
+        Resume.objects.create(candidate=cls.first, content=RESUME_TEXT, phone_number='')
+
+    def test_finds_copied_text_and_same_phone(self):
+        found = {item['resume']: item for item in find_duplicates(self.resume)}
+        self.assertEqual(set(found), {self.copied.pk, self.by_phone.pk})
+        self.assertEqual(found[self.copied.pk]['reasons'], ['content'])
+        self.assertEqual(found[self.copied.pk]['similarity'], 1.0)
+        self.assertEqual(found[self.by_phone.pk]['reasons'], ['phone'])
+
+    def test_name_match(self):
+        self.copy.user.last_name = 'Петров'
+        self.copy.user.save()
+        found = {item['resume']: item['reasons'] for item in find_duplicates(self.resume)}
+        self.assertEqual(found[self.copied.pk], ['content', 'name'])
+
+    def test_reindexed_only_when_indexed_fields_change(self):
+        resume = Resume.objects.get(pk=self.resume.pk)
+        with mock.patch('request_app.signals.index_resume') as index_resume:
+            resume.status = 'ACCEPTED'
+            resume.save()
+            resume.save(update_fields=['status'])
+            index_resume.assert_not_called()
+            resume.content = 'Другой текст резюме'
+            resume.save()
+            resume.save()
+        index_resume.assert_called_once_with(resume.pk)
+
+    def test_name_change_reindexes_candidate_resumes(self):
+        user = User.objects.get(pk=self.copy.user_id)
+        with mock.patch('request_app.signals.index_resumes') as index_resumes:
+            user.last_login = timezone.now()
+            user.save(update_fields=['last_login'])
+            user.email = 'copy-new@example.com'
+            user.save()
+        index_resumes.assert_not_called()
+        user.patronymic = 'Петрович'
+        user.save()
+        self.assertEqual(ResumeSignature.objects.get(pk=self.copied.pk).name_key, 'сидоров иван петрович')
+
+class ScoringIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email='scoring@example.com', username='scoring', password='pass', gender='MALE')
+        cls.candidate = Candidate.objects.create(user=user)
+        cls.programmer = cls.resume('Программист: python, django, sql, git, linux', 'PROGRAMMER')
+        cls.accountant = cls.resume('Бухгалтер, отчетность в excel', 'PROGRAMMER')
+        cls.methodologist = cls.resume('Методолог, регламенты и стандарты', 'METHODOLOGIST')
+        cls.resume('Программист python django', 'PROGRAMMER', status='ACCEPTED')
+
+    @classmethod
+    def resume(cls, content, job_type, status='PENDING'):
+        return Resume.objects.create(candidate=cls.candidate, content=content, resume_type='JOB', job_type=job_type, status=status)
+
+    def ranked_ids(self, index, **kwargs):
+        return [resume_id for resume_id, _ in index.rank('PROGRAMMER', 10, **kwargs)[1]]
+
+    def test_ranks_pending_resumes_by_profile(self):
+        index = ScoringIndex()
+        index.refresh()
+        total, ranked = index.rank('PROGRAMMER', 10)
+        self.assertEqual(total, 2)
+        self.assertEqual([resume_id for resume_id, _ in ranked], [self.programmer.pk, self.accountant.pk])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+        self.assertEqual(self.ranked_ids(index, only_vacancy=False)[0], self.programmer.pk)
+        self.assertEqual(len(self.ranked_ids(index, only_vacancy=False)), 3)
+        self.assertEqual(index.rank('PROGRAMMER', 1, offset=1)[1][0][0], self.accountant.pk)
+        self.assertEqual(index.rank('UNKNOWN', 10), (0, []))
+
+    def test_ranked_endpoint(self):
+        staff = User.objects.create_user(email='scoring-staff@example.com', username='scoring-staff', password='pass', gender='MALE', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(staff)
+        with mock.patch('request_app.scoring.index', ScoringIndex()):
+            data = client.get('/api/resumes/ranked/', {'vacancy': 'PROGRAMMER'}).json()
+            self.assertEqual((data['count'], [row['id'] for row in data['results']]), (2, [self.programmer.pk, self.accountant.pk]))
+            data = client.get('/api/resumes/ranked/', {'vacancy': 'PROGRAMMER', 'all_vacancies': 1}).json()
+            self.assertEqual(len(data['results']), 3)
+        self.assertEqual(client.get('/api/resumes/ranked/', {'vacancy': 'UNKNOWN'}).status_code, 400)
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        index = ScoringIndex()
+        index.refresh()
+        added = self.resume('Разработка api на python', 'PROGRAMMER')
+        self.programmer.status = 'ACCEPTED'
+        self.programmer.save()
+        self.accountant.delete()
+        index.refresh()
+        self.assertEqual(self.ranked_ids(index), [added.pk])
+        self.assertEqual(sorted(index.ids.tolist()), sorted([added.pk, self.methodologist.pk]))
+        rebuilt = ScoringIndex()
+        rebuilt.refresh()
+        self.assertTrue(np.array_equal(index.doc_freq, rebuilt.doc_freq))
+        self.assertEqual(index.rank('PROGRAMMER', 10), rebuilt.rank('PROGRAMMER', 10))
+
+class HireDecisionAtomicityTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.moderator = User.objects.create_user(email='hire-moderator@example.com', username='hire-moderator', password='pass', gender='FEMALE', is_staff=True)
+        employee = Employee.objects.create(user=cls.moderator, position='HR')
+        user = User.objects.create_user(email='hire@example.com', username='hire', password='pass', gender='FEMALE')
+        cls.candidate = Candidate.objects.create(user=user, has_successful_interview=True)
+        cls.interview = Interview.objects.create(candidate=cls.candidate, employee=employee, scheduled_at=timezone.now(), result='SUCCESS', resume_type='PRACTICE', practice_type='EDUCATIONAL')
+
+    def test_reject_is_rolled_back_when_event_fails(self):
+        self.client.force_authenticate(self.moderator)
+        with mock.patch('request_app.views.record', side_effect=RuntimeError), self.assertRaises(RuntimeError), self.assertLogs('django.request', 'ERROR'):
+            self.client.post('/api/documents/reject_candidate/', {'interview_id': self.interview.pk}, format='json')
+        self.interview.refresh_from_db()
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.interview.result, 'SUCCESS')
+        self.assertTrue(self.candidate.has_successful_interview)
+
+class ModerationQueueTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = User.objects.create_user(email='queue-1@example.com', username='queue-1', password='pass', gender='MALE', is_staff=True)
+        cls.second = User.objects.create_user(email='queue-2@example.com', username='queue-2', password='pass', gender='FEMALE', is_staff=True)
+        candidate = Candidate.objects.create(user=User.objects.create(username='queue-candidate', email='queue-candidate@example.com'))
+        cls.resumes = [
+            Resume.objects.create(candidate=candidate, content=f'Резюме {index}', job_type='PROGRAMMER') for index in range(3)
+        ]
+        Resume.objects.create(candidate=candidate, content='Уже принято', status='ACCEPTED')
+
+    def as_moderator(self, user):
+        self.client.force_authenticate(user)
+        return self.client
+
+    def claim(self, user, limit):
+        response = self.as_moderator(user).post('/api/resumes/claim/', {'limit': limit}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['items']]
+
+    def test_claims_do_not_overlap(self):
+        ids = [resume.pk for resume in self.resumes]
+        self.assertEqual(self.claim(self.first, 2), ids[:2])
+        # Чужая живая аренда пропускается, обработанные записи в очередь не попадают
+        self.assertEqual(self.claim(self.second, 10), ids[2:])
+        # Повторный claim продлевает свою аренду
+        self.assertEqual(self.claim(self.first, 10), ids[:2])
+
+    def test_release_only_own_claims(self):
+        ids = [resume.pk for resume in self.resumes]
+        self.claim(self.first, 1)
+        self.claim(self.second, 1)
+        response = self.as_moderator(self.second).post('/api/resumes/release/', {'ids': ids}, format='json')
+        self.assertEqual(response.json(), {'released': 1})
+        self.assertEqual(Resume.objects.get(pk=ids[0]).claimed_by, self.first)
+        self.assertEqual(self.claim(self.second, 10), ids[1:])
+        self.assertEqual(self.as_moderator(self.second).post('/api/resumes/release/', {'ids': 'all'}, format='json').status_code, 400)
+
+    def test_decision_on_foreign_claim_conflicts(self):
+        resume = self.resumes[0]
+        self.claim(self.first, 1)
+        url = f'/api/resume/{resume.pk}/status/'
+        response = self.as_moderator(self.second).patch(url, {'status': 'REJECTED'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        # Истекшая аренда считается свободной
+        Resume.objects.filter(pk=resume.pk).update(claim_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.claim(self.second, 1), [resume.pk])
+        self.assertEqual(self.as_moderator(self.first).patch(url, {'status': 'ACCEPTED'}, format='json').status_code, 409)
+        self.assertEqual(self.as_moderator(self.second).patch(url, {'status': 'REJECTED'}, format='json').status_code, 200)
+        resume.refresh_from_db()
+        self.assertEqual((resume.status, resume.claimed_by, resume.claim_expires_at), ('REJECTED', None, None))
+
+@override_settings(INTERVIEW_SLOT_MINUTES=60)
+class SchedulerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.day = timezone.localdate() + timedelta(days=7)
+        cls.employees = []
+        for index, end in enumerate((clock(11), clock(12))):
+            user = User.objects.create_user(email=f'scheduler{index}@example.com', username=f'scheduler{index}', password='pass', gender='MALE')
+            employee = Employee.objects.create(user=user, position='Инженер')
+            EmployeeAvailability.objects.create(employee=employee, weekday=cls.day.weekday(), start_time=clock(10), end_time=end)
+            cls.employees.append(employee)
+        user = User.objects.create_user(email='scheduler-other@example.com', username='scheduler-other', password='pass', gender='MALE')
+        cls.other = Employee.objects.create(user=user, position='Инженер')
+        user = User.objects.create_user(email='scheduler-candidate@example.com', username='scheduler-candidate', password='pass', gender='FEMALE')
+        cls.candidate = Candidate.objects.create(user=user)
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, clock(hour)))
+
+    def test_candidate_not_booked_twice_in_one_slot(self):
+        # Собеседование по работе уже назначено на 10:00 у сотрудника без рабочих часов;
+        # резюме на практику должно получить другой слот
+        Interview.objects.create(candidate=self.candidate, employee=self.other, scheduled_at=self.at(10), resume_type='JOB')
+        Resume.objects.create(candidate=self.candidate, content='Практика', resume_type='PRACTICE', practice_type='EDUCATIONAL', status='ACCEPTED')
+        assignments, unscheduled = build_plan(self.day, 1)
+        self.assertEqual(unscheduled, [])
+        self.assertEqual([(employee_id, scheduled_at) for _, employee_id, scheduled_at in assignments], [(self.employees[1].pk, self.at(11))])
+
+    def test_unscheduled_when_only_conflicting_slots(self):
+        for hour in (10, 11):
+            Interview.objects.create(candidate=self.candidate, employee=self.other, scheduled_at=self.at(hour), resume_type='JOB')
+        Resume.objects.create(candidate=self.candidate, content='Практика', resume_type='PRACTICE', practice_type='EDUCATIONAL', status='ACCEPTED')
+        user = User.objects.create_user(email='scheduler-next@example.com', username='scheduler-next', password='pass', gender='MALE')
+        next_candidate = Candidate.objects.create(user=user)
+        Resume.objects.create(candidate=next_candidate, content='Работа', resume_type='JOB', job_type='PROGRAMMER', status='ACCEPTED')
+        assignments, unscheduled = build_plan(self.day, 1)
+        self.assertEqual(unscheduled, [self.candidate.pk])
+        # Пропущенные сотрудники возвращаются в кучу и достаются следующему кандидату
+        self.assertEqual([(resume['candidate_id'], employee_id, scheduled_at) for resume, employee_id, scheduled_at in assignments], [(next_candidate.pk, self.employees[0].pk, self.at(10))])
+
+@override_settings(INTERVIEW_REMINDER_OFFSETS=[1440, 60])
+class InterviewReminderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        employee = Employee.objects.create(user=User.objects.create(username='reminder-employee', email='reminder-employee@example.com', last_name='Сидоров'))
+        candidate = Candidate.objects.create(user=User.objects.create(username='reminder-candidate', email='reminder-candidate@example.com'))
+        schedule = lambda minutes, **extra: Interview.objects.create(
+            candidate=candidate, employee=employee, scheduled_at=cls.now + timedelta(minutes=minutes), job_type='PROGRAMMER', **extra
+        )
+        cls.soon = schedule(30)
+        cls.tomorrow = schedule(300)
+        schedule(3 * 1440)
+        schedule(30, status='CANCELLED')
+
+    def offsets(self, interview):
+        return set(InterviewReminder.objects.filter(interview=interview).values_list('offset_minutes', flat=True))
+
+    def send(self, now):
+        mail.outbox = []
+        with self.captureOnCommitCallbacks(execute=True):
+            return send_due_reminders(now=now)
+
+    def test_each_reminder_sent_once(self):
+        self.assertEqual(self.send(self.now), 2)
+        # Кандидат и сотрудник: по уведомлению и письму на собеседование
+        self.assertEqual(Notification.objects.count(), 4)
+        self.assertEqual(len(mail.outbox), 4)
+        # Часовое напоминание закрывает и устаревшее суточное
+        self.assertEqual(self.offsets(self.soon), {60, 1440})
+        self.assertEqual(self.offsets(self.tomorrow), {1440})
+        self.assertEqual(self.send(self.now), 0)
+        self.assertEqual((Notification.objects.count(), len(mail.outbox)), (4, 0))
+        self.assertEqual(self.send(self.now + timedelta(minutes=250)), 1)
+        self.assertEqual(self.offsets(self.tomorrow), {60, 1440})
+        self.assertEqual(self.send(self.now + timedelta(minutes=250)), 0)
+
+    def test_command_is_idempotent(self):
+        for expected in ('Отправлено напоминаний: 2', ''):
+            out = io.StringIO()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('send_interview_reminders', stdout=out)
+            self.assertEqual(out.getvalue().strip(), expected)
+        self.assertEqual(InterviewReminder.objects.count(), 3)
+
+class EmailLoggingTest(TestCase):
+    def test_recipients_not_logged(self):
+        recipients = ['first@example.com', 'second@example.com']
+        with self.assertLogs('request_app.utils', 'INFO') as logs:
+            self.assertTrue(send_notification_email('Тема', 'emails/registration.html', {'user': {'first_name': 'Иван'}}, recipients))
+        self.assertEqual(logs.records[0].getMessage(), 'Email sent successfully to 2 recipients with subject: Тема')
+        with mock.patch('request_app.utils.send_mail', side_effect=OSError('smtp down')), \
+                self.assertLogs('request_app.utils', 'ERROR') as logs:
+            self.assertFalse(send_notification_email('Тема', 'emails/registration.html', {'user': {'first_name': 'Иван'}}, recipients))
+        self.assertNotIn('example.com', logs.output[0])
+
+class SyncTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='sync@example.com', username='sync', password='pass', gender='MALE')
+        candidate = Candidate.objects.create(user=cls.user)
+        cls.resumes = [Resume.objects.create(candidate=candidate, content=f'Резюме {index}') for index in range(2)]
+        cls.notifications = [Notification.objects.create(user=cls.user, message=f'Сообщение {index}') for index in range(2)]
+        other = User.objects.create_user(email='sync-other@example.com', username='sync-other', password='pass', gender='MALE')
+        Resume.objects.create(candidate=Candidate.objects.create(user=other), content='Чужое резюме')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        hour_ago = timezone.now() - timedelta(hours=1)
+        for model in (User, Candidate, Resume, Notification):
+            model.objects.update(updated_at=hour_ago)
+        self.token = make_token(timezone.now() - timedelta(minutes=30))
+
+    def sync(self, token=None):
+        response = self.client.get('/api/sync/', {'token': token or self.token})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def changed(self, data, name):
+        return sorted(row['id'] for row in data[name]['changed'])
+
+    def test_full_sync_returns_own_rows(self):
+        data = self.client.get('/api/sync/').json()
+        self.assertTrue(data['full'])
+        self.assertEqual(self.changed(data, 'resumes'), [resume.pk for resume in self.resumes])
+        self.assertFalse(self.sync(data['token'])['full'])
+
+    def test_delta_contains_only_changes_and_deletions(self):
+        data = self.sync()
+        self.assertEqual([data[name] for name in ('resumes', 'notifications')], [{'changed': [], 'deleted': []}] * 2)
+        self.resumes[0].content = 'Новый текст'
+        self.resumes[0].save()
+        deleted_id = self.notifications[0].pk
+        self.notifications[0].delete()
+        data = self.sync()
+        self.assertEqual(self.changed(data, 'resumes'), [self.resumes[0].pk])
+        self.assertEqual(data['notifications'], {'changed': [], 'deleted': [deleted_id]})
+
+    def test_embedded_user_change_resends_rows(self):
+        self.user.last_name = 'Новиков'
+        self.user.save()
+        data = self.sync()
+        self.assertEqual(self.changed(data, 'resumes'), [resume.pk for resume in self.resumes])
+        self.assertEqual(data['resumes']['changed'][0]['candidate']['user']['last_name'], 'Новиков')
+
+    def test_token_errors(self):
+        self.assertEqual(self.client.get('/api/sync/', {'token': 'garbage'}).status_code, 400)
+        expired = make_token(timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1))
+        self.assertEqual(self.client.get('/api/sync/', {'token': expired}).status_code, 410)
+
+def make_pdf(image_side=0):
+    # PDF из одной страницы; с image_side — с несжатым RGB-изображением (как скан с телефона)
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    if image_side:
+        row = bytes(value % 256 for value in range(image_side * 3))
+        image = pikepdf.Stream(pdf, row * image_side)
+        image.Type, image.Subtype = pikepdf.Name.XObject, pikepdf.Name.Image
+        image.Width = image.Height = image_side
+        image.ColorSpace, image.BitsPerComponent = pikepdf.Name.DeviceRGB, 8
+        pdf.pages[0].Resources = pikepdf.Dictionary(XObject=pikepdf.Dictionary(Im0=image))
+    output = io.BytesIO()
+    pdf.save(output, compress_streams=False)
+    return output.getvalue()
+
+class PdfOptimizerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email='pdf@example.com', username='pdf', password='pass', gender='MALE')
+        candidate = Candidate.objects.create(user=user)
+        employee_user = User.objects.create(username='pdf-employee', email='pdf-employee@example.com')
+        employee = Employee.objects.create(user=employee_user, position='Инженер')
+        cls.interview = Interview.objects.create(candidate=candidate, employee=employee, scheduled_at=timezone.now(), result='SUCCESS')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def document(self, file_name='scan.pdf', data=b'%PDF-1.4'):
+        document = Document(interview=self.interview, document_type=DocumentTypeChoices.PASSPORT)
+        document.file_path.save(file_name, ContentFile(data), save=True)
+        return document
+
+    def test_optimize_pdf_statuses(self):
+        self.assertEqual(optimize_pdf(b'not a pdf')[1], OptimizationStatusChoices.FAILED)
+        self.assertEqual(optimize_pdf(make_pdf())[:2], (None, OptimizationStatusChoices.SKIPPED))
+        data = make_pdf(image_side=600)
+        optimized, status, _ = optimize_pdf(data)
+        self.assertEqual(status, OptimizationStatusChoices.OPTIMIZED)
+        self.assertLess(len(optimized), len(data))
+        with pikepdf.open(io.BytesIO(optimized)) as pdf:
+            self.assertEqual(len(pdf.pages), 1)
+
+    def test_skipped_keeps_file(self):
+        document = self.document()
+        name = document.file_path.name
+        self.assertEqual(apply_result(document.pk, name, 8, None, OptimizationStatusChoices.SKIPPED, ''), OptimizationStatusChoices.SKIPPED)
+        document.refresh_from_db()
+        self.assertEqual((document.file_path.name, document.optimization_status), (name, OptimizationStatusChoices.SKIPPED))
+        self.assertFalse(FileDeletion.objects.exists())
+
+    def test_optimized_name_fits_field(self):
+        document = self.document('скан' * 30 + '.pdf')
+        old_name = document.file_path.name
+        max_length = Document._meta.get_field('file_path').max_length
+        apply_result(document.pk, old_name, 100, b'%PDF-small', OptimizationStatusChoices.OPTIMIZED, '')
+        document.refresh_from_db()
+        self.assertEqual(document.optimization_status, OptimizationStatusChoices.OPTIMIZED)
+        self.assertLessEqual(len(document.file_path.name), max_length)
+        self.assertTrue(document.file_path.name.endswith(OPTIMIZED_SUFFIX))
+        self.assertEqual(document.file_path.read(), b'%PDF-small')
+        self.assertEqual(list(FileDeletion.objects.values_list('path', flat=True)), [old_name])
+
+    def test_failed_update_journals_new_file(self):
+        document = self.document()
+        name = document.file_path.name
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=DataError('value too long')), \
+                self.assertRaises(DataError):
+            apply_result(document.pk, name, 100, b'%PDF-small', OptimizationStatusChoices.OPTIMIZED, '')
+        document.refresh_from_db()
+        self.assertEqual(document.file_path.name, name)
+        orphan, = FileDeletion.objects.values_list('path', flat=True)
+        self.assertTrue(orphan.endswith(OPTIMIZED_SUFFIX))
+
+class BulkLoadTest(TestCase):
+    def load(self, **options):
+        out = io.StringIO()
+        call_command('bulk_load', stdout=out, **options)
+        return out.getvalue()
+
+    def test_generate_consistent_dataset(self):
+        self.load(generate=20, employees=3, batch_size=7, seed=1)
+        self.assertEqual((Candidate.objects.count(), Employee.objects.count()), (20, 3))
+        self.assertEqual(Resume.objects.count(), 20)
+        self.assertEqual(Notification.objects.count(), 20)
+        self.assertFalse(Interview.objects.exclude(candidate__resumes__status='ACCEPTED').exists())
+        # Побочный эффект Interview.save() воспроизведен одним UPDATE
+        self.assertEqual(
+            set(Candidate.objects.filter(has_successful_interview=True).values_list('id', flat=True)),
+            set(Interview.objects.filter(result='SUCCESS').values_list('candidate_id', flat=True)),
+        )
+        self.assertTrue(User.objects.filter(email__startswith='candidate.').first().check_password('password123'))
+
+    def test_import_csv_keeps_dates_and_fills_password(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'users.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as handle:
+            handle.write('email,first_name,last_name,gender,date_joined\n')
+            handle.write('old@example.com,Иван,"Иванов, мл.",MALE,2020-01-02T03:04:05+00:00\n')
+            handle.write('new@example.com,Анна,Петрова,FEMALE,2024-05-06T07:08:09+00:00\n')
+        output = self.load(file=path, model='user', copy=True, password='secret')
+        # COPY есть только в PostgreSQL — в остальных базах bulk_create
+        self.assertIn('COPY доступен только в PostgreSQL', output)
+        user = User.objects.get(email='old@example.com')
+        self.assertEqual(user.last_name, 'Иванов, мл.')
+        self.assertEqual(user.date_joined.year, 2020)
+        self.assertTrue(user.username.startswith('old'))
+        self.assertTrue(user.check_password('secret'))
+
+    def test_import_jsonl_with_explicit_ids(self):
+        user = User.objects.create_user(email='jsonl@example.com', username='jsonl', password='pass', gender='MALE')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'candidates.jsonl')
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(f'{{"id": 500, "user_id": {user.pk}, "date_of_birth": "2000-01-31"}}\n\n')
+        self.load(file=path, model='candidate')
+        self.assertEqual(str(Candidate.objects.get(pk=500).date_of_birth), '2000-01-31')
+        other = User.objects.create_user(email='jsonl2@example.com', username='jsonl2', password='pass', gender='MALE')
+        self.assertGreater(Candidate.objects.create(user=other).pk, 500)
+
+    def test_copy_csv_escaping(self):
+        self.assertEqual(_copy_value(None), '\\N')
+        self.assertEqual(_copy_value(True), 't')
+        self.assertEqual(_copy_value('a "b", c'), '"a ""b"", c"')
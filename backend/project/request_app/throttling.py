@@ -0,0 +1,159 @@
+import hashlib
+import math
+import time
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework.views import exception_handler as drf_exception_handler
+from .models import User
+
+# Ограничение частоты запросов в общем кэше (Redis при заданном REDIS_URL).
+# Скользящее окно из двух счетчиков: оценка = предыдущее окно * непрошедшая доля + текущее.
+# По поведению это ведро токенов емкостью в лимит с равномерным пополнением, но требует
+# только атомарного incr, который есть у всех бэкендов кэша: три обращения к кэшу на запрос
+# независимо от числа запросов в окне (SimpleRateThrottle DRF хранит список всех отметок).
+# Отклоненный запрос не расходует лимит — клиент, выждавший Retry-After, проходит.
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    # '10/m', '100/h', '5/15m'
+    count, period = rate.split('/')
+    multiplier = int(period[:-1]) if len(period) > 1 else 1
+    return int(count), multiplier * PERIODS[period[-1]]
+
+
+def retry_after(limit, window, previous, current, elapsed):
+    allowed = limit - 1 - current
+    if allowed >= 0:
+        # Достаточно, чтобы вклад предыдущего окна опустился до allowed
+        wait = window * (1 - allowed / previous) - elapsed
+    else:
+        # Текущее окно исчерпано: ждем следующего, где оно станет предыдущим
+        wait = window - elapsed + window * (1 - (limit - 1) / current)
+    return max(1, math.ceil(wait))
+
+
+class WindowThrottle(BaseThrottle):
+    scope = None
+    # Действия ViewSet, к которым применяется ограничение; None — все запросы представления
+    actions = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def applies(self, request, view):
+        return self.actions is None or getattr(view, 'action', None) in self.actions
+
+    def window(self, request, view):
+        # Ключи текущего и предыдущего окна; None — запрос не ограничивается
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if not rate or not self.applies(request, view):
+            return None
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return None
+        limit, window = parse_rate(rate)
+        now = time.time()
+        index = int(now // window)
+        key = f'throttle:{self.scope}:{ident}'
+        return f'{key}:{index}', f'{key}:{index - 1}', limit, window, now - index * window
+
+    @staticmethod
+    def hit(key, window):
+        # Счетчик живет два окна: следующее окно читает его как предыдущее
+        cache.add(key, 0, window * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Ключ вытеснен между add и incr
+            cache.set(key, 1, window * 2)
+            return 1
+
+    def allow_request(self, request, view):
+        params = self.window(request, view)
+        if params is None:
+            return True
+        key, previous_key, limit, window, elapsed = params
+        current = self.hit(key, window)
+        previous = cache.get(previous_key, 0)
+        if previous * (1 - elapsed / window) + current <= limit:
+            return True
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+        self.wait_seconds = retry_after(limit, window, previous, current - 1, elapsed)
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RegisterThrottle(WindowThrottle):
+    scope = 'register'
+
+    def get_ident_key(self, request, view):
+        return f'ip:{self.get_ident(request)}'
+
+
+class LoginThrottle(RegisterThrottle):
+    scope = 'login'
+
+
+class LoginAccountThrottle(WindowThrottle):
+    # Подбор пароля к одной учетной записи с разных адресов. Считаются только неудачные
+    # попытки (record_failure из LoginView): иначе любой, кто знает адрес почты,
+    # мог бы бесконечно блокировать вход владельцу учетной записи
+    scope = 'login_account'
+
+    def get_ident_key(self, request, view):
+        login = request.data.get(User.USERNAME_FIELD) if hasattr(request.data, 'get') else None
+        if not isinstance(login, str) or not login.strip():
+            return None
+        return 'account:' + hashlib.sha256(login.strip().lower().encode()).hexdigest()[:32]
+
+    def allow_request(self, request, view):
+        params = self.window(request, view)
+        if params is None:
+            return True
+        key, previous_key, limit, window, elapsed = params
+        current = cache.get(key, 0)
+        previous = cache.get(previous_key, 0)
+        if previous * (1 - elapsed / window) + current < limit:
+            return True
+        self.wait_seconds = retry_after(limit, window, previous, current, elapsed)
+        return False
+
+    def record_failure(self, request, view):
+        params = self.window(request, view)
+        if params is not None:
+            self.hit(params[0], params[3])
+
+
+class UploadThrottle(WindowThrottle):
+    scope = 'upload'
+    actions = {'create', 'presign_upload', 'finalize_upload'}
+
+
+class ModeratorListThrottle(WindowThrottle):
+    scope = 'moderator_list'
+    actions = {'list', 'claim', 'ranked', 'duplicates', 'export_zip'}
+
+    def applies(self, request, view):
+        return request.user.is_staff and super().applies(request, view)
+
+
+def exception_handler(exc, context):
+    response = drf_exception_handler(exc, context)
+    if isinstance(exc, Throttled) and response is not None:
+        # Ошибки API отдаются в виде {'error': ...}; Retry-After выставляет DRF
+        response.data = {'error': f'Слишком много запросов. Повторите через {exc.wait} с', 'retry_after': exc.wait}
+    return response
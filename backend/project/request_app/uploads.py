@@ -0,0 +1,119 @@
+import os
+import uuid
+from urllib.parse import quote
+from django.conf import settings
+from django.core import signing
+from .models import Document, document_storage
+from .serializers import DOCUMENT_MAX_SIZE
+
+# Прямая загрузка документов в S3-совместимое хранилище.
+# 1. presign: API выдает подписанную POST-форму на один ключ; ограничения размера и
+#    Content-Type проверяет само хранилище, а ключ и собеседование зашиваются в подписанный токен.
+# 2. Браузер отправляет файл напрямую в хранилище.
+# 3. finalize: API по токену проверяет объект (HEAD и первые байты — сигнатура PDF)
+#    и создает строку документа. Файл через воркер не проходит.
+
+UPLOAD_SALT = 'request_app.uploads'
+# Запас после истечения ссылки на медленную загрузку и вызов finalize
+FINALIZE_GRACE_SECONDS = 600
+PDF_SIGNATURE = b'%PDF-'
+
+
+class UploadError(ValueError):
+    pass
+
+
+def direct_uploads_enabled():
+    return settings.DOCUMENT_STORAGE == 's3'
+
+
+def _client(storage):
+    return storage.connection.meta.client
+
+
+def upload_key(candidate_id, file_name):
+    # Уникальный ключ: имя файла сохраняется для скачивания, повторная загрузка не перезапишет старую.
+    # Ключ хранится в Document.file_path, поэтому длинное имя укорачивается с сохранением расширения
+    prefix = f'candidate_{candidate_id}/{uuid.uuid4().hex}/'
+    stem, extension = os.path.splitext(os.path.basename(file_name))
+    max_length = Document._meta.get_field('file_path').max_length
+    return prefix + stem[:max(1, max_length - len(prefix) - len(extension))] + extension
+
+
+def presign_upload(interview, document_type, file_name):
+    storage = document_storage()
+    key = upload_key(interview.candidate_id, file_name)
+    form = _client(storage).generate_presigned_post(
+        storage.bucket_name, key,
+        Fields={'Content-Type': 'application/pdf'},
+        Conditions=[{'Content-Type': 'application/pdf'}, ['content-length-range', 1, DOCUMENT_MAX_SIZE]],
+        ExpiresIn=settings.DOCUMENT_UPLOAD_URL_EXPIRE,
+    )
+    token = signing.dumps({'interview': interview.id, 'document_type': document_type, 'key': key}, salt=UPLOAD_SALT)
+    return {
+        'url': form['url'],
+        'fields': form['fields'],
+        'token': token,
+        'expires_in': settings.DOCUMENT_UPLOAD_URL_EXPIRE,
+    }
+
+
+def read_upload_token(token):
+    try:
+        return signing.loads(token, salt=UPLOAD_SALT, max_age=settings.DOCUMENT_UPLOAD_URL_EXPIRE + FINALIZE_GRACE_SECONDS)
+    except signing.SignatureExpired:
+        raise UploadError('Срок действия загрузки истек, запросите ссылку заново')
+    except signing.BadSignature:
+        raise UploadError('Некорректный токен загрузки')
+
+
+def verify_uploaded(key):
+    storage = document_storage()
+    client = _client(storage)
+    try:
+        head = client.head_object(Bucket=storage.bucket_name, Key=key)
+    except client.exceptions.ClientError:
+        raise UploadError('Файл не найден в хранилище, загрузка не завершена')
+    problem = None
+    if head['ContentLength'] > DOCUMENT_MAX_SIZE:
+        problem = 'Размер файла не должен превышать 5 МБ'
+    else:
+        start = client.get_object(Bucket=storage.bucket_name, Key=key, Range=f'bytes=0-{len(PDF_SIGNATURE) - 1}')
+        if start['Body'].read() != PDF_SIGNATURE:
+            problem = 'Файл должен быть в формате PDF'
+    if problem:
+        storage.delete(key)
+        raise UploadError(problem)
+    return head['ContentLength']
+
+
+def download_url(request, name):
+    storage = document_storage()
+    if direct_uploads_enabled():
+        # Имена файлов бывают кириллическими — RFC 5987
+        disposition = f"attachment; filename*=UTF-8''{quote(os.path.basename(name))}"
+        return storage.url(name, parameters={'ResponseContentDisposition': disposition}, expire=settings.DOCUMENT_DOWNLOAD_URL_EXPIRE)
+    return request.build_absolute_uri(storage.url(name))
+
+
+def _closing(chunks, handle):
+    try:
+        yield from chunks
+    finally:
+        handle.close()
+
+
+def document_chunks(name, chunk_size=64 * 1024):
+    # Файл открывается сразу, чтобы отсутствие обнаружилось до начала записи в архив;
+    # дальше чтение по частям. S3File читает объект целиком во временный файл, поэтому
+    # для S3 используется потоковое тело ответа get_object
+    storage = document_storage()
+    if direct_uploads_enabled():
+        client = _client(storage)
+        try:
+            body = client.get_object(Bucket=storage.bucket_name, Key=name)['Body']
+        except client.exceptions.ClientError as e:
+            raise FileNotFoundError(name) from e
+        return _closing(body.iter_chunks(chunk_size), body)
+    handle = storage.open(name, 'rb')
+    return _closing(iter(lambda: handle.read(chunk_size), b''), handle)
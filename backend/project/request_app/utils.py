@@ -1,12 +1,16 @@
 import logging
-from django.core.mail import send_mail
+import time
+from django.core.mail import send_mail, get_connection, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
 def send_notification_email(subject, template_name, context, recipient_list):
+    metrics.EMAILS_IN_FLIGHT.inc()
+    started = time.perf_counter()
     try:
         html_message = render_to_string(template_name, context)
         plain_message = strip_tags(html_message)
@@ -18,8 +22,52 @@ def send_notification_email(subject, template_name, context, recipient_list):
             html_message=html_message,
             fail_silently=False,
         )
-        logger.info(f"Email sent successfully to {recipient_list} with subject: {subject}")
+        # В журнал попадает число получателей, а не адреса
+        logger.info("Email sent successfully to %d recipients with subject: %s", len(recipient_list), subject)
+        metrics.EMAILS_SENT.labels('success').inc()
         return True
     except Exception as e:
-        logger.error(f"Failed to send email with template {template_name}: {str(e)}", exc_info=True)
-        return False
\ No newline at end of file
+        logger.error("Failed to send email with template %s: %s", template_name, e, exc_info=True)
+        metrics.EMAILS_SENT.labels('failure').inc()
+        return False
+    finally:
+        metrics.EMAILS_IN_FLIGHT.dec()
+        metrics.EMAIL_SEND_LATENCY.observe(time.perf_counter() - started)
+
+def send_notification_emails(subject, template_name, messages):
+    # messages — список (context, recipient_list); все письма идут через одно SMTP-соединение
+    if not messages:
+        return 0
+    sent = processed = 0
+    metrics.EMAILS_IN_FLIGHT.inc(len(messages))
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for context, recipient_list in messages:
+                started = time.perf_counter()
+                try:
+                    html_message = render_to_string(template_name, context)
+                    email = EmailMultiAlternatives(
+                        subject=subject,
+                        body=strip_tags(html_message),
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=recipient_list,
+                        connection=connection,
+                    )
+                    email.attach_alternative(html_message, 'text/html')
+                    email.send()
+                    sent += 1
+                    metrics.EMAILS_SENT.labels('success').inc()
+                except Exception as e:
+                    logger.error("Failed to send email with template %s to %d recipients: %s", template_name, len(recipient_list), e, exc_info=True)
+                    metrics.EMAILS_SENT.labels('failure').inc()
+                finally:
+                    processed += 1
+                    metrics.EMAILS_IN_FLIGHT.dec()
+                    metrics.EMAIL_SEND_LATENCY.observe(time.perf_counter() - started)
+    except Exception as e:
+        # Соединение не открылось — необработанные письма считаются неотправленными
+        logger.error("Email connection error for template %s: %s", template_name, e, exc_info=True)
+        metrics.EMAILS_SENT.labels('failure').inc(len(messages) - processed)
+        metrics.EMAILS_IN_FLIGHT.dec(len(messages) - processed)
+    logger.info("Sent %d of %d emails with subject: %s", sent, len(messages), subject)
+    return sent
@@ -1,52 +1,183 @@
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
 from rest_framework.response import Response
 import logging
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
-from django.db.utils import IntegrityError
-from .models import User, Candidate, Resume, Employee, Notification, Interview, Document, DocumentHistory
+from django.db.utils import DataError, IntegrityError
+from .models import User, Candidate, Resume, Employee, Notification, Interview, Document, DocumentHistory, NotificationArchive, DocumentHistoryArchive, document_storage
 from .serializers import (
     CandidateSerializer, ResumeSerializer, UserSerializer,
     ResumeStatusUpdateSerializer, ResumeEditSerializer,
     NotificationSerializer, InterviewSerializer, InterviewCreateSerializer,
-    DocumentSerializer, EmployeeSerializer, DocumentHistorySerializer
+    DocumentSerializer, EmployeeSerializer, DocumentHistorySerializer,
+    NotificationArchiveSerializer, DocumentHistoryArchiveSerializer,
+    DocumentUploadRequestSerializer, validate_document_slot
 )
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from .utils import send_notification_email
-from datetime import datetime
+from . import batch, metrics, profiling
+from django.http import HttpResponse, StreamingHttpResponse
+from .export import stream_csv, stream_xlsx, stream_zip
+from .reports import REPORT_HEADER, ReportFilters, report_rows, report_page
+from .conditional import RESUME_RELATED, INTERVIEW_RELATED, DOCUMENT_RELATED, list_validator, not_modified, add_validators
+from .scheduler import schedule
+from .funnel import record, funnel_report
+from .dedup import find_duplicates
+from .scoring import VACANCIES, rank_resumes
+from .uploads import UploadError, direct_uploads_enabled, presign_upload, read_upload_token, verify_uploaded, download_url, document_chunks
+from .throttling import RegisterThrottle, LoginThrottle, LoginAccountThrottle, UploadThrottle, ModeratorListThrottle
+from .moderation import QUEUES, claim, release, held_by_other
+from .sync import SyncTokenError, SyncTokenExpired, read_token, changes
+from .listing import ShapeError, CANDIDATE_SHAPE, RESUME_SHAPE, INTERVIEW_SHAPE, DOCUMENT_SHAPE, NOTIFICATION_SHAPE
+from prometheus_client import CONTENT_TYPE_LATEST
+import hmac
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
-class CandidateViewSet(viewsets.ModelViewSet):
+def query_flag(request, param):
+    return request.query_params.get(param) in ('1', 'true', 'True')
+
+def wants_archived(request, param='archived'):
+    return query_flag(request, param)
+
+def shape_params(request):
+    # ?fields=id,status&expand=interview.candidate; без обоих параметров — полная форма ответа
+    fields = request.query_params.get('fields')
+    expand = request.query_params.get('expand')
+    if fields is None and expand is None:
+        return None, None
+    split = lambda value: [item.strip() for item in (value or '').split(',') if item.strip()]
+    return (split(fields) if fields is not None else None), split(expand)
+
+class ShapedResponseMixin:
+    shape = None
+    # Условный GET (ETag / Last-Modified) для моделей с updated_at
+    conditional = False
+    conditional_related = ()
+
+    def shaped_rows(self, queryset):
+        fields, expand = shape_params(self.request)
+        return self.shape.rows(queryset, fields, expand, self.request)
+
+    def shaped_response(self, queryset):
+        if not self.conditional:
+            return Response(self.shaped_rows(queryset))
+        etag, last_modified = list_validator(self.request, queryset, self.conditional_related)
+        response = not_modified(self.request, etag, last_modified)
+        if response is None:
+            response = Response(self.shaped_rows(queryset))
+        return add_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.shaped_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        if shape_params(request) == (None, None):
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        return Response(self.shaped_rows(self.get_queryset().filter(pk=instance.pk))[0])
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ShapeError):
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().handle_exception(exc)
+
+class ModerationQueueMixin:
+    # POST claim/ {limit} — взять следующие свободные записи с арендой, POST release/ {ids} — вернуть в очередь
+    queue = None
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def claim(self, request):
+        model, statuses = QUEUES[self.queue]
+        try:
+            limit = int(request.data.get('limit', 10))
+        except (TypeError, ValueError):
+            return Response({'error': 'Некорректный параметр limit'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.MODERATION_CLAIM_MAX))
+        queryset, expires_at = claim(model, statuses, request.user, limit)
+        return Response({'claim_expires_at': expires_at, 'items': self.shaped_rows(queryset)})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def release(self, request):
+        model, _ = QUEUES[self.queue]
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response({'error': 'Передайте список ids'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'released': release(model, ids, request.user)})
+
+def claim_conflict():
+    return Response({'error': 'Запись взята в работу другим модератором'}, status=status.HTTP_409_CONFLICT)
+
+class CandidateViewSet(ShapedResponseMixin, viewsets.ModelViewSet):
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    throttle_classes = [ModeratorListThrottle]
+    shape = CANDIDATE_SHAPE
 
-class ResumeViewSet(viewsets.ModelViewSet):
+class ResumeViewSet(ModerationQueueMixin, ShapedResponseMixin, viewsets.ModelViewSet):
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [ModeratorListThrottle]
+    shape = RESUME_SHAPE
+    conditional = True
+    conditional_related = RESUME_RELATED
+    queue = 'resumes'
 
     def get_queryset(self):
         if self.request.user.is_staff:
             return Resume.objects.all()
         return Resume.objects.filter(candidate__user=self.request.user)
 
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def duplicates(self, request, pk=None):
+        # Похожие резюме других учетных записей: текст (MinHash/LSH), телефон, ФИО
+        return Response(find_duplicates(self.get_object()))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def ranked(self, request):
+        # ?vacancy=PROGRAMMER&limit=50&offset=0[&all_vacancies=1] — резюме на рассмотрении по убыванию
+        # релевантности. Архива у резюме нет: как и list, ранжирование не принимает archived.
+        # По умолчанию — только резюме этой вакансии, all_vacancies=1 — все резюме на рассмотрении
+        vacancy = request.query_params.get('vacancy')
+        if vacancy not in VACANCIES or not settings.RESUME_SCORING_PROFILES.get(vacancy):
+            return Response({'error': 'Неизвестная вакансия или для нее не задан профиль'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 50)), 500))
+            offset = max(0, int(request.query_params.get('offset', 0)))
+        except ValueError:
+            return Response({'error': 'Некорректные параметры limit/offset'}, status=status.HTTP_400_BAD_REQUEST)
+        count, ranked = rank_resumes(vacancy, limit, offset, only_vacancy=not query_flag(request, 'all_vacancies'))
+        fields, expand = shape_params(request)
+        if fields is not None and 'id' not in fields:
+            fields = fields + ['id']
+        rows = {row['id']: row for row in self.shape.rows(Resume.objects.filter(pk__in=dict(ranked)), fields, expand, request)}
+        # Резюме могло смениться статусом между обновлением индекса и выборкой — такие пропускаются
+        results = [{**rows[pk], 'score': score} for pk, score in ranked if pk in rows]
+        return Response({'vacancy': vacancy, 'count': count, 'results': results})
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my(self, request):
         try:
             candidate = Candidate.objects.get(user=request.user)
             resumes = Resume.objects.filter(candidate=candidate)
-            serializer = ResumeSerializer(resumes, many=True)
-            return Response(serializer.data)
+            return self.shaped_response(resumes)
         except Candidate.DoesNotExist:
             return Response({'error': 'Кандидат не найден'}, status=status.HTTP_404_NOT_FOUND)
 
 class RegisterView(APIView):
+    throttle_classes = [RegisterThrottle]
+
     def post(self, request):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
@@ -80,6 +211,15 @@ class RegisterView(APIView):
             errors['email'] = 'Пользователь с таким email уже существует'
         return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
+class LoginView(TokenObtainPairView):
+    throttle_classes = [LoginThrottle, LoginAccountThrottle]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Лимит учетной записи расходуют только отклоненные пароли
+        if response.status_code == status.HTTP_401_UNAUTHORIZED:
+            LoginAccountThrottle().record_failure(request, self)
+        return super().finalize_response(request, response, *args, **kwargs)
+
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -89,11 +229,13 @@ class MeView(APIView):
             'user': UserSerializer(user).data,
             'is_staff': user.is_staff,
             'is_superuser': user.is_superuser,
+            # Клиент сразу выбирает способ загрузки документов: напрямую в хранилище или через API
+            'direct_uploads': direct_uploads_enabled(),
         }
         try:
             candidate = Candidate.objects.get(user=user)
             response_data['candidate'] = CandidateSerializer(candidate).data
-            logger.info(f"MeView: Candidate {candidate.id} has_successful_interview={candidate.has_successful_interview}")
+            logger.debug("MeView: Candidate %s has_successful_interview=%s", candidate.id, candidate.has_successful_interview)
         except Candidate.DoesNotExist:
             response_data['candidate'] = None
         try:
@@ -118,7 +260,9 @@ class ResumeCreateView(APIView):
         serializer = ResumeSerializer(data=request.data)
         if serializer.is_valid():
             try:
-                resume = serializer.save(candidate=candidate)
+                with transaction.atomic():
+                    resume = serializer.save(candidate=candidate)
+                    record('resume', resume, {'status': (None, resume.status)}, request.user)
                 vacancy_name = resume.get_job_type_display() if resume.resume_type == 'JOB' else resume.get_practice_type_display()
                 Notification.objects.create(
                     user=resume.candidate.user,
@@ -145,46 +289,51 @@ class ResumeStatusUpdateView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def patch(self, request, pk):
-        try:
-            resume = Resume.objects.get(pk=pk)
-        except Resume.DoesNotExist:
-            return Response({'error': 'Резюме не найдено'}, status=status.HTTP_404_NOT_FOUND)
-
-        serializer = ResumeStatusUpdateSerializer(resume, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            comment = serializer.validated_data.get('comment', '')
-            status_display = {
-                'PENDING': 'На рассмотрении',
-                'ACCEPTED': 'Принято',
-                'REJECTED': 'Отклонено'
-            }.get(resume.status, resume.status)
-            vacancy_name = resume.get_job_type_display() if resume.resume_type == 'JOB' else resume.get_practice_type_display()
-            message = f'Статус вашего резюме на {resume.get_resume_type_display()} ({vacancy_name}) изменен на: {status_display}'
-            if comment:
-                message += f'\nКомментарий: {comment}'
-            Notification.objects.create(
-                user=resume.candidate.user,
-                message=message,
-                type='RESUME_STATUS',
-                sent_to_email=True
-            )
-            
-            send_notification_email(
-                subject='Изменение статуса резюме',
-                template_name='emails/resume_status.html',
-                context={
-                    'user': resume.candidate.user,
-                    'resume_type': resume.get_resume_type_display(),
-                    'vacancy_name': vacancy_name,
-                    'status': status_display,
-                    'comment': comment or 'Отсутствует'
-                },
-                recipient_list=[resume.candidate.user.email]
-            )
-            
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            try:
+                resume = Resume.objects.select_for_update().get(pk=pk)
+            except Resume.DoesNotExist:
+                return Response({'error': 'Резюме не найдено'}, status=status.HTTP_404_NOT_FOUND)
+            if held_by_other(resume, request.user):
+                return claim_conflict()
+            serializer = ResumeStatusUpdateSerializer(resume, data=request.data, partial=True)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            old_status = resume.status
+            # Решение принято — аренда снимается
+            serializer.save(claimed_by=None, claim_expires_at=None)
+            record('resume', resume, {'status': (old_status, resume.status)}, request.user)
+        comment = serializer.validated_data.get('comment', '')
+        status_display = {
+            'PENDING': 'На рассмотрении',
+            'ACCEPTED': 'Принято',
+            'REJECTED': 'Отклонено'
+        }.get(resume.status, resume.status)
+        vacancy_name = resume.get_job_type_display() if resume.resume_type == 'JOB' else resume.get_practice_type_display()
+        message = f'Статус вашего резюме на {resume.get_resume_type_display()} ({vacancy_name}) изменен на: {status_display}'
+        if comment:
+            message += f'\nКомментарий: {comment}'
+        Notification.objects.create(
+            user=resume.candidate.user,
+            message=message,
+            type='RESUME_STATUS',
+            sent_to_email=True
+        )
+        
+        send_notification_email(
+            subject='Изменение статуса резюме',
+            template_name='emails/resume_status.html',
+            context={
+                'user': resume.candidate.user,
+                'resume_type': resume.get_resume_type_display(),
+                'vacancy_name': vacancy_name,
+                'status': status_display,
+                'comment': comment or 'Отсутствует'
+            },
+            recipient_list=[resume.candidate.user.email]
+        )
+        
+        return Response(serializer.data)
 
 class ResumeDeleteView(APIView):
     permission_classes = [IsAuthenticated]
@@ -218,10 +367,13 @@ class ResumeEditView(APIView):
 
         serializer = ResumeEditSerializer(resume, data=request.data, partial=True)
         if serializer.is_valid():
-            resume.status = 'PENDING'
-            resume.comment = ''
-            resume.save()
-            serializer.save()
+            old_status = resume.status
+            with transaction.atomic():
+                resume.status = 'PENDING'
+                resume.comment = ''
+                resume.save()
+                serializer.save()
+                record('resume', resume, {'status': (old_status, resume.status)}, request.user)
             return Response(ResumeSerializer(resume).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -229,6 +381,10 @@ class NotificationView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        # Архив (старше срока хранения) читается только по явному запросу ?archived=1
+        if wants_archived(request):
+            notifications = NotificationArchive.objects.filter(user=request.user).order_by('-created_at')
+            return Response(NotificationArchiveSerializer(notifications, many=True).data)
         notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
         serializer = NotificationSerializer(notifications, many=True)
         return Response(serializer.data)
@@ -244,10 +400,14 @@ class NotificationView(APIView):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class InterviewViewSet(viewsets.ModelViewSet):
+class InterviewViewSet(ShapedResponseMixin, viewsets.ModelViewSet):
     queryset = Interview.objects.all()
     serializer_class = InterviewSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [ModeratorListThrottle]
+    shape = INTERVIEW_SHAPE
+    conditional = True
+    conditional_related = INTERVIEW_RELATED
 
     def get_queryset(self):
         if self.request.user.is_staff:
@@ -263,7 +423,13 @@ class InterviewViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        old_status, old_result = instance.status, instance.result
+        with transaction.atomic():
+            self.perform_update(serializer)
+            record('interview', instance, {
+                'status': (old_status, instance.status),
+                'result': (old_result, instance.result),
+            }, request.user)
         result_display = {
             'SUCCESS': 'Успешно',
             'FAILURE': 'Неуспешно',
@@ -303,7 +469,7 @@ class InterviewViewSet(viewsets.ModelViewSet):
                 context=email_context,
                 recipient_list=[instance.candidate.user.email]
             )
-        logger.info(f"Interview {instance.id} updated: result={instance.result}, candidate={instance.candidate.id}, has_successful_interview={instance.candidate.has_successful_interview}")
+        logger.info("Interview %s updated: status=%s, result=%s, candidate=%s", instance.id, instance.status, instance.result, instance.candidate_id)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
@@ -311,8 +477,7 @@ class InterviewViewSet(viewsets.ModelViewSet):
         try:
             candidate = Candidate.objects.get(user=request.user)
             interviews = Interview.objects.filter(candidate=candidate)
-            serializer = InterviewSerializer(interviews, many=True)
-            return Response(serializer.data)
+            return self.shaped_response(interviews)
         except Candidate.DoesNotExist:
             return Response({'error': 'Кандидат не найден'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -320,7 +485,9 @@ class InterviewViewSet(viewsets.ModelViewSet):
     def create_interview(self, request):
         serializer = InterviewCreateSerializer(data=request.data)
         if serializer.is_valid():
-            interview = serializer.save()
+            with transaction.atomic():
+                interview = serializer.save()
+                record('interview', interview, {'status': (None, interview.status)}, request.user)
             vacancy_name = interview.get_job_type_display() if interview.resume_type == 'JOB' else interview.get_practice_type_display()
             Notification.objects.create(
                 user=interview.candidate.user,
@@ -355,8 +522,55 @@ class InterviewViewSet(viewsets.ModelViewSet):
         serializer = EmployeeSerializer(employees, many=True)
         return Response(serializer.data)
 
-class DocumentViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def auto_schedule(self, request):
+        # Назначает собеседования всем кандидатам с принятыми резюме по рабочим часам сотрудников
+        try:
+            date_from = datetime.strptime(request.data['date_from'], '%Y-%m-%d').date() if request.data.get('date_from') else timezone.localdate() + timedelta(days=1)
+            days = int(request.data.get('days', settings.AUTO_SCHEDULE_DAYS))
+        except (TypeError, ValueError):
+            return Response({'error': 'Неверные параметры: date_from в формате ГГГГ-ММ-ДД, days — число'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= 90:
+            return Response({'error': 'days должно быть от 1 до 90'}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true')
+        assignments, unscheduled = schedule(date_from, days, dry_run=dry_run, actor=request.user)
+        load = {}
+        for _, employee_id, _ in assignments:
+            load[employee_id] = load.get(employee_id, 0) + 1
+        logger.info("Auto schedule (dry_run=%s): %d scheduled, %d without slot", dry_run, len(assignments), len(unscheduled))
+        return Response({
+            'dry_run': dry_run,
+            'scheduled': [
+                {'candidate': resume['candidate_id'], 'employee': employee_id, 'scheduled_at': scheduled_at}
+                for resume, employee_id, scheduled_at in assignments
+            ],
+            'unscheduled': unscheduled,
+            'load': load,
+        })
+
+def _archive_name(part):
+    return part.replace('/', '-').replace('\\', '-').strip() or '-'
+
+def _archive_entries(documents):
+    # Папка на собеседование: «Фамилия Имя Отчество (id)/Тип документа.pdf»
+    for document in documents:
+        user = document.interview.candidate.user
+        folder = _archive_name(f"{user.last_name} {user.first_name} {user.patronymic}".strip() or user.email)
+        name = f"{folder} ({document.interview_id})/{_archive_name(document.document_type)}.pdf"
+        try:
+            chunks = document_chunks(document.file_path.name)
+        except OSError:
+            logger.warning("Архив документов: файл %s документа %s не найден", document.file_path.name, document.id)
+            continue
+        yield name, chunks, None
+
+class DocumentViewSet(ModerationQueueMixin, ShapedResponseMixin, viewsets.ModelViewSet):
     serializer_class = DocumentSerializer
+    throttle_classes = [UploadThrottle, ModeratorListThrottle]
+    shape = DOCUMENT_SHAPE
+    conditional = True
+    conditional_related = DOCUMENT_RELATED
+    queue = 'documents'
 
     def get_queryset(self):
         if self.request.user.is_staff:
@@ -368,68 +582,148 @@ class DocumentViewSet(viewsets.ModelViewSet):
         interview_id = request.query_params.get('interview')
         if interview_id:
             queryset = queryset.filter(interview_id=interview_id)
-            logger.info(f"Filtered documents for interview {interview_id}: {queryset.count()} documents")
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+            logger.debug("Filtered documents for interview %s", interview_id)
+        return self.shaped_response(queryset)
 
     def create(self, request):
+        started = time.perf_counter()
+        try:
+            return self._create(request)
+        finally:
+            metrics.UPLOAD_DURATION.observe(time.perf_counter() - started)
+
+    def _successful_interview(self, request):
+        # Собеседование, к которому кандидат загружает документы: (interview, None) или (None, ответ с ошибкой)
         try:
             candidate = Candidate.objects.get(user=request.user)
-            resume_type = request.data.get('resume_type')
-            if not resume_type:
-                return Response({'error': 'Не указан тип заявки (resume_type)'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            interview = Interview.objects.filter(
-                candidate=candidate, 
-                result='SUCCESS', 
-                resume_type=resume_type
-            ).first()
-            logger.info(f"DocumentViewSet.create: Candidate {candidate.id}, resume_type={resume_type}, has_successful_interview={candidate.has_successful_interview}, found interview={interview.id if interview else None}")
-            logger.info(f"Request data: {request.data}")
-            if not interview:
-                return Response(
-                    {'error': f'У вас нет успешного собеседования для {resume_type.lower()}'}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
         except Candidate.DoesNotExist:
-            return Response({'error': 'Кандидат не найден'}, status=status.HTTP_404_NOT_FOUND)
+            return None, Response({'error': 'Кандидат не найден'}, status=status.HTTP_404_NOT_FOUND)
+        resume_type = request.data.get('resume_type')
+        if not resume_type:
+            return None, Response({'error': 'Не указан тип заявки (resume_type)'}, status=status.HTTP_400_BAD_REQUEST)
+
+        interview = Interview.objects.filter(
+            candidate=candidate, 
+            result='SUCCESS', 
+            resume_type=resume_type
+        ).first()
+        logger.info("DocumentViewSet.create: candidate=%s, resume_type=%s, interview=%s", candidate.id, resume_type, interview.id if interview else None)
+        if not interview:
+            return None, Response(
+                {'error': f'У вас нет успешного собеседования для {resume_type.lower()}'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return interview, None
+
+    def _document_uploaded(self, document, interview):
+        DocumentHistory.objects.create(
+            document=document,
+            status=document.status,
+            comment='Документ загружен'
+        )
+        vacancy_name = interview.get_job_type_display() if interview.resume_type == 'JOB' else interview.get_practice_type_display()
+        Notification.objects.create(
+            user=interview.candidate.user,
+            message=f'Ваш документ ({document.document_type}) для {interview.get_resume_type_display()} ({vacancy_name}) успешно загружен.',
+            type='DOCUMENT',
+            sent_to_email=False
+        )
+
+    def _create(self, request):
+        interview, error = self._successful_interview(request)
+        if error:
+            return error
 
         serializer = DocumentSerializer(data=request.data, context={'interview': interview})
         if serializer.is_valid():
+            # Размер учитывается только для принятых файлов: отклоненные запросы не искажают распределение
+            metrics.UPLOAD_SIZE.observe(serializer.validated_data['file_path'].size)
             try:
                 document = serializer.save(interview=interview)
-                DocumentHistory.objects.create(
-                    document=document,
-                    status=document.status,
-                    comment='Документ загружен'
-                )
-                vacancy_name = interview.get_job_type_display() if interview.resume_type == 'JOB' else interview.get_practice_type_display()
-                Notification.objects.create(
-                    user=interview.candidate.user,
-                    message=f'Ваш документ ({document.document_type}) для {interview.get_resume_type_display()} ({vacancy_name}) успешно загружен.',
-                    type='DOCUMENT',
-                    sent_to_email=False
-                )
+                self._document_uploaded(document, interview)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             except IntegrityError as e:
-                logger.error(f"IntegrityError: {str(e)}")
+                logger.warning("Document upload IntegrityError: %s", e)
                 return Response(
                     {'error': f'Документ типа {request.data.get("document_type")} уже загружен для этого собеседования'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-        logger.error(f"Serializer errors: {serializer.errors}")
+        logger.info("Document upload rejected: %s", list(serializer.errors))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def presign_upload(self, request):
+        # {resume_type, document_type, file_name, size} -> подписанная форма для загрузки напрямую в хранилище
+        if not direct_uploads_enabled():
+            return Response({'error': 'Прямая загрузка в хранилище не настроена'}, status=status.HTTP_400_BAD_REQUEST)
+        interview, error = self._successful_interview(request)
+        if error:
+            return error
+        serializer = DocumentUploadRequestSerializer(data=request.data, context={'interview': interview})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        return Response(presign_upload(interview, data['document_type'], data['file_name']))
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def finalize_upload(self, request):
+        # {token} после успешной загрузки: проверка файла в хранилище и создание документа
+        if not direct_uploads_enabled():
+            return Response({'error': 'Прямая загрузка в хранилище не настроена'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload = read_upload_token(request.data.get('token') or '')
+        except UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        interview = Interview.objects.filter(pk=upload['interview'], candidate__user=request.user).select_related('candidate__user').first()
+        if not interview:
+            return Response({'error': 'Собеседование не найдено'}, status=status.HTTP_404_NOT_FOUND)
+        if Document.objects.filter(file_path=upload['key']).exists():
+            # Повторный вызов с тем же токеном: объект уже принадлежит документу и удалять его нельзя
+            return Response({'error': 'Загрузка уже завершена'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            size = verify_uploaded(upload['key'])
+            validate_document_slot(interview, upload['document_type'])
+            with transaction.atomic():
+                document = Document.objects.create(interview=interview, document_type=upload['document_type'], file_path=upload['key'])
+                self._document_uploaded(document, interview)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except (ValidationError, IntegrityError) as e:
+            # Слот занят параллельной загрузкой — загруженный объект больше не нужен
+            document_storage().delete(upload['key'])
+            message = e.detail[0] if isinstance(e, ValidationError) else f'Документ типа {upload["document_type"]} уже загружен для этого собеседования'
+            return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+        except DataError:
+            # Ключ из токена, выданного до ограничения длины, не помещается в file_path
+            document_storage().delete(upload['key'])
+            return Response({'error': 'Слишком длинное имя файла, загрузите документ заново'}, status=status.HTTP_400_BAD_REQUEST)
+        metrics.UPLOAD_SIZE.observe(size)
+        return Response(DocumentSerializer(document, context=self.get_serializer_context()).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def download_url(self, request, pk=None):
+        document = self.get_object()
+        return Response({
+            'url': download_url(request, document.file_path.name),
+            'expires_in': settings.DOCUMENT_DOWNLOAD_URL_EXPIRE if direct_uploads_enabled() else None,
+        })
+
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated, IsAdminUser])
     def status(self, request, pk=None):
-        document = self.get_object()
-        status = request.data.get('status')
+        new_status = request.data.get('status')
         comment = request.data.get('comment', '')
-        if status not in ['ACCEPTED', 'REJECTED']:
+        if new_status not in ['ACCEPTED', 'REJECTED']:
             return Response({'error': 'Недопустимый статус'}, status=status.HTTP_400_BAD_REQUEST)
-        document.status = status
-        document.comment = comment
-        document.save()
+        with transaction.atomic():
+            document = self.get_object()
+            document = Document.objects.select_for_update().get(pk=document.pk)
+            if held_by_other(document, request.user):
+                return claim_conflict()
+            document.status = new_status
+            document.comment = comment
+            document.claimed_by = None
+            document.claim_expires_at = None
+            document.save()
         DocumentHistory.objects.create(
             document=document,
             status=document.status,
@@ -461,8 +755,11 @@ class DocumentViewSet(viewsets.ModelViewSet):
     def history(self, request, pk=None):
         document = self.get_object()
         history = DocumentHistory.objects.filter(document=document).order_by('-created_at')
-        serializer = DocumentHistorySerializer(history, many=True)
-        return Response(serializer.data)
+        data = DocumentHistorySerializer(history, many=True).data
+        if wants_archived(request, 'include_archived'):
+            archived = DocumentHistoryArchive.objects.filter(document=document).order_by('-created_at')
+            data = data + DocumentHistoryArchiveSerializer(archived, many=True).data
+        return Response(data)
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def notify_missing(self, request):
@@ -497,19 +794,22 @@ class DocumentViewSet(viewsets.ModelViewSet):
         try:
             interview = Interview.objects.get(id=interview_id)
             candidate = interview.candidate
-            candidate.has_successful_interview = False
-            candidate.save()
-            interview.result = 'FAILURE'
-            interview.save()
-            Document.objects.filter(interview=interview).delete()
             vacancy_name = interview.get_job_type_display() if interview.resume_type == 'JOB' else interview.get_practice_type_display()
             message = f'Ваша кандидатура на {interview.get_resume_type_display()} ({vacancy_name}) была окончательно отклонена. Для повторной попытки необходимо пройти собеседование заново.'
-            Notification.objects.create(
-                user=candidate.user,
-                message=message,
-                type='HIRE',
-                sent_to_email=True
-            )
+            with transaction.atomic():
+                candidate.has_successful_interview = False
+                candidate.save()
+                old_result = interview.result
+                interview.result = 'FAILURE'
+                interview.save()
+                record('interview', interview, {'result': (old_result, interview.result)}, request.user)
+                Document.objects.filter(interview=interview).delete()
+                Notification.objects.create(
+                    user=candidate.user,
+                    message=message,
+                    type='HIRE',
+                    sent_to_email=True
+                )
             send_notification_email(
                 subject='Статус вашей заявки',
                 template_name='emails/hire_status.html',
@@ -526,6 +826,30 @@ class DocumentViewSet(viewsets.ModelViewSet):
         except Interview.DoesNotExist:
             return Response({'error': 'Собеседование не найдено'}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def export_zip(self, request):
+        # ?interviews=1,2,3 — принятые документы одного или нескольких собеседований одним ZIP
+        try:
+            ids = sorted({int(value) for value in request.query_params.get('interviews', '').split(',') if value.strip()})
+        except ValueError:
+            return Response({'error': 'Некорректный список interviews'}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({'error': 'Укажите собеседования (interviews)'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.DOCUMENT_EXPORT_MAX_INTERVIEWS:
+            return Response({'error': f'Не более {settings.DOCUMENT_EXPORT_MAX_INTERVIEWS} собеседований за раз'}, status=status.HTTP_400_BAD_REQUEST)
+        documents = (
+            Document.objects.filter(interview_id__in=ids, status='ACCEPTED')
+            .select_related('interview__candidate__user')
+            .order_by('interview_id', 'document_type')
+        )
+        if not documents.exists():
+            return Response({'error': 'Нет принятых документов'}, status=status.HTTP_404_NOT_FOUND)
+        # PDF не сжимаются, поэтому ZIP_STORED: архив собирается на лету, файлы читаются по частям
+        response = StreamingHttpResponse(stream_zip(_archive_entries(documents.iterator(chunk_size=200))), content_type='application/zip')
+        filename = f'documents_{ids[0]}.zip' if len(ids) == 1 else f'documents_{timezone.localdate().isoformat()}.zip'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def confirm_hire(self, request):
         interview_id = request.data.get('interview_id')
@@ -579,27 +903,19 @@ class DocumentViewSet(viewsets.ModelViewSet):
 
             vacancy_name = interview.get_job_type_display() if resume_type == 'JOB' else interview.get_practice_type_display()
             if resume_type == 'JOB':
-                try:
-                    Employee.objects.get(user=candidate.user)
+                if Employee.objects.filter(user=candidate.user).exists():
                     return Response({'error': 'Пользователь уже является сотрудником'}, status=status.HTTP_400_BAD_REQUEST)
-                except Employee.DoesNotExist:
-                    job_type_display = vacancy_name or 'Сотрудник'
-                    Employee.objects.create(
-                        user=candidate.user,
-                        department='Не указано',
-                        position=job_type_display,
-                        hire_date=hire_date
-                    )
-                    message = custom_message or f'Поздравляем! Ваш прием на работу ({job_type_display}) назначен на {hire_date.strftime("%d.%m.%Y")}.'
-                    email_status = f'День приёма в ООО "Газпром информ"'
-                    email_template = 'emails/hire_confirmation.html'
-                    email_context = {
-                        'user': candidate.user,
-                        'application_type': 'работу',
-                        'vacancy_name': job_type_display,
-                        'status': email_status,
-                        'hire_date': hire_date.strftime("%d.%m.%Y")
-                    }
+                job_type_display = vacancy_name or 'Сотрудник'
+                message = custom_message or f'Поздравляем! Ваш прием на работу ({job_type_display}) назначен на {hire_date.strftime("%d.%m.%Y")}.'
+                email_status = f'День приёма в ООО "Газпром информ"'
+                email_template = 'emails/hire_confirmation.html'
+                email_context = {
+                    'user': candidate.user,
+                    'application_type': 'работу',
+                    'vacancy_name': job_type_display,
+                    'status': email_status,
+                    'hire_date': hire_date.strftime("%d.%m.%Y")
+                }
             else:
                 practice_type_display = vacancy_name or 'Практика'
                 message = custom_message or f'Поздравляем! Ваш прием на {practice_type_display} практику назначен на {hire_date.strftime("%d.%m.%Y")}.'
@@ -613,14 +929,24 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     'hire_date': hire_date.strftime("%d.%m.%Y")
                 }
 
-            candidate.has_successful_interview = False
-            candidate.save()
-            Notification.objects.create(
-                user=candidate.user,
-                message=message,
-                type='HIRE',
-                sent_to_email=True
-            )
+            # Сотрудник, кандидат, событие воронки и уведомление сохраняются вместе
+            with transaction.atomic():
+                if resume_type == 'JOB':
+                    Employee.objects.create(
+                        user=candidate.user,
+                        department='Не указано',
+                        position=job_type_display,
+                        hire_date=hire_date
+                    )
+                candidate.has_successful_interview = False
+                candidate.save()
+                record('interview', interview, {'hire': (None, 'HIRED')}, request.user)
+                Notification.objects.create(
+                    user=candidate.user,
+                    message=message,
+                    type='HIRE',
+                    sent_to_email=True
+                )
             send_notification_email(
                 subject='День приёма в ООО "Газпром информ"',
                 template_name=email_template,
@@ -631,10 +957,135 @@ class DocumentViewSet(viewsets.ModelViewSet):
         except Interview.DoesNotExist:
             return Response({'error': 'Собеседование не найдено'}, status=status.HTTP_404_NOT_FOUND)
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ShapedResponseMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    shape = NOTIFICATION_SHAPE
+    conditional = True
+
+    def list(self, request, *args, **kwargs):
+        if wants_archived(request):
+            # В архиве есть archived_at, которого нет в форме списка
+            return viewsets.ModelViewSet.list(self, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
\ No newline at end of file
+        if self.action == 'list' and wants_archived(self.request):
+            return NotificationArchive.objects.filter(user=self.request.user).order_by('-created_at')
+        return Notification.objects.filter(user=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == 'list' and wants_archived(self.request):
+            return NotificationArchiveSerializer
+        return NotificationSerializer
+
+class SyncView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Без токена — полная выгрузка; с токеном — только изменения и удаления после него
+        token = request.query_params.get('token')
+        try:
+            since = read_token(token) if token else None
+        except SyncTokenExpired as e:
+            return Response({'error': str(e)}, status=status.HTTP_410_GONE)
+        except SyncTokenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(changes(request.user, request, since))
+
+class BatchView(APIView):
+    permission_classes = [IsAuthenticated]
+    # Вложенные запросы — только GET, поэтому пакет читает с реплики (ReplicaMiddleware)
+    replica_reads = True
+
+    def post(self, request):
+        # {"requests": [{"id": "me", "path": "/api/me/"}, "/api/interviews/my/"]} -> {"responses": [...]}
+        try:
+            items = batch.parse(request.data, settings.BATCH_MAX_REQUESTS)
+        except batch.BatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'responses': batch.execute(request, items)})
+
+class ProfilingView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        if not settings.REQUEST_PROFILING:
+            return Response({'enabled': False, 'routes': []})
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({'error': 'Некорректный параметр limit'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'enabled': True, 'routes': profiling.route_summary(limit)})
+
+    def delete(self, request):
+        profiling.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ReportView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        # Фильтры те же, что у выгрузки; ?limit=&offset= — страница строк
+        try:
+            filters = ReportFilters(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 50)), 500))
+            offset = max(0, int(request.query_params.get('offset', 0)))
+        except ValueError:
+            return Response({'error': 'Некорректные параметры limit/offset'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report_page(filters, offset, limit))
+
+class ReportExportView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in ('csv', 'xlsx'):
+            return Response({'error': 'Поддерживаются форматы csv и xlsx'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            filters = ReportFilters(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = report_rows(filters)
+        filename = f'report_{filters.resume_type}_{timezone.localdate().isoformat()}.{file_format}'
+        if file_format == 'csv':
+            response = StreamingHttpResponse(stream_csv(REPORT_HEADER, rows), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(
+                stream_xlsx(REPORT_HEADER, rows),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class FunnelView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        # Воронка по дневным сверткам; по умолчанию — последние 30 дней
+        try:
+            date_to = datetime.strptime(request.query_params['date_to'], '%Y-%m-%d').date() if request.query_params.get('date_to') else timezone.localdate()
+            date_from = datetime.strptime(request.query_params['date_from'], '%Y-%m-%d').date() if request.query_params.get('date_from') else date_to - timedelta(days=29)
+        except ValueError:
+            return Response({'error': 'Неверный формат даты. Используйте ГГГГ-ММ-ДД'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from > date_to:
+            return Response({'error': 'date_from не может быть позже date_to'}, status=status.HTTP_400_BAD_REQUEST)
+        resume_type = request.query_params.get('resume_type') or None
+        by_day = request.query_params.get('by') == 'day'
+        return Response(funnel_report(date_from, date_to, resume_type, by_day))
+
+
+def metrics_view(request):
+    # Метрики содержат показатели воронки: без METRICS_TOKEN доступны только сотрудникам (сессия админки)
+    token = settings.METRICS_TOKEN
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=403)
+    elif not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponse(status=403)
+    return HttpResponse(metrics.exposition(), content_type=CONTENT_TYPE_LATEST)
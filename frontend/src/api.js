@@ -0,0 +1,25 @@
+import axios from 'axios';
+
+// Адрес бэкенда. Пусто — тот же источник, с которого загружена сборка (Django отдает SPA),
+// запросы идут без CORS; для npm start задается в .env.development
+export const API_URL = process.env.REACT_APP_API_URL || '';
+
+// file_path документа — постоянный адрес API (действие download_url): ссылка на сам файл
+// действует ограниченное время, поэтому запрашивается в момент скачивания.
+// Окно открывается сразу, до запроса, иначе браузер заблокирует его как всплывающее
+export const openDocument = async (link) => {
+  const win = window.open('', '_blank');
+  const token = localStorage.getItem('token');
+  try {
+    const url = link.startsWith('http') ? link : `${API_URL}${link}`;
+    const response = await axios.get(url, { headers: { Authorization: `Bearer ${token}` } });
+    if (win) {
+      win.location.href = response.data.url;
+    } else {
+      window.location.href = response.data.url;
+    }
+  } catch (err) {
+    if (win) win.close();
+    throw err;
+  }
+};
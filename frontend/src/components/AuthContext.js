@@ -1,5 +1,6 @@
 import React, { createContext, useState, useEffect } from 'react';
 import axios from 'axios';
+import { API_URL } from '../api';
 
 export const AuthContext = createContext();
 
@@ -23,40 +24,43 @@ export const AuthProvider = ({ children }) => {
     }
 
     try {
-      const response = await axios.get('http://localhost:8000/api/me/', {
+      // Профиль и собеседования одним пакетным запросом; у не-кандидатов второй ответ — 404
+      const batchResponse = await axios.post(`${API_URL}/api/batch/`, {
+        requests: ['/api/me/', '/api/interviews/my/'],
+      }, {
         headers: { Authorization: `Bearer ${token}` },
       });
-      const userData = response.data.user;
+      const [meResponse, interviewResponse] = batchResponse.data.responses;
+      if (meResponse.status !== 200) {
+        throw new Error('Не удалось загрузить профиль');
+      }
+      const me = meResponse.body;
+      const userData = me.user;
       const newUser = {
         email: userData.email,
         firstName: userData.first_name || '',
         lastName: userData.last_name || '',
         patronymic: userData.patronymic || '',
-        isStaff: response.data.is_staff,
-        isSuperuser: response.data.is_superuser,
-        candidate: response.data.candidate,
-        employee: response.data.employee,
+        isStaff: me.is_staff,
+        isSuperuser: me.is_superuser,
+        candidate: me.candidate,
+        employee: me.employee,
         gender: userData.gender,
+        directUploads: me.direct_uploads,
       };
       setUser(newUser);
 
-      if (response.data.candidate) {
-        setInterviewLoading(true);
-        try {
-          const interviewResponse = await axios.get('http://localhost:8000/api/interviews/my/', {
-            headers: { Authorization: `Bearer ${token}` },
+      if (me.candidate) {
+        if (interviewResponse.status === 200) {
+          setHasSuccessfulInterview({
+            JOB: interviewResponse.body.some((i) => i.result === 'SUCCESS' && i.resume_type === 'JOB'),
+            PRACTICE: interviewResponse.body.some((i) => i.result === 'SUCCESS' && i.resume_type === 'PRACTICE'),
           });
-          const hasSuccess = {
-            JOB: interviewResponse.data.some((i) => i.result === 'SUCCESS' && i.resume_type === 'JOB'),
-            PRACTICE: interviewResponse.data.some((i) => i.result === 'SUCCESS' && i.resume_type === 'PRACTICE'),
-          };
-          setHasSuccessfulInterview(hasSuccess);
-        } catch (interviewErr) {
-          console.error('Ошибка при загрузке собеседований:', interviewErr.response?.data);
+        } else {
+          console.error('Ошибка при загрузке собеседований:', interviewResponse.body);
           setHasSuccessfulInterview({ JOB: false, PRACTICE: false });
-        } finally {
-          setInterviewLoading(false);
         }
+        setInterviewLoading(false);
       } else {
         setHasSuccessfulInterview({ JOB: false, PRACTICE: false });
         setInterviewLoading(false);
@@ -78,9 +82,9 @@ export const AuthProvider = ({ children }) => {
 
   const login = async (email, password) => {
     try {
-      const response = await axios.post('http://localhost:8000/api/token/', { email, password });
+      const response = await axios.post(`${API_URL}/api/token/`, { email, password });
       localStorage.setItem('token', response.data.access);
-      const userResponse = await axios.get('http://localhost:8000/api/me/', {
+      const userResponse = await axios.get(`${API_URL}/api/me/`, {
         headers: { Authorization: `Bearer ${response.data.access}` },
       });
       const userData = userResponse.data.user;
@@ -99,7 +103,7 @@ export const AuthProvider = ({ children }) => {
       if (userResponse.data.candidate) {
         setInterviewLoading(true);
         try {
-          const interviewResponse = await axios.get('http://localhost:8000/api/interviews/my/', {
+          const interviewResponse = await axios.get(`${API_URL}/api/interviews/my/`, {
             headers: { Authorization: `Bearer ${response.data.access}` },
           });
           setHasSuccessfulInterview({
@@ -3,6 +3,7 @@ import axios from 'axios';
 import { toast } from 'react-toastify';
 import { Modal, Box, Typography, TextField, Button } from '@mui/material';
 import { Download, Check, Close } from '@mui/icons-material';
+import { API_URL, openDocument } from '../api';
 
 const style = {
   position: 'absolute',
@@ -30,7 +31,7 @@ useEffect(() => {
     const fetchHistory = async () => {
       const token = localStorage.getItem('token');
       try {
-        const response = await axios.get(`http://localhost:8000/api/documents/${document.id}/history/`, {
+        const response = await axios.get(`${API_URL}/api/documents/${document.id}/history/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
         console.log(`History for document ${document.id}:`, response.data);
@@ -45,10 +46,13 @@ useEffect(() => {
   }
 }, [open, document.id, document.comment, isModerator]);
 
-  const handleDownload = () => {
+  const handleDownload = async () => {
     console.log(`Downloading document ID ${document.id}: ${document.file_path}`);
-    const fullUrl = document.file_path.startsWith('http') ? document.file_path : `http://localhost:8000${document.file_path}`;
-    window.open(fullUrl, '_blank');
+    try {
+      await openDocument(document.file_path);
+    } catch (err) {
+      toast.error(err.response?.data?.error || 'Ошибка при скачивании документа');
+    }
   };
 
   const handleStatusUpdate = async (status) => {
@@ -64,14 +68,14 @@ useEffect(() => {
     const token = localStorage.getItem('token');
     try {
       const response = await axios.patch(
-        `http://localhost:8000/api/documents/${document.id}/status/`,
+        `${API_URL}/api/documents/${document.id}/status/`,
         { status, comment },
         { headers: { Authorization: `Bearer ${token}` } }
       );
       toast.success(`Документ #${document.id} обновлен: ${status}`);
       onStatusUpdate(response.data);
       if (isModerator) {
-        const historyResponse = await axios.get(`http://localhost:8000/api/documents/${document.id}/history/`, {
+        const historyResponse = await axios.get(`${API_URL}/api/documents/${document.id}/history/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
         setHistory(historyResponse.data);
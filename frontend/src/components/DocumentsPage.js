@@ -6,6 +6,7 @@ import { Navigate } from 'react-router-dom';
 import { Table, TableBody, TableCell, TableRow, TableHead, Button, Tooltip, Tabs, Tab, Typography } from '@mui/material';
 import { CloudUpload, Download, Visibility, Delete } from '@mui/icons-material';
 import DocumentModal from './DocumentModal';
+import { API_URL, openDocument } from '../api';
 
 const jobDocumentTypes = [
   'Паспорт',
@@ -56,7 +57,7 @@ const DocumentsPage = () => {
 
     const fetchDocuments = async () => {
       try {
-        const response = await axios.get('http://localhost:8000/api/documents/', {
+        const response = await axios.get(`${API_URL}/api/documents/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
         console.log('Fetched documents (raw):', JSON.stringify(response.data, null, 2));
@@ -70,6 +71,28 @@ const DocumentsPage = () => {
     fetchDocuments();
   }, [user, loading, interviewLoading, hasSuccessfulInterview]);
 
+  // Загрузка напрямую в объектное хранилище по подписанной ссылке; null — хранилище локальное
+  const uploadDirect = async (token, file, documentType, resumeType) => {
+    if (!user.directUploads) {
+      return null;
+    }
+    const headers = { Authorization: `Bearer ${token}` };
+    const presigned = await axios.post(
+      `${API_URL}/api/documents/presign_upload/`,
+      { resume_type: resumeType, document_type: documentType, file_name: file.name, size: file.size },
+      { headers }
+    );
+    const form = new FormData();
+    Object.entries(presigned.data.fields).forEach(([key, value]) => form.append(key, value));
+    form.append('file', file);
+    await axios.post(presigned.data.url, form);
+    return axios.post(
+      `${API_URL}/api/documents/finalize_upload/`,
+      { token: presigned.data.token },
+      { headers }
+    );
+  };
+
   const handleUpload = async (slot, file, resumeType) => {
     if (!file) {
       toast.error('Выберите файл для загрузки');
@@ -84,17 +107,20 @@ const DocumentsPage = () => {
     formData.append('resume_type', resumeType); // Добавляем resume_type
 
     try {
-      const response = await axios.post(
-        'http://localhost:8000/api/documents/',
-        formData,
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
+      const response = await uploadDirect(token, file, documentType, resumeType)
+        || await axios.post(
+          `${API_URL}/api/documents/`,
+          formData,
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
       toast.success(`Документ "${documentType}" успешно загружен!`);
       setDocuments((prev) => [...prev, response.data]);
     } catch (err) {
       const errorMessage =
         err.response?.data?.error ||
         err.response?.data?.file_path ||
+        err.response?.data?.file_name ||
+        err.response?.data?.size ||
         err.response?.data?.document_type ||
         err.response?.data?.non_field_errors ||
         'Ошибка при загрузке документа';
@@ -108,15 +134,18 @@ const DocumentsPage = () => {
     }
   };
 
-  const handleDownload = (fileUrl) => {
-    const fullUrl = fileUrl.startsWith('http') ? fileUrl : `http://localhost:8000${fileUrl}`;
-    window.open(fullUrl, '_blank');
+  const handleDownload = async (fileLink) => {
+    try {
+      await openDocument(fileLink);
+    } catch (err) {
+      toast.error(err.response?.data?.error || 'Ошибка при скачивании документа');
+    }
   };
 
   const handleDelete = async (docId) => {
     const token = localStorage.getItem('token');
     try {
-      await axios.delete(`http://localhost:8000/api/documents/${docId}/`, {
+      await axios.delete(`${API_URL}/api/documents/${docId}/`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       toast.success('Документ успешно удален!');
@@ -182,7 +211,7 @@ const DocumentsPage = () => {
           <>
             <Typography variant="body2" sx={{ mb: 1 }}>
               <a
-                href="http://localhost:8000/media/templates/personal_data_consent_template.docx"
+                href={`${API_URL}/media/templates/personal_data_consent_template.docx`}
                 download
                 className="text-primary"
                 style={{ textDecoration: 'underline' }}
@@ -192,7 +221,7 @@ const DocumentsPage = () => {
             </Typography>
             <Typography variant="body2" sx={{ mb: 2 }}>
               <a
-                href="http://localhost:8000/media/templates/autobiography_template.doc"
+                href={`${API_URL}/media/templates/autobiography_template.doc`}
                 download
                 className="text-primary"
                 style={{ textDecoration: 'underline' }}
@@ -205,7 +234,7 @@ const DocumentsPage = () => {
         {resumeType === 'PRACTICE' && (
           <Typography variant="body2" sx={{ mb: 2 }}>
             <a
-              href="http://localhost:8000/media/templates/practice_application_template.docx"
+              href={`${API_URL}/media/templates/practice_application_template.docx`}
               download
               className="text-primary"
               style={{ textDecoration: 'underline' }}
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useContext } from 'react';
 import axios from 'axios';
 import { AuthContext } from './AuthContext';
 import { Card } from '@mui/material';
+import { API_URL } from '../api';
 
 const FinalStatusPage = () => {
   const { user } = useContext(AuthContext);
@@ -27,18 +28,22 @@ const FinalStatusPage = () => {
 
     const fetchData = async () => {
       try {
-        const resumeResponse = await axios.get('http://localhost:8000/api/resumes/my/', {
+        // Три списка одним пакетным запросом
+        const response = await axios.post(`${API_URL}/api/batch/`, {
+          requests: ['/api/resumes/my/', '/api/interviews/my/', '/api/documents/'],
+        }, {
           headers: { Authorization: `Bearer ${token}` },
         });
-        const interviewResponse = await axios.get('http://localhost:8000/api/interviews/my/', {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        const documentResponse = await axios.get('http://localhost:8000/api/documents/', {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        setResumes(resumeResponse.data);
-        setInterviews(interviewResponse.data);
-        setDocuments(documentResponse.data);
+        const [resumeResponse, interviewResponse, documentResponse] = response.data.responses;
+        const failed = response.data.responses.find((r) => r.status !== 200);
+        if (failed) {
+          setError(failed.body?.error || 'Не удалось загрузить данные');
+          setLoading(false);
+          return;
+        }
+        setResumes(resumeResponse.body);
+        setInterviews(interviewResponse.body);
+        setDocuments(documentResponse.body);
         setLoading(false);
       } catch (err) {
         setError(err.response?.data?.error || 'Не удалось загрузить данные');
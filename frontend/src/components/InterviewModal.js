@@ -4,6 +4,7 @@ import { toast } from 'react-toastify';
 import { Modal, Box, Typography, Button, TextField } from '@mui/material';
 import { FaEye } from 'react-icons/fa';
 import ReactSelect from 'react-select';
+import { API_URL } from '../api';
 
 const resumeTypeOptions = [
   { value: 'JOB', label: 'Работа' },
@@ -68,19 +69,24 @@ const InterviewModal = ({ mode, interview, interviews, setInterviews, isModerato
       const token = localStorage.getItem('token');
       const fetchData = async () => {
         try {
-          const [candidatesResponse, employeesResponse] = await Promise.all([
-            axios.get('http://localhost:8000/api/interviews/available_candidates/', {
-              headers: { Authorization: `Bearer ${token}` },
-            }),
-            axios.get('http://localhost:8000/api/interviews/available_employees/', {
-              headers: { Authorization: `Bearer ${token}` },
-            }),
-          ]);
-          setCandidates(candidatesResponse.data.map((c) => ({
+          const response = await axios.post(`${API_URL}/api/batch/`, {
+            requests: ['/api/interviews/available_candidates/', '/api/interviews/available_employees/'],
+          }, {
+            headers: { Authorization: `Bearer ${token}` },
+          });
+          const [candidatesResponse, employeesResponse] = response.data.responses;
+          const failed = response.data.responses.find((r) => r.status !== 200);
+          if (failed) {
+            const errorMsg = failed.body?.error || 'Не удалось загрузить данные';
+            setError(errorMsg);
+            toast.error(errorMsg);
+            return;
+          }
+          setCandidates(candidatesResponse.body.map((c) => ({
             value: c.id,
             label: `${c.user.last_name} ${c.user.first_name} ${c.user.patronymic} (${c.user.email})`,
           })));
-          setEmployees(employeesResponse.data.map((e) => ({
+          setEmployees(employeesResponse.body.map((e) => ({
             value: e.id,
             label: `${e.user.last_name} ${e.user.first_name} ${e.user.patronymic} (${e.position})`,
           })));
@@ -140,7 +146,7 @@ const InterviewModal = ({ mode, interview, interviews, setInterviews, isModerato
 
     try {
       const response = await axios.post(
-        'http://localhost:8000/api/interviews/create_interview/',
+        `${API_URL}/api/interviews/create_interview/`,
         payload,
         { headers: { Authorization: `Bearer ${token}` } }
       );
@@ -168,7 +174,7 @@ const InterviewModal = ({ mode, interview, interviews, setInterviews, isModerato
     const token = localStorage.getItem('token');
     try {
       const response = await axios.patch(
-        `http://localhost:8000/api/interviews/${interview.id}/`,
+        `${API_URL}/api/interviews/${interview.id}/`,
         { status: newStatus, result: newResult, comment: statusComment },
         { headers: { Authorization: `Bearer ${token}` } }
       );
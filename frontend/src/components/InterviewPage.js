@@ -5,6 +5,7 @@ import { AuthContext } from './AuthContext';
 import { Navigate } from 'react-router-dom';
 import { Table, TableBody, TableCell, TableHead, TableRow, Tabs, Tab, Box, Typography } from '@mui/material';
 import InterviewModal from './InterviewModal';
+import { API_URL } from '../api';
 
 const practiceTypeDisplayMap = {
   PRE_DIPLOMA: 'Преддипломная',
@@ -36,7 +37,7 @@ const InterviewPage = () => {
 
     const fetchData = async () => {
       try {
-        const response = await axios.get('http://localhost:8000/api/interviews/my/', {
+        const response = await axios.get(`${API_URL}/api/interviews/my/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
         setInterviews(response.data);
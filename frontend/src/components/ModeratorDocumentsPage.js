@@ -6,8 +6,9 @@ import {
   Table, TableBody, TableCell, TableHead, TableRow, Button, Tooltip, TextField, Select, MenuItem, FormControl, InputLabel,
   Collapse, IconButton, Box, Typography, Modal
 } from '@mui/material';
-import { Warning, PersonAdd, PersonRemove, Download, Visibility, ExpandMore, ExpandLess } from '@mui/icons-material';
+import { Warning, PersonAdd, PersonRemove, Download, Visibility, ExpandMore, ExpandLess, Archive } from '@mui/icons-material';
 import DocumentModal from './DocumentModal';
+import { API_URL, openDocument } from '../api';
 
 const documentTypes = [
   'Паспорт',
@@ -67,7 +68,7 @@ const ModeratorDocumentsPage = () => {
     setDocuments({});
     const token = localStorage.getItem('token');
     axios
-      .get('http://localhost:8000/api/interviews/', {
+      .get(`${API_URL}/api/interviews/`, {
         headers: { Authorization: `Bearer ${token}` },
       })
       .then((response) => {
@@ -79,7 +80,7 @@ const ModeratorDocumentsPage = () => {
         }), {}));
         successfulInterviews.forEach((interview) => {
           axios
-            .get(`http://localhost:8000/api/documents/?interview=${interview.id}`, {
+            .get(`${API_URL}/api/documents/?interview=${interview.id}`, {
               headers: { Authorization: `Bearer ${token}` },
             })
             .then((docResponse) => {
@@ -111,7 +112,7 @@ const ModeratorDocumentsPage = () => {
     }
     try {
       await axios.post(
-        'http://localhost:8000/api/documents/notify_missing/',
+        `${API_URL}/api/documents/notify_missing/`,
         { interview_id: interviewId, missing_types: missingTypes },
         { headers: { Authorization: `Bearer ${token}` } }
       );
@@ -125,7 +126,7 @@ const ModeratorDocumentsPage = () => {
     const token = localStorage.getItem('token');
     try {
       await axios.post(
-        'http://localhost:8000/api/documents/reject_candidate/',
+        `${API_URL}/api/documents/reject_candidate/`,
         { interview_id: interviewId },
         { headers: { Authorization: `Bearer ${token}` } }
       );
@@ -136,6 +137,24 @@ const ModeratorDocumentsPage = () => {
     }
   };
 
+  const handleDownloadArchive = async (interviewId) => {
+    const token = localStorage.getItem('token');
+    try {
+      const response = await axios.get(
+        `${API_URL}/api/documents/export_zip/?interviews=${interviewId}`,
+        { headers: { Authorization: `Bearer ${token}` }, responseType: 'blob' }
+      );
+      const url = window.URL.createObjectURL(response.data);
+      const link = window.document.createElement('a');
+      link.href = url;
+      link.download = `documents_${interviewId}.zip`;
+      link.click();
+      window.URL.revokeObjectURL(url);
+    } catch (err) {
+      toast.error(err.response?.status === 404 ? 'Нет принятых документов' : 'Ошибка при выгрузке архива');
+    }
+  };
+
   const handleOpenConfirmModal = (interview) => {
     setSelectedInterview(interview);
     const jobTypeDisplay = interview.resume_type === 'JOB' && interview.job_type_display ? interview.job_type_display : '';
@@ -159,7 +178,7 @@ const ModeratorDocumentsPage = () => {
     const token = localStorage.getItem('token');
     try {
       const response = await axios.post(
-        'http://localhost:8000/api/documents/confirm_hire/',
+        `${API_URL}/api/documents/confirm_hire/`,
         { interview_id: interviewId, hire_date: hireDate, message },
         { headers: { Authorization: `Bearer ${token}` } }
       );
@@ -356,12 +375,11 @@ const ModeratorDocumentsPage = () => {
                                 </Tooltip>
                                 <Tooltip title="Скачать">
                                   <Button
-                                    onClick={() => {
-                                      const fullUrl = doc.file_path.startsWith('http')
-                                        ? doc.file_path
-                                        : `http://localhost:8000${doc.file_path}`;
-                                      window.open(fullUrl, '_blank');
-                                    }}
+                                    onClick={() =>
+                                      openDocument(doc.file_path).catch((err) =>
+                                        toast.error(err.response?.data?.error || 'Ошибка при скачивании документа')
+                                      )
+                                    }
                                     sx={{
                                       backgroundColor: '#1976d2',
                                       color: '#fff',
@@ -414,6 +432,21 @@ const ModeratorDocumentsPage = () => {
                     <PersonRemove />
                   </Button>
                 </Tooltip>
+                <Tooltip title="Скачать принятые документы (ZIP)">
+                  <Button
+                    onClick={() => handleDownloadArchive(interview.id)}
+                    sx={{
+                      backgroundColor: '#0288d1',
+                      color: '#fff',
+                      '&:hover': { backgroundColor: '#01579b' },
+                      borderRadius: '8px',
+                      minWidth: '40px',
+                      padding: '8px',
+                    }}
+                  >
+                    <Archive />
+                  </Button>
+                </Tooltip>
                 {documents[interview.id]?.length >= (interview.candidate.user.gender === 'MALE' ? 9 : 8) &&
                   documents[interview.id]
                     .filter((doc) => (interview.candidate.user.gender === 'MALE' ? documentTypes.slice(0, 9) : documentTypes.filter((type) => type !== 'Приписное/Военник').slice(0, 8)).includes(doc.document_type))
@@ -7,6 +7,7 @@ import {
   Table, TableBody, TableCell, TableHead, TableRow, Button, Tabs, Tab, TextField, FormControl, InputLabel, Select, MenuItem, Box, Typography
 } from '@mui/material';
 import InterviewModal from './InterviewModal';
+import { API_URL } from '../api';
 
 const ModeratorInterviewPage = () => {
   const { user, loading } = useContext(AuthContext);
@@ -41,7 +42,7 @@ const ModeratorInterviewPage = () => {
 
     const fetchData = async () => {
       try {
-        const response = await axios.get('http://localhost:8000/api/interviews/', {
+        const response = await axios.get(`${API_URL}/api/interviews/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
         setInterviews(response.data);
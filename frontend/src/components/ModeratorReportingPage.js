@@ -4,20 +4,22 @@ import { toast } from 'react-toastify';
 import { AuthContext } from './AuthContext';
 import { Navigate } from 'react-router-dom';
 import {
-  Table, TableBody, TableCell, TableHead, TableRow, Tabs, Tab, TextField, FormControl, InputLabel, Select, MenuItem, Box
+  Table, TableBody, TableCell, TableHead, TablePagination, TableRow, Tabs, Tab, TextField, FormControl, InputLabel, Select, MenuItem, Box
 } from '@mui/material';
-import { CSVLink } from 'react-csv';
 import { Download } from '@mui/icons-material';
 import { Bar, Pie } from 'react-chartjs-2';
 import { Chart as ChartJS, ArcElement, BarElement, CategoryScale, LinearScale, Tooltip, Legend } from 'chart.js';
+import { API_URL } from '../api';
 
 ChartJS.register(ArcElement, BarElement, CategoryScale, LinearScale, Tooltip, Legend);
 
+const ROWS_PER_PAGE = 50;
+
 const ModeratorReportingPage = () => {
   const { user, loading } = useContext(AuthContext);
-  const [resumes, setResumes] = useState([]);
-  const [interviews, setInterviews] = useState([]);
-  const [documents, setDocuments] = useState([]);
+  const [report, setReport] = useState(null);
+  const [page, setPage] = useState(0);
+  const [exporting, setExporting] = useState(false);
   const [error, setError] = useState('');
   const [activeTab, setActiveTab] = useState('JOB');
   const [searchQuery, setSearchQuery] = useState('');
@@ -45,6 +47,23 @@ const ModeratorReportingPage = () => {
     null: 'Не указан'
   };
 
+  // Фильтры передаются серверу: строки отчета приходят постранично, графики — готовыми сводками
+  const params = useMemo(() => ({
+    resume_type: activeTab,
+    search: searchQuery,
+    date_from: dateFrom,
+    date_to: dateTo,
+    interview_status: interviewStatus,
+    interview_result: interviewResult,
+    document_status: documentStatus,
+    job_type: activeTab === 'JOB' ? jobType : '',
+    practice_type: activeTab === 'PRACTICE' ? practiceType : '',
+  }), [activeTab, searchQuery, dateFrom, dateTo, interviewStatus, interviewResult, documentStatus, jobType, practiceType]);
+
+  useEffect(() => {
+    setPage(0);
+  }, [params]);
+
   useEffect(() => {
     if (loading || !user?.isStaff) return;
 
@@ -54,152 +73,53 @@ const ModeratorReportingPage = () => {
       return;
     }
 
-    const fetchData = async () => {
+    // Поиск вводится по буквам — запрос уходит после паузы
+    const timer = setTimeout(async () => {
       try {
-        const [resumesResponse, interviewsResponse, documentsResponse] = await Promise.all([
-          axios.get('http://localhost:8000/api/resumes/', {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
-          axios.get('http://localhost:8000/api/interviews/', {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
-          axios.get('http://localhost:8000/api/documents/', {
-            headers: { Authorization: `Bearer ${token}` },
-          })
-        ]);
-        setResumes(resumesResponse.data);
-        setInterviews(interviewsResponse.data);
-        setDocuments(documentsResponse.data);
-
-        const hasJobData = resumesResponse.data.some((r) => r.resume_type === 'JOB') || interviewsResponse.data.some((i) => i.resume_type === 'JOB');
-        const hasPracticeData = resumesResponse.data.some((r) => r.resume_type === 'PRACTICE') || interviewsResponse.data.some((i) => i.resume_type === 'PRACTICE');
-        if (hasJobData) {
-          setActiveTab('JOB');
-        } else if (hasPracticeData) {
-          setActiveTab('PRACTICE');
+        const response = await axios.get(`${API_URL}/api/reports/`, {
+          params: { ...params, limit: ROWS_PER_PAGE, offset: page * ROWS_PER_PAGE },
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        setReport(response.data);
+        setError('');
+        if (response.data.types.length && !response.data.types.includes(activeTab)) {
+          setActiveTab(response.data.types[0]);
         }
       } catch (err) {
-        setError(err.response?.data?.error || 'Не удалось загрузить данные');
-        toast.error(error);
+        const message = err.response?.data?.error || 'Не удалось загрузить данные';
+        setError(message);
+        toast.error(message);
       }
-    };
-    fetchData();
-  }, [user, loading]);
-
-  const filteredData = useMemo(() => {
-    let filteredResumes = resumes.filter((resume) => resume.resume_type === activeTab);
-    let filteredInterviews = interviews.filter((interview) => interview.resume_type === activeTab);
-    let filteredDocuments = documents;
-
-    if (searchQuery) {
-      filteredResumes = filteredResumes.filter((resume) =>
-        `${resume.candidate?.user?.last_name || ''} ${resume.candidate?.user?.first_name || ''} ${resume.candidate?.user?.patronymic || ''}`
-          .toLowerCase()
-          .includes(searchQuery.toLowerCase())
-      );
-      filteredInterviews = filteredInterviews.filter((interview) =>
-        `${interview.candidate?.user?.last_name || ''} ${interview.candidate?.user?.first_name || ''} ${interview.candidate?.user?.patronymic || ''}`
-          .toLowerCase()
-          .includes(searchQuery.toLowerCase())
-      );
-      filteredDocuments = filteredDocuments.filter((doc) =>
-        `${doc.interview?.candidate?.user?.last_name || ''} ${doc.interview?.candidate?.user?.first_name || ''} ${doc.interview?.candidate?.user?.patronymic || ''}`
-          .toLowerCase()
-          .includes(searchQuery.toLowerCase())
-      );
-    }
-
-    if (dateFrom) {
-      const fromDate = new Date(dateFrom);
-      filteredResumes = filteredResumes.filter((resume) => new Date(resume.created_at) >= fromDate);
-      filteredInterviews = filteredInterviews.filter((interview) => new Date(interview.scheduled_at) >= fromDate);
-      filteredDocuments = filteredDocuments.filter((doc) => new Date(doc.uploaded_at) >= fromDate);
-    }
-    if (dateTo) {
-      const toDate = new Date(dateTo);
-      toDate.setHours(23, 59, 59, 999);
-      filteredResumes = filteredResumes.filter((resume) => new Date(resume.created_at) <= toDate);
-      filteredInterviews = filteredInterviews.filter((interview) => new Date(interview.scheduled_at) <= toDate);
-      filteredDocuments = filteredDocuments.filter((doc) => new Date(doc.uploaded_at) <= toDate);
-    }
-
-    if (interviewStatus) {
-      filteredInterviews = filteredInterviews.filter((interview) => interview.status === interviewStatus);
-    }
-
-    if (interviewResult) {
-      filteredInterviews = filteredInterviews.filter((interview) => interview.result === interviewResult);
-    }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [user, loading, params, page]);
 
-    if (documentStatus) {
-      filteredDocuments = filteredDocuments.filter((doc) => doc.status === documentStatus);
-    }
-
-    if (activeTab === 'JOB' && jobType) {
-      filteredResumes = filteredResumes.filter((resume) => resume.job_type === jobType);
-      filteredInterviews = filteredInterviews.filter((interview) => interview.job_type === jobType);
-      filteredDocuments = filteredDocuments.filter((doc) => doc.interview?.job_type === jobType);
-    } else if (activeTab === 'PRACTICE' && practiceType) {
-      filteredResumes = filteredResumes.filter((resume) => resume.practice_type === practiceType);
-      filteredInterviews = filteredInterviews.filter((interview) => interview.practice_type === practiceType);
-      filteredDocuments = filteredDocuments.filter((doc) => doc.interview?.practice_type === practiceType);
-    }
-
-    return { filteredResumes, filteredInterviews, filteredDocuments };
-  }, [resumes, interviews, documents, activeTab, searchQuery, dateFrom, dateTo, interviewStatus, interviewResult, documentStatus, jobType, practiceType]);
-
-  const csvData = useMemo(() => {
-    const { filteredResumes, filteredInterviews, filteredDocuments } = filteredData;
-    const data = [];
-
-    filteredResumes.forEach((resume) => {
-      const candidateName = `${resume.candidate?.user?.last_name || ''} ${resume.candidate?.user?.first_name || ''} ${resume.candidate?.user?.patronymic || ''}`.trim();
-      const interview = filteredInterviews.find((i) => i.candidate?.id === resume.candidate?.id && i.resume_type === resume.resume_type);
-      const relatedDocs = filteredDocuments.filter((doc) => doc.interview?.candidate?.id === resume.candidate?.id && doc.interview?.resume_type === resume.resume_type);
-
-      data.push({
-        candidate: candidateName,
-        resume_type: resume.resume_type === 'JOB' ? 'Работа' : 'Практика',
-        job_type: resume.resume_type === 'JOB' ? jobTypeOrder[resume.job_type] || 'Не указан' : '',
-        practice_type: resume.resume_type === 'PRACTICE' ? practiceTypeOrder[resume.practice_type] || 'Не указан' : '',
-        resume_status: resume.status_display,
-        resume_date: new Date(resume.created_at).toLocaleDateString('ru-RU'),
-        interview_status: interview ? {
-          SCHEDULED: 'Запланировано',
-          COMPLETED: 'Проведено',
-          CANCELLED: 'Отменено'
-        }[interview.status] || 'Нет' : 'Нет',
-        interview_result: interview ? {
-          SUCCESS: 'Успешно',
-          FAILURE: 'Неуспешно',
-          PENDING: 'Ожидает'
-        }[interview.result] || 'Нет' : 'Нет',
-        interview_date: interview ? new Date(interview.scheduled_at).toLocaleString('ru-RU') : 'Нет',
-        documents: relatedDocs.map((doc) => `${doc.document_type} (${doc.status_display})`).join('; ') || 'Нет'
+  const handleExport = async () => {
+    const token = localStorage.getItem('token');
+    setExporting(true);
+    try {
+      // Файл формирует сервер потоком по тем же фильтрам
+      const response = await axios.get(`${API_URL}/api/reports/export/`, {
+        params,
+        headers: { Authorization: `Bearer ${token}` },
+        responseType: 'blob',
       });
-    });
-
-    return data;
-  }, [filteredData]);
+      const url = URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `report_${activeTab}_${new Date().toISOString().split('T')[0]}.csv`;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (err) {
+      toast.error('Не удалось выгрузить отчет');
+    } finally {
+      setExporting(false);
+    }
+  };
 
   const chartData = useMemo(() => {
-    const { filteredResumes, filteredInterviews } = filteredData;
-
-    const resumeStats = {};
-    const interviewStats = { SUCCESS: 0, FAILURE: 0, PENDING: 0, CANCELLED: 0 };
-
-    filteredResumes.forEach((resume) => {
-      const key = resume.resume_type === 'JOB' ? resume.job_type : resume.practice_type;
-      resumeStats[key] = (resumeStats[key] || 0) + 1;
-    });
-
-    filteredInterviews.forEach((interview) => {
-      if (interview.status === 'CANCELLED') {
-        interviewStats.CANCELLED += 1;
-      } else {
-        interviewStats[interview.result] = (interviewStats[interview.result] || 0) + 1;
-      }
-    });
+    const resumeStats = report?.resumes_by_vacancy || {};
+    const interviewStats = report?.interviews_by_result || {};
 
     return {
       resumeChart: {
@@ -214,12 +134,12 @@ const ModeratorReportingPage = () => {
         labels: ['Успешно', 'Неуспешно', 'Ожидает', 'Отменено'],
         datasets: [{
           label: 'Статусы собеседований',
-          data: [interviewStats.SUCCESS, interviewStats.FAILURE, interviewStats.PENDING, interviewStats.CANCELLED],
+          data: ['SUCCESS', 'FAILURE', 'PENDING', 'CANCELLED'].map((key) => interviewStats[key] || 0),
           backgroundColor: ['#16a34a', '#dc2626', '#ed6c02', '#6b7280'],
         }]
       }
     };
-  }, [filteredData, activeTab]);
+  }, [report, activeTab]);
 
   const resumeChartOptions = {
     scales: {
@@ -278,8 +198,9 @@ const ModeratorReportingPage = () => {
     return <Box className="container mt-5 alert alert-danger">{error}</Box>;
   }
 
-  const hasJobData = resumes.some((r) => r.resume_type === 'JOB') || interviews.some((i) => i.resume_type === 'JOB');
-  const hasPracticeData = resumes.some((r) => r.resume_type === 'PRACTICE') || interviews.some((i) => i.resume_type === 'PRACTICE');
+  const hasJobData = report?.types.includes('JOB');
+  const hasPracticeData = report?.types.includes('PRACTICE');
+  const rows = report?.results || [];
 
   return (
     <Box className="container mx-auto mt-5 pl-64 pt-20">
@@ -379,15 +300,10 @@ const ModeratorReportingPage = () => {
       </Box>
 
       <Box sx={{ mb: 4 }}>
-        <CSVLink
-          data={csvData}
-          filename={`report_${activeTab}_${new Date().toISOString().split('T')[0]}.csv`}
-          className="btn btn-primary"
-          target="_blank"
-        >
+        <button type="button" className="btn btn-primary" onClick={handleExport} disabled={exporting}>
           <Download sx={{ mr: 1 }} />
-          Экспорт в CSV
-        </CSVLink>
+          {exporting ? 'Выгрузка...' : 'Экспорт в CSV'}
+        </button>
       </Box>
 
       {(hasJobData || hasPracticeData) ? (
@@ -412,71 +328,48 @@ const ModeratorReportingPage = () => {
             <Box className="card mb-4">
               <h2 className="card-header">Отчет по кандидатам</h2>
               <div className="card-body">
-                {filteredData.filteredResumes.length === 0 ? (
+                {rows.length === 0 ? (
                   <p>Резюме отсутствуют.</p>
                 ) : (
-                  <Table className="table table-striped">
-                    <TableHead>
-                      <TableRow>
-                        <TableCell>Кандидат</TableCell>
-                        <TableCell>{activeTab === 'JOB' ? 'Тип работы' : 'Тип практики'}</TableCell>
-                        <TableCell>Статус резюме</TableCell>
-                        <TableCell>Дата подачи</TableCell>
-                        <TableCell>Статус собеседования</TableCell>
-                        <TableCell>Результат</TableCell>
-                        <TableCell>Дата собеседования</TableCell>
-                        <TableCell>Документы</TableCell>
-                      </TableRow>
-                    </TableHead>
-                    <TableBody>
-                      {filteredData.filteredResumes.map((resume) => {
-                        const interview = filteredData.filteredInterviews.find(
-                          (i) => i.candidate?.id === resume.candidate?.id && i.resume_type === resume.resume_type
-                        );
-                        const relatedDocs = filteredData.filteredDocuments.filter(
-                          (doc) => doc.interview?.candidate?.id === resume.candidate?.id && doc.interview?.resume_type === resume.resume_type
-                        );
-                        return (
-                          <TableRow key={resume.id}>
-                            <TableCell>
-                              {resume.candidate?.user
-                                ? `${resume.candidate.user.last_name || ''} ${resume.candidate.user.first_name || ''} ${resume.candidate.user.patronymic || ''}`.trim()
-                                : 'Кандидат не указан'}
-                            </TableCell>
-                            <TableCell>
-                              {activeTab === 'JOB'
-                                ? jobTypeOrder[resume.job_type] || 'Не указан'
-                                : practiceTypeOrder[resume.practice_type] || 'Не указан'}
-                            </TableCell>
-                            <TableCell>{resume.status_display}</TableCell>
-                            <TableCell>{new Date(resume.created_at).toLocaleDateString('ru-RU')}</TableCell>
-                            <TableCell>
-                              {interview ? {
-                                SCHEDULED: 'Запланировано',
-                                COMPLETED: 'Проведено',
-                                CANCELLED: 'Отменено'
-                              }[interview.status] || 'Нет' : 'Нет'}
-                            </TableCell>
-                            <TableCell>
-                              {interview ? {
-                                SUCCESS: 'Успешно',
-                                FAILURE: 'Неуспешно',
-                                PENDING: 'Ожидает'
-                              }[interview.result] || 'Нет' : 'Нет'}
-                            </TableCell>
-                            <TableCell>
-                              {interview ? new Date(interview.scheduled_at).toLocaleString('ru-RU') : 'Нет'}
-                            </TableCell>
-                            <TableCell>
-                              {relatedDocs.length > 0
-                                ? relatedDocs.map((doc) => `${doc.document_type} (${doc.status_display})`).join('; ')
-                                : 'Нет'}
-                            </TableCell>
+                  <>
+                    <Table className="table table-striped">
+                      <TableHead>
+                        <TableRow>
+                          <TableCell>Кандидат</TableCell>
+                          <TableCell>{activeTab === 'JOB' ? 'Тип работы' : 'Тип практики'}</TableCell>
+                          <TableCell>Статус резюме</TableCell>
+                          <TableCell>Дата подачи</TableCell>
+                          <TableCell>Статус собеседования</TableCell>
+                          <TableCell>Результат</TableCell>
+                          <TableCell>Дата собеседования</TableCell>
+                          <TableCell>Документы</TableCell>
+                        </TableRow>
+                      </TableHead>
+                      <TableBody>
+                        {rows.map((row, index) => (
+                          <TableRow key={page * ROWS_PER_PAGE + index}>
+                            <TableCell>{row.candidate || 'Кандидат не указан'}</TableCell>
+                            <TableCell>{activeTab === 'JOB' ? row.job_type : row.practice_type}</TableCell>
+                            <TableCell>{row.resume_status}</TableCell>
+                            <TableCell>{row.resume_date}</TableCell>
+                            <TableCell>{row.interview_status}</TableCell>
+                            <TableCell>{row.interview_result}</TableCell>
+                            <TableCell>{row.interview_date}</TableCell>
+                            <TableCell>{row.documents}</TableCell>
                           </TableRow>
-                        );
-                      })}
-                    </TableBody>
-                  </Table>
+                        ))}
+                      </TableBody>
+                    </Table>
+                    <TablePagination
+                      component="div"
+                      count={report.count}
+                      page={page}
+                      onPageChange={(event, newPage) => setPage(newPage)}
+                      rowsPerPage={ROWS_PER_PAGE}
+                      rowsPerPageOptions={[ROWS_PER_PAGE]}
+                      labelDisplayedRows={({ from, to, count }) => `${from}–${to} из ${count}`}
+                    />
+                  </>
                 )}
               </div>
             </Box>
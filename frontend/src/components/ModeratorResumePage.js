@@ -8,6 +8,7 @@ import {
   Box, Typography, TextField, FormControl, InputLabel, Select, MenuItem
 } from '@mui/material';
 import ResumeModal from './ResumeModal';
+import { API_URL } from '../api';
 
 const ModeratorResumePage = () => {
   const { user, loading } = useContext(AuthContext);
@@ -48,7 +49,7 @@ const ModeratorResumePage = () => {
     }
 
     axios
-      .get('http://localhost:8000/api/resumes/', {
+      .get(`${API_URL}/api/resumes/`, {
         headers: { Authorization: `Bearer ${token}` },
       })
       .then((response) => {
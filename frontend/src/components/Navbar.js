@@ -4,6 +4,7 @@ import { AuthContext } from './AuthContext';
 import axios from 'axios';
 import { FaBell } from 'react-icons/fa';
 import { Dropdown } from 'react-bootstrap';
+import { API_URL } from '../api';
 
 const Navbar = () => {
   const { user, logout } = useContext(AuthContext);
@@ -16,7 +17,7 @@ const Navbar = () => {
     if (user && !user.isStaff) {
       const token = localStorage.getItem('token');
       try {
-        const response = await axios.get('http://localhost:8000/api/notifications/', {
+        const response = await axios.get(`${API_URL}/api/notifications/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
         const unreadNotifications = response.data.filter((n) => !n.is_read);
@@ -58,7 +59,7 @@ const Navbar = () => {
     const token = localStorage.getItem('token');
     try {
       await axios.patch(
-        `http://localhost:8000/api/notifications/${notificationId}/`,
+        `${API_URL}/api/notifications/${notificationId}/`,
         { is_read: true },
         { headers: { Authorization: `Bearer ${token}` } }
       );
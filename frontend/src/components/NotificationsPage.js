@@ -4,6 +4,7 @@ import { toast } from 'react-toastify';
 import { AuthContext } from './AuthContext';
 import { FaCheckCircle, FaFilter } from 'react-icons/fa';
 import { Button, FormControl, InputLabel, Select, MenuItem, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Paper } from '@mui/material';
+import { API_URL } from '../api';
 
 const NotificationsPage = () => {
   const { user } = useContext(AuthContext);
@@ -22,7 +23,7 @@ const NotificationsPage = () => {
     const fetchNotifications = async () => {
       const token = localStorage.getItem('token');
       try {
-        const response = await axios.get('http://localhost:8000/api/notifications/', {
+        const response = await axios.get(`${API_URL}/api/notifications/`, {
           headers: { Authorization: `Bearer ${token}` },
         });
         setNotifications(response.data);
@@ -40,7 +41,7 @@ const NotificationsPage = () => {
     const token = localStorage.getItem('token');
     try {
       await axios.patch(
-        `http://localhost:8000/api/notifications/${notificationId}/`,
+        `${API_URL}/api/notifications/${notificationId}/`,
         { is_read: true },
         { headers: { Authorization: `Bearer ${token}` } }
       );
@@ -64,7 +65,7 @@ const NotificationsPage = () => {
           .filter((n) => !n.is_read)
           .map((n) =>
             axios.patch(
-              `http://localhost:8000/api/notifications/${n.id}/`,
+              `${API_URL}/api/notifications/${n.id}/`,
               { is_read: true },
               { headers: { Authorization: `Bearer ${token}` } }
             )
@@ -3,6 +3,7 @@ import { useNavigate, Link } from 'react-router-dom';
 import { useForm } from 'react-hook-form';
 import { toast } from 'react-toastify';
 import axios from 'axios';
+import { API_URL } from '../api';
 
 const Register = () => {
   const { register, handleSubmit, formState: { errors } } = useForm();
@@ -11,7 +12,7 @@ const Register = () => {
 
   const onSubmit = async (data) => {
     try {
-      const response = await axios.post('http://localhost:8000/api/register/', data);
+      const response = await axios.post(`${API_URL}/api/register/`, data);
       toast.success('Регистрация успешна! Пожалуйста, проверьте вашу почту для подтверждения.');
       setError('');
       navigate('/login');
@@ -5,6 +5,7 @@ import { IMaskInput } from 'react-imask';
 import { FaEye, FaEdit, FaTrash } from 'react-icons/fa';
 import Select from 'react-select';
 import { Modal, Box, Typography, Button, TextField } from '@mui/material';
+import { API_URL } from '../api';
 
 const educationOptions = [
   { value: 'SECONDARY', label: 'Среднее' },
@@ -65,7 +66,7 @@ const ResumeModal = ({ resume, resumes, setResumes, isModerator }) => {
   const handleDeleteResume = async () => {
     const token = localStorage.getItem('token');
     try {
-      await axios.delete(`http://localhost:8000/api/resume/${resume.id}/delete/`, {
+      await axios.delete(`${API_URL}/api/resume/${resume.id}/delete/`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       setResumes(resumes.filter((r) => r.id !== resume.id));
@@ -124,7 +125,7 @@ const ResumeModal = ({ resume, resumes, setResumes, isModerator }) => {
     };
 
     try {
-      const response = await axios.patch(`http://localhost:8000/api/resume/${resume.id}/edit/`, payload, {
+      const response = await axios.patch(`${API_URL}/api/resume/${resume.id}/edit/`, payload, {
         headers: { Authorization: `Bearer ${token}` },
       });
       setResumes(resumes.map((r) => (r.id === resume.id ? response.data : r)));
@@ -158,7 +159,7 @@ const ResumeModal = ({ resume, resumes, setResumes, isModerator }) => {
     const token = localStorage.getItem('token');
     try {
       const response = await axios.patch(
-        `http://localhost:8000/api/resume/${resume.id}/status/`,
+        `${API_URL}/api/resume/${resume.id}/status/`,
         { status: newStatus, comment: statusComment },
         { headers: { Authorization: `Bearer ${token}` } }
       );
@@ -7,6 +7,7 @@ import { IMaskInput } from 'react-imask';
 import { Tabs, Tab, Table, TableBody, TableCell, TableHead, TableRow, Box, Typography } from '@mui/material';
 import Select from 'react-select';
 import ResumeModal from './ResumeModal';
+import { API_URL } from '../api';
 
 const ResumePage = () => {
   const { user, loading } = useContext(AuthContext);
@@ -58,7 +59,7 @@ const ResumePage = () => {
     }
 
     axios
-      .get('http://localhost:8000/api/resumes/my/', {
+      .get(`${API_URL}/api/resumes/my/`, {
         headers: { Authorization: `Bearer ${token}` },
       })
       .then((response) => {
@@ -117,7 +118,7 @@ const ResumePage = () => {
     };
 
     try {
-      const response = await axios.post('http://localhost:8000/api/resume/create/', payload, {
+      const response = await axios.post(`${API_URL}/api/resume/create/`, payload, {
         headers: { Authorization: `Bearer ${token}` },
       });
       setResumes([...resumes, response.data]);